@@ -0,0 +1,36 @@
+"""install stage item document triggers on startup
+
+Revision ID: bcebf7f275e8
+Revises: c4abab318b2f
+Create Date: 2026-10-18 19:02:13.512844
+
+"""
+
+from alembic import op
+from bracket.schema import (
+    get_drop_stage_item_document_triggers_ddl,
+    get_stage_item_document_triggers_ddl,
+)
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'bcebf7f275e8'
+down_revision: str | None = 'c4abab318b2f'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    # The triggers are installed on startup if stage item documents are enabled
+    for statement in get_drop_stage_item_document_triggers_ddl():
+        op.execute(statement)
+
+    op.create_index(op.f('ix_matches_team1_id'), 'matches', ['team1_id'], unique=False)
+    op.create_index(op.f('ix_matches_team2_id'), 'matches', ['team2_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_matches_team2_id'), table_name='matches')
+    op.drop_index(op.f('ix_matches_team1_id'), table_name='matches')
+
+    for statement in get_stage_item_document_triggers_ddl():
+        op.execute(statement)
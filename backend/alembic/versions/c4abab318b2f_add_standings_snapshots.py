@@ -0,0 +1,42 @@
+"""add standings snapshots
+
+Revision ID: c4abab318b2f
+Revises: d992fcdaa626
+Create Date: 2026-10-18 03:25:39.920405
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'c4abab318b2f'
+down_revision: str | None = 'd992fcdaa626'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'standings_snapshots',
+        sa.Column('round_id', sa.BigInteger(), nullable=False),
+        sa.Column('stage_item_id', sa.BigInteger(), nullable=False),
+        sa.Column('created', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('standings', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.ForeignKeyConstraint(['round_id'], ['rounds.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['stage_item_id'], ['stage_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('round_id'),
+    )
+    op.create_index(
+        op.f('ix_standings_snapshots_stage_item_id'),
+        'standings_snapshots',
+        ['stage_item_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_standings_snapshots_stage_item_id'), table_name='standings_snapshots')
+    op.drop_table('standings_snapshots')
@@ -0,0 +1,98 @@
+"""add tournament revisions
+
+Revision ID: cebcb61b5538
+Revises: 4768424dd787
+Create Date: 2026-10-18 10:12:31.104587
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'cebcb61b5538'
+down_revision: str | None = '4768424dd787'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+TOURNAMENT_ID_LOOKUPS = {
+    'tournaments': 'SELECT id FROM changed_rows',
+    'stages': 'SELECT tournament_id FROM changed_rows',
+    'stage_item_inputs': 'SELECT tournament_id FROM changed_rows',
+    'teams': 'SELECT tournament_id FROM changed_rows',
+    'players': 'SELECT tournament_id FROM changed_rows',
+    'courts': 'SELECT tournament_id FROM changed_rows',
+    'players_x_teams': '''
+        SELECT t.tournament_id FROM changed_rows
+        JOIN teams t ON t.id = changed_rows.team_id
+    ''',
+    'stage_items': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN stages s ON s.id = changed_rows.stage_id
+    ''',
+    'rounds': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN stage_items si ON si.id = changed_rows.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+    ''',
+    'matches': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN rounds r ON r.id = changed_rows.round_id
+        JOIN stage_items si ON si.id = r.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+    ''',
+}
+
+
+def get_operations(table: str) -> list[str]:
+    return ['INSERT', 'UPDATE'] if table == 'tournaments' else ['INSERT', 'UPDATE', 'DELETE']
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('tournament_revision_seq')))
+    op.create_table(
+        'tournament_revisions',
+        sa.Column('tournament_id', sa.BigInteger(), nullable=False),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tournament_id'),
+    )
+
+    for table, lookup in TOURNAMENT_ID_LOOKUPS.items():
+        op.execute(
+            f'''
+            CREATE OR REPLACE FUNCTION bump_tournament_revision_for_{table}() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO tournament_revisions (tournament_id, revision)
+                SELECT tournaments.id, nextval('tournament_revision_seq')
+                FROM tournaments
+                WHERE tournaments.id IN ({lookup})
+                ON CONFLICT (tournament_id) DO UPDATE SET revision = EXCLUDED.revision;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            '''
+        )
+        for operation in get_operations(table):
+            transition_table = 'OLD' if operation == 'DELETE' else 'NEW'
+            op.execute(
+                f'''
+                CREATE TRIGGER {table}_revision_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {transition_table} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE PROCEDURE bump_tournament_revision_for_{table}()
+                '''
+            )
+
+
+def downgrade() -> None:
+    for table in TOURNAMENT_ID_LOOKUPS:
+        for operation in get_operations(table):
+            op.execute(f'DROP TRIGGER {table}_revision_{operation.lower()} ON {table}')
+
+        op.execute(f'DROP FUNCTION bump_tournament_revision_for_{table}')
+
+    op.drop_table('tournament_revisions')
+    op.execute(sa.schema.DropSequence(sa.Sequence('tournament_revision_seq')))
@@ -0,0 +1,109 @@
+"""add stage item documents
+
+Revision ID: d6efefebd4ea
+Revises: cebcb61b5538
+Create Date: 2026-10-18 11:02:47.519304
+
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'd6efefebd4ea'
+down_revision: str | None = 'cebcb61b5538'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+STAGE_ITEM_ID_LOOKUPS = {
+    'stage_items': 'SELECT id FROM changed_rows',
+    'stage_item_inputs': 'SELECT stage_item_id FROM changed_rows',
+    'rounds': 'SELECT stage_item_id FROM changed_rows',
+    'matches': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN rounds r ON r.id = changed_rows.round_id
+    ''',
+    'courts': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.court_id = changed_rows.id
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'teams': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON changed_rows.id IN (m.team1_id, m.team2_id)
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'players_x_teams': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON changed_rows.team_id IN (m.team1_id, m.team2_id)
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'players': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN players_x_teams pt ON pt.player_id = changed_rows.id
+        JOIN matches m ON pt.team_id IN (m.team1_id, m.team2_id)
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+}
+
+
+def get_operations(table: str) -> list[str]:
+    return ['INSERT', 'UPDATE'] if table == 'stage_items' else ['INSERT', 'UPDATE', 'DELETE']
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stage_item_documents',
+        sa.Column('stage_item_id', sa.BigInteger(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('document_version', sa.BigInteger(), nullable=True),
+        sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.ForeignKeyConstraint(['stage_item_id'], ['stage_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('stage_item_id'),
+    )
+    op.execute(
+        '''
+        INSERT INTO stage_item_documents (stage_item_id, version)
+        SELECT id, nextval('tournament_revision_seq') FROM stage_items
+        '''
+    )
+
+    for table, lookup in STAGE_ITEM_ID_LOOKUPS.items():
+        op.execute(
+            f'''
+            CREATE OR REPLACE FUNCTION invalidate_stage_item_documents_for_{table}()
+            RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO stage_item_documents (stage_item_id, version)
+                SELECT stage_items.id, nextval('tournament_revision_seq')
+                FROM stage_items
+                WHERE stage_items.id IN ({lookup})
+                ON CONFLICT (stage_item_id) DO UPDATE SET version = EXCLUDED.version;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            '''
+        )
+        for operation in get_operations(table):
+            transition_table = 'OLD' if operation == 'DELETE' else 'NEW'
+            op.execute(
+                f'''
+                CREATE TRIGGER {table}_stage_item_documents_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {transition_table} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE PROCEDURE invalidate_stage_item_documents_for_{table}()
+                '''
+            )
+
+
+def downgrade() -> None:
+    for table in STAGE_ITEM_ID_LOOKUPS:
+        for operation in get_operations(table):
+            op.execute(f'DROP TRIGGER {table}_stage_item_documents_{operation.lower()} ON {table}')
+
+        op.execute(f'DROP FUNCTION invalidate_stage_item_documents_for_{table}')
+
+    op.drop_table('stage_item_documents')
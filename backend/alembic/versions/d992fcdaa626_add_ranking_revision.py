@@ -0,0 +1,28 @@
+"""add ranking revision
+
+Revision ID: d992fcdaa626
+Revises: eeb74184878c
+Create Date: 2026-10-18 16:18:41.734069
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'd992fcdaa626'
+down_revision: str | None = 'eeb74184878c'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'tournament_revisions',
+        sa.Column('ranking_revision', sa.BigInteger(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('tournament_revisions', 'ranking_revision')
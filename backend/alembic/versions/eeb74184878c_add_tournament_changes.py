@@ -0,0 +1,67 @@
+"""add tournament changes
+
+Revision ID: eeb74184878c
+Revises: d6efefebd4ea
+Create Date: 2026-10-18 13:41:05.218934
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+from bracket.schema import (
+    TOURNAMENT_CHANGE_LOOKUPS,
+    TOURNAMENT_ID_LOOKUPS,
+    get_bump_tournament_revision_function_ddl,
+    get_tournament_change_log_triggers_ddl,
+)
+
+# revision identifiers, used by Alembic.
+revision: str | None = 'eeb74184878c'
+down_revision: str | None = 'd6efefebd4ea'
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+OPERATIONS = ['INSERT', 'UPDATE', 'DELETE']
+
+
+def replace_bump_tournament_revision_functions(new_revision: str) -> None:
+    for table in TOURNAMENT_ID_LOOKUPS:
+        op.execute(get_bump_tournament_revision_function_ddl(table, new_revision))
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tournament_changes',
+        sa.Column('tournament_id', sa.BigInteger(), nullable=False),
+        sa.Column('table_name', sa.Text(), nullable=False),
+        sa.Column('row_id', sa.BigInteger(), nullable=False),
+        sa.Column('revision', sa.BigInteger(), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['tournament_id'], ['tournaments.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('tournament_id', 'table_name', 'row_id'),
+    )
+    op.create_index(
+        'ix_tournament_changes_tournament_id_revision',
+        'tournament_changes',
+        ['tournament_id', 'revision'],
+    )
+
+    # Take new revisions only after locking the row of the tournament
+    replace_bump_tournament_revision_functions("nextval('tournament_revision_seq')")
+
+    for statement in get_tournament_change_log_triggers_ddl():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in TOURNAMENT_CHANGE_LOOKUPS:
+        for operation in OPERATIONS:
+            op.execute(f'DROP TRIGGER {table}_changes_{operation.lower()} ON {table}')
+
+        op.execute(f'DROP FUNCTION log_tournament_changes_for_{table}')
+
+    replace_bump_tournament_revision_functions('EXCLUDED.revision')
+    op.drop_index('ix_tournament_changes_tournament_id_revision', table_name='tournament_changes')
+    op.drop_table('tournament_changes')
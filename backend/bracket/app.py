@@ -11,6 +11,7 @@ from starlette.staticfiles import StaticFiles
 
 from bracket.config import Environment, config, environment, init_sentry
 from bracket.database import database
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.models.metrics import RequestDefinition, get_request_metrics
 from bracket.routes import (
     auth,
@@ -26,6 +27,7 @@ from bracket.routes import (
     tournaments,
     users,
 )
+from bracket.sql.stage_item_documents import sql_set_stage_item_document_triggers
 from bracket.utils.db_init import init_db_when_empty
 
 init_sentry()
@@ -35,9 +37,11 @@ init_sentry()
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
     await database.connect()
     await init_db_when_empty()
+    await sql_set_stage_item_document_triggers(config.use_stage_item_documents)
 
     yield
 
+    await ranking_recalculator.wait_for_all()
     if environment != Environment.CI:
         await database.disconnect()
 
@@ -1,8 +1,9 @@
-import random
+import heapq
+from bisect import bisect_left, insort
 from collections import defaultdict
 from typing import NamedTuple
 
-from heliclockter import timedelta
+from heliclockter import datetime_utc, timedelta
 
 from bracket.models.db.match import (
     Match,
@@ -10,14 +11,14 @@ from bracket.models.db.match import (
     MatchRescheduleBody,
     MatchWithDetails,
     MatchWithDetailsDefinitive,
+    ScheduledMatch,
 )
-from bracket.models.db.stage_item_inputs import StageItemInputGeneric
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.util import StageWithStageItems
 from bracket.sql.courts import get_all_courts_in_tournament
 from bracket.sql.matches import (
     sql_create_match,
-    sql_reschedule_match_and_determine_duration_and_margin,
+    sql_reschedule_matches,
 )
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.tournaments import sql_get_tournament
@@ -39,6 +40,7 @@ async def schedule_all_unscheduled_matches(tournament_id: int) -> None:
     if len(stages) < 1 or len(courts) < 1:
         return
 
+    scheduled_matches = []
     stage = stages[0]
     stage_items = sorted(stage.stage_items, key=lambda x: x.name)
     for i, stage_item in enumerate(stage_items):
@@ -48,13 +50,10 @@ async def schedule_all_unscheduled_matches(tournament_id: int) -> None:
         for round_ in stage_item.rounds:
             for match in round_.matches:
                 if match.start_time is None and match.position_in_schedule is None:
-                    await sql_reschedule_match_and_determine_duration_and_margin(
-                        assert_some(match.id),
-                        court.id,
-                        start_time,
-                        position_in_schedule,
-                        match,
-                        tournament,
+                    scheduled_matches.append(
+                        get_scheduled_match(
+                            match, court.id, start_time, position_in_schedule, tournament
+                        )
                     )
 
                 start_time += timedelta(minutes=match.duration_minutes)
@@ -70,27 +69,110 @@ async def schedule_all_unscheduled_matches(tournament_id: int) -> None:
                     position_in_schedule += 1
 
                     if match.start_time is None and match.position_in_schedule is None:
-                        await sql_reschedule_match_and_determine_duration_and_margin(
-                            assert_some(match.id),
-                            courts[-1].id,
-                            start_time,
-                            position_in_schedule,
-                            match,
-                            tournament,
+                        scheduled_matches.append(
+                            get_scheduled_match(
+                                match, courts[-1].id, start_time, position_in_schedule, tournament
+                            )
                         )
 
+    await sql_reschedule_matches(scheduled_matches)
+
+
+def get_scheduled_match(
+    match: Match,
+    court_id: int | None,
+    start_time: datetime_utc,
+    position_in_schedule: int | None,
+    tournament: Tournament,
+) -> ScheduledMatch:
+    return ScheduledMatch(
+        match_id=assert_some(match.id),
+        court_id=court_id,
+        start_time=start_time,
+        position_in_schedule=position_in_schedule,
+        duration_minutes=(
+            tournament.duration_minutes
+            if match.custom_duration_minutes is None
+            else match.custom_duration_minutes
+        ),
+        margin_minutes=(
+            tournament.margin_minutes
+            if match.custom_margin_minutes is None
+            else match.custom_margin_minutes
+        ),
+        custom_duration_minutes=match.custom_duration_minutes,
+        custom_margin_minutes=match.custom_margin_minutes,
+    )
+
 
-def has_conflict(
-    match: MatchWithDetailsDefinitive | MatchWithDetails,
-    team_defs: set[int | None],
-    matches_per_team: dict[int | None, list[Match]],
-) -> bool:
-    for team in team_defs:
-        for existing_match in matches_per_team[team]:
-            if existing_match.start_time == match.start_time:
-                return True
+TeamIntervals = list[tuple[datetime_utc, datetime_utc]]
+
+
+def get_first_free_start_time(
+    intervals: TeamIntervals, start_time: datetime_utc, duration: timedelta
+) -> datetime_utc:
+    """
+    The first time from `start_time` on at which a team with the given (sorted, non-overlapping)
+    intervals is free for `duration`.
+    """
+    index = bisect_left(intervals, (start_time,))
+    if index > 0 and intervals[index - 1][1] > start_time:
+        start_time = intervals[index - 1][1]
+
+    while index < len(intervals) and intervals[index][0] < start_time + duration:
+        start_time = max(start_time, intervals[index][1])
+        index += 1
+
+    return start_time
+
+
+def get_court_schedule(
+    matches: list[MatchWithDetailsDefinitive | MatchWithDetails],
+    court_ids: list[int],
+    tournament: Tournament,
+) -> list[ScheduledMatch]:
+    """
+    Schedules the matches in the given order. Every match is placed on the court that is free
+    first, at the first time from then on at which none of its teams plays another match.
+    """
+    if len(court_ids) < 1:
+        return []
+
+    # Courts are ordered by the time at which they are free, ties are broken by court id
+    free_courts = [(tournament.start_time, court_id) for court_id in sorted(court_ids)]
+    match_count_per_court = {court_id: 0 for court_id in court_ids}
+    intervals_per_team: defaultdict[int, TeamIntervals] = defaultdict(list)
+
+    schedule = []
+    for match in matches:
+        free_time, court_id = heapq.heappop(free_courts)
+        scheduled_match = get_scheduled_match(
+            match, court_id, free_time, match_count_per_court[court_id], tournament
+        )
+        duration = scheduled_match.end_time - scheduled_match.start_time
+        team_intervals = [
+            intervals_per_team[team_id]
+            for team_id in dict.fromkeys((match.team1_id, match.team2_id))
+            if team_id is not None
+        ]
+
+        start_time = free_time
+        while True:
+            previous_start_time = start_time
+            for intervals in team_intervals:
+                start_time = get_first_free_start_time(intervals, start_time, duration)
+            if start_time == previous_start_time:
+                break
+
+        scheduled_match = scheduled_match._replace(start_time=start_time)
+        for intervals in team_intervals:
+            insort(intervals, (start_time, scheduled_match.end_time))
+
+        schedule.append(scheduled_match)
+        match_count_per_court[court_id] += 1
+        heapq.heappush(free_courts, (scheduled_match.end_time, court_id))
 
-    return False
+    return schedule
 
 
 async def todo_schedule_all_matches(tournament_id: int) -> None:
@@ -98,87 +180,18 @@ async def todo_schedule_all_matches(tournament_id: int) -> None:
     stages = await get_full_tournament_details(tournament_id)
     courts = await get_all_courts_in_tournament(tournament_id)
 
-    match_count_per_court: dict[int, int] = {assert_some(court.id): 0 for court in courts}
-    matches_per_court: dict[int, list[Match]] = {assert_some(court.id): [] for court in courts}
-    matches_per_team: dict[int | None, list[Match]] = defaultdict(list)
-
     matches_to_schedule = [
-        match.copy(update={'court_id': None, 'position_in_schedule': None})
+        match
         for stage in stages
         for stage_item in stage.stage_items
         for round_ in stage_item.rounds
         for match in round_.matches
     ]
-    await iterative_scheduling(
-        match_count_per_court,
-        matches_per_court,
-        matches_per_team,
-        matches_to_schedule,
-        tournament,
-    )
-
-
-async def iterative_scheduling(
-    match_count_per_court: dict[int, int],
-    matches_per_court: dict[int, list[Match]],
-    matches_per_team: dict[int | None, list[Match]],
-    matches_to_schedule: list[MatchWithDetailsDefinitive | MatchWithDetails],
-    tournament: Tournament,
-) -> None:
-    attempts_since_last_write = 0
-
-    while len(matches_to_schedule) > 0:
-        attempts_since_last_write += 1
-        match = matches_to_schedule[0]
-
-        StageItemInputGeneric(
-            team_id=match.team1_id,
-            winner_from_stage_item_id=match.team1_winner_from_stage_item_id,
-            winner_position=match.team1_winner_position,
-            winner_from_match_id=match.team1_winner_from_match_id,
-        )
-        StageItemInputGeneric(
-            team_id=match.team2_id,
-            winner_from_stage_item_id=match.team2_winner_from_stage_item_id,
-            winner_position=match.team2_winner_position,
-            winner_from_match_id=match.team2_winner_from_match_id,
-        )
-        team_defs = {match.team1_id, match.team2_id}
-        court_id = sorted(match_count_per_court.items(), key=lambda x: x[1])[0][0]
-
-        try:
-            position_in_schedule = len(matches_per_court[court_id])
-            last_match = matches_per_court[court_id][-1]
-            start_time = assert_some(last_match.start_time) + timedelta(
-                minutes=match.duration_minutes
-            )
-        except IndexError:
-            start_time = tournament.start_time
-            position_in_schedule = 0
-
-        updated_match = match.copy(
-            update={
-                'start_time': start_time,
-                'position_in_schedule': position_in_schedule,
-                'court_id': court_id,
-            }
-        )
-
-        match_has_conflict = has_conflict(updated_match, team_defs, matches_per_team)
-        if match_has_conflict and attempts_since_last_write < 100:
-            continue
-
-        match_count_per_court[court_id] += 1
-        matches_per_court[court_id].append(updated_match)
-        matches_per_team[match.team1_id].append(updated_match)
-        matches_per_team[match.team2_id].append(updated_match)
-        matches_to_schedule.remove(match)
-        attempts_since_last_write = 0
-        random.shuffle(matches_to_schedule)
-
-        await sql_reschedule_match_and_determine_duration_and_margin(
-            assert_some(match.id), court_id, start_time, position_in_schedule, match, tournament
+    await sql_reschedule_matches(
+        get_court_schedule(
+            matches_to_schedule, [assert_some(court.id) for court in courts], tournament
         )
+    )
 
 
 class MatchPosition(NamedTuple):
@@ -186,30 +199,90 @@ class MatchPosition(NamedTuple):
     position: float
 
 
-async def reorder_matches_for_court(
+def reorder_matches_for_court(
     tournament: Tournament,
     scheduled_matches: list[MatchPosition],
     court_id: int,
-) -> None:
-    matches_this_court = sorted(
-        (match_pos for match_pos in scheduled_matches if match_pos.match.court_id == court_id),
-        key=lambda mp: mp.position,
-    )
+    first_changed_index: int = 0,
+) -> list[ScheduledMatch]:
+    """
+    Schedules the matches on a court one after another, in the order of their positions.
+
+    The matches before `first_changed_index` keep their start times, the matches from there on are
+    scheduled after them.
+    """
+    matches_this_court = get_matches_for_court(scheduled_matches, court_id)
 
+    rescheduled_matches = []
     last_start_time = tournament.start_time
-    for i, match_pos in enumerate(matches_this_court):
-        await sql_reschedule_match_and_determine_duration_and_margin(
-            assert_some(match_pos.match.id),
-            court_id,
-            last_start_time,
-            position_in_schedule=i,
-            match=match_pos.match,
-            tournament=tournament,
+    if 0 < first_changed_index <= len(matches_this_court):
+        last_start_time = matches_this_court[first_changed_index - 1].match.end_time
+
+    for i, match_pos in enumerate(
+        matches_this_court[first_changed_index:], start=first_changed_index
+    ):
+        rescheduled_matches.append(
+            get_scheduled_match(match_pos.match, court_id, last_start_time, i, tournament)
         )
         last_start_time = last_start_time + timedelta(
             minutes=match_pos.match.duration_minutes + match_pos.match.margin_minutes
         )
 
+    return rescheduled_matches
+
+
+def get_matches_for_court(
+    scheduled_matches: list[MatchPosition], court_id: int
+) -> list[MatchPosition]:
+    return sorted(
+        (match_pos for match_pos in scheduled_matches if match_pos.match.court_id == court_id),
+        key=lambda mp: mp.position,
+    )
+
+
+def get_first_changed_index(
+    old_matches: list[MatchPosition], new_matches: list[MatchPosition]
+) -> int:
+    """
+    The length of the longest common prefix of the orders of matches on a court.
+    """
+    for i, (old_match_pos, new_match_pos) in enumerate(zip(old_matches, new_matches)):
+        if old_match_pos.match.id != new_match_pos.match.id or old_match_pos.position != i:
+            return i
+
+    return min(len(old_matches), len(new_matches))
+
+
+def is_rescheduled(match: Match, scheduled_match: ScheduledMatch) -> bool:
+    return (
+        match.court_id,
+        match.start_time,
+        match.position_in_schedule,
+        match.duration_minutes,
+        match.margin_minutes,
+        match.custom_duration_minutes,
+        match.custom_margin_minutes,
+    ) != (
+        scheduled_match.court_id,
+        scheduled_match.start_time,
+        scheduled_match.position_in_schedule,
+        scheduled_match.duration_minutes,
+        scheduled_match.margin_minutes,
+        scheduled_match.custom_duration_minutes,
+        scheduled_match.custom_margin_minutes,
+    )
+
+
+def get_changed_matches(
+    matches: list[MatchPosition], scheduled_matches: list[ScheduledMatch]
+) -> list[ScheduledMatch]:
+    matches_by_id = {assert_some(match_pos.match.id): match_pos.match for match_pos in matches}
+    return [
+        scheduled_match
+        for scheduled_match in scheduled_matches
+        if is_rescheduled(matches_by_id[scheduled_match.match_id], scheduled_match)
+    ]
+
 
 async def handle_match_reschedule(
     tournament_id: int, body: MatchRescheduleBody, match_id: int
@@ -245,10 +318,23 @@ async def handle_match_reschedule(
         else:
             scheduled_matches.append(match_pos)
 
-    await reorder_matches_for_court(tournament, scheduled_matches, body.new_court_id)
+    # Only the matches from the first position that changed on a court onward are scheduled again,
+    # and only the matches of which the schedule changes are written
+    court_ids = [body.new_court_id]
+    if body.old_court_id != body.new_court_id:
+        court_ids.append(body.old_court_id)
+
+    rescheduled_matches = []
+    for court_id in court_ids:
+        first_changed_index = get_first_changed_index(
+            get_matches_for_court(scheduled_matches_old, court_id),
+            get_matches_for_court(scheduled_matches, court_id),
+        )
+        rescheduled_matches += reorder_matches_for_court(
+            tournament, scheduled_matches, court_id, first_changed_index
+        )
 
-    if body.new_court_id != body.old_court_id:
-        await reorder_matches_for_court(tournament, scheduled_matches, body.old_court_id)
+    await sql_reschedule_matches(get_changed_matches(scheduled_matches_old, rescheduled_matches))
 
 
 async def update_start_times_of_matches(tournament_id: int) -> None:
@@ -257,8 +343,18 @@ async def update_start_times_of_matches(tournament_id: int) -> None:
     courts = await get_all_courts_in_tournament(tournament_id)
     scheduled_matches = get_scheduled_matches(stages)
 
-    for court in courts:
-        await reorder_matches_for_court(tournament, scheduled_matches, assert_some(court.id))
+    await sql_reschedule_matches(
+        get_changed_matches(
+            scheduled_matches,
+            [
+                rescheduled_match
+                for court in courts
+                for rescheduled_match in reorder_matches_for_court(
+                    tournament, scheduled_matches, assert_some(court.id)
+                )
+            ],
+        )
+    )
 
 
 def get_scheduled_matches(stages: list[StageWithStageItems]) -> list[MatchPosition]:
@@ -1,11 +1,9 @@
 from heliclockter import datetime_utc, timedelta
 
-from bracket.logic.planning.matches import get_scheduled_matches_per_court
+from bracket.logic.planning.matches import get_scheduled_match, get_scheduled_matches_per_court
 from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
 from bracket.sql.courts import get_all_courts_in_tournament
-from bracket.sql.matches import (
-    sql_reschedule_match_and_determine_duration_and_margin,
-)
+from bracket.sql.matches import sql_reschedule_matches
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.tournaments import sql_get_tournament
 from bracket.utils.types import assert_some
@@ -42,7 +40,7 @@ async def schedule_all_matches_for_swiss_round(
     stages = await get_full_tournament_details(tournament_id)
     tournament = await sql_get_tournament(tournament_id)
     matches_per_court = get_scheduled_matches_per_court(stages)
-    rescheduling_operations = []
+    rescheduled_matches = []
 
     if len(courts) < 1:
         return
@@ -78,13 +76,12 @@ async def schedule_all_matches_for_swiss_round(
                             + timing_difference_minutes
                         }
                     )
-                    rescheduling_operations.append(
-                        sql_reschedule_match_and_determine_duration_and_margin(
-                            assert_some(last_match.match.id),
+                    rescheduled_matches.append(
+                        get_scheduled_match(
+                            last_match_adjusted,
                             court_id,
                             assert_some(last_match.match.start_time),
                             assert_some(last_match.match.position_in_schedule),
-                            last_match_adjusted,
                             tournament,
                         )
                     )
@@ -99,12 +96,8 @@ async def schedule_all_matches_for_swiss_round(
             start_time = tournament.start_time
             pos_in_schedule = 1
 
-        rescheduling_operations.append(
-            sql_reschedule_match_and_determine_duration_and_margin(
-                assert_some(match.id), court_id, start_time, pos_in_schedule, match, tournament
-            )
+        rescheduled_matches.append(
+            get_scheduled_match(match, court_id, start_time, pos_in_schedule, tournament)
         )
 
-    # TODO: if safe: await asyncio.gather(*rescheduling_operations)
-    for op in rescheduling_operations:
-        await op
+    await sql_reschedule_matches(rescheduled_matches)
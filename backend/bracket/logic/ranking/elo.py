@@ -1,19 +1,24 @@
-import math
 from collections import defaultdict
+from collections.abc import Hashable
 from decimal import Decimal
+from typing import NamedTuple
 
+from bracket.config import config
 from bracket.database import database
+from bracket.logic.ranking.elo_arrays import numpy_is_available, replay_rounds_with_arrays
+from bracket.logic.ranking.elo_common import RankingSnapshot, get_elo_score_diff
 from bracket.models.db.match import MatchWithDetailsDefinitive
 from bracket.models.db.players import START_ELO, PlayerStatistics
-from bracket.models.db.util import StageItemWithRounds
-from bracket.schema import players
-from bracket.sql.players import get_all_players_in_tournament, update_player_stats
+from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
+from bracket.sql.players import update_player_stats
 from bracket.sql.stages import get_full_tournament_details
 from bracket.sql.teams import update_team_stats
+from bracket.sql.tournaments import sql_get_tournament_revision, sql_set_ranking_revision
+from bracket.utils.cache import LRUCache
 from bracket.utils.types import assert_some
 
-K = 32
-D = 400
+# Below this number of matches, the overhead of the NumPy engine outweighs its speedup
+ARRAY_ENGINE_MIN_MATCHES = 128
 
 
 def set_statistics_for_player_or_team(
@@ -42,8 +47,102 @@ def set_statistics_for_player_or_team(
     stats[team_or_player_id].swiss_score += swiss_score_diff
 
     rating_diff = (rating_team2_before - rating_team1_before) * (1 if is_team1 else -1)
-    expected_score = Decimal(1.0 / (1.0 + math.pow(10.0, rating_diff / D)))
-    stats[team_or_player_id].elo_score += int(K * (swiss_score_diff - expected_score))
+    stats[team_or_player_id].elo_score += get_elo_score_diff(swiss_score_diff, rating_diff)
+
+
+def get_matches_to_rank(round_: RoundWithMatches) -> list[MatchWithDetailsDefinitive]:
+    if round_.is_draft:
+        return []
+
+    return [
+        match
+        for match in round_.matches
+        if isinstance(match, MatchWithDetailsDefinitive)
+        if match.team1_score != 0 or match.team2_score != 0
+    ]
+
+
+def set_statistics_for_match(
+    match: MatchWithDetailsDefinitive,
+    player_x_stats: defaultdict[int, PlayerStatistics],
+    team_x_stats: defaultdict[int, PlayerStatistics],
+) -> None:
+    rating_team1_before = (
+        sum(player_x_stats[player_id].elo_score for player_id in match.team1.player_ids)
+        / len(match.team1.player_ids)
+        if len(match.team1.player_ids) > 0
+        else START_ELO
+    )
+    rating_team2_before = (
+        sum(player_x_stats[player_id].elo_score for player_id in match.team2.player_ids)
+        / len(match.team2.player_ids)
+        if len(match.team2.player_ids) > 0
+        else START_ELO
+    )
+
+    for team_index, team in enumerate(match.teams):
+        if team.id is not None:
+            set_statistics_for_player_or_team(
+                team_index,
+                team_x_stats,
+                match,
+                team.id,
+                rating_team1_before,
+                rating_team2_before,
+            )
+
+        for player in team.players:
+            set_statistics_for_player_or_team(
+                team_index,
+                player_x_stats,
+                match,
+                assert_some(player.id),
+                rating_team1_before,
+                rating_team2_before,
+            )
+
+
+def get_ranking_snapshot(
+    matches: list[MatchWithDetailsDefinitive],
+    player_x_stats: defaultdict[int, PlayerStatistics],
+    team_x_stats: defaultdict[int, PlayerStatistics],
+) -> RankingSnapshot:
+    player_ids = {player_id for match in matches for player_id in match.player_ids}
+    team_ids = {team.id for match in matches for team in match.teams if team.id is not None}
+    return (
+        {player_id: player_x_stats[player_id].copy() for player_id in player_ids},
+        {team_id: team_x_stats[team_id].copy() for team_id in team_ids},
+    )
+
+
+def replay_rounds(
+    rounds: list[list[MatchWithDetailsDefinitive]],
+    player_x_stats: defaultdict[int, PlayerStatistics],
+    team_x_stats: defaultdict[int, PlayerStatistics],
+    *,
+    snapshot_rounds: bool = False,
+) -> list[RankingSnapshot]:
+    """
+    Applies the matches of every round to the statistics, in order.
+
+    If `snapshot_rounds` is set, returns copies of the statistics after every round of the players
+    and teams that played in that round. Large replays use the NumPy engine if it is installed.
+    """
+    if sum(len(matches) for matches in rounds) >= ARRAY_ENGINE_MIN_MATCHES:
+        if numpy_is_available():
+            return replay_rounds_with_arrays(
+                rounds, player_x_stats, team_x_stats, snapshot_rounds=snapshot_rounds
+            )
+
+    snapshots = []
+    for matches in rounds:
+        for match in matches:
+            set_statistics_for_match(match, player_x_stats, team_x_stats)
+
+        if snapshot_rounds:
+            snapshots.append(get_ranking_snapshot(matches, player_x_stats, team_x_stats))
+
+    return snapshots
 
 
 def determine_ranking_for_stage_items(
@@ -51,50 +150,105 @@ def determine_ranking_for_stage_items(
 ) -> tuple[defaultdict[int, PlayerStatistics], defaultdict[int, PlayerStatistics]]:
     player_x_stats: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
     team_x_stats: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
-    matches = [
-        match
+    rounds = [
+        get_matches_to_rank(round_) for stage_item in stage_items for round_ in stage_item.rounds
+    ]
+    replay_rounds(rounds, player_x_stats, team_x_stats)
+    return player_x_stats, team_x_stats
+
+
+RoundFingerprint = tuple[Hashable, ...]
+
+
+class RankingCheckpoint(NamedTuple):
+    """
+    The statistics after a round of the players and teams that played in that round.
+    """
+
+    fingerprint: RoundFingerprint
+    player_x_stats: dict[int, PlayerStatistics]
+    team_x_stats: dict[int, PlayerStatistics]
+
+
+ranking_checkpoints: LRUCache[int, list[RankingCheckpoint]] = LRUCache(
+    config.tournament_details_cache_size
+)
+
+
+def get_round_fingerprint(stage_item_id: int, round_: RoundWithMatches) -> RoundFingerprint:
+    """
+    Everything in a round that influences the ranking, so a checkpoint of a round can be reused
+    as long as the fingerprints of the round and of all rounds before it are unchanged.
+    """
+    return (
+        stage_item_id,
+        round_.id,
+        tuple(
+            (
+                match.team1_score,
+                match.team2_score,
+                match.team1.id,
+                match.team2.id,
+                tuple(match.team1.player_ids),
+                tuple(match.team2.player_ids),
+            )
+            for match in get_matches_to_rank(round_)
+        ),
+    )
+
+
+def restore_ranking_checkpoints(
+    checkpoints: list[RankingCheckpoint],
+) -> tuple[defaultdict[int, PlayerStatistics], defaultdict[int, PlayerStatistics]]:
+    player_x_stats: dict[int, PlayerStatistics] = {}
+    team_x_stats: dict[int, PlayerStatistics] = {}
+    for checkpoint in checkpoints:
+        player_x_stats.update(checkpoint.player_x_stats)
+        team_x_stats.update(checkpoint.team_x_stats)
+
+    # Copy the statistics, since they are modified in place while replaying the next rounds
+    return (
+        defaultdict(PlayerStatistics, {id_: stats.copy() for id_, stats in player_x_stats.items()}),
+        defaultdict(PlayerStatistics, {id_: stats.copy() for id_, stats in team_x_stats.items()}),
+    )
+
+
+def determine_ranking_for_tournament_incrementally(
+    tournament_id: int, stage_items: list[StageItemWithRounds]
+) -> tuple[defaultdict[int, PlayerStatistics], defaultdict[int, PlayerStatistics]]:
+    """
+    Same as `determine_ranking_for_stage_items`, but only replays the matches from the first round
+    that changed since the previous call for this tournament onward.
+    """
+    rounds = [
+        (get_round_fingerprint(assert_some(stage_item.id), round_), round_)
         for stage_item in stage_items
         for round_ in stage_item.rounds
-        if not round_.is_draft
-        for match in round_.matches
-        if isinstance(match, MatchWithDetailsDefinitive)
-        if match.team1_score != 0 or match.team2_score != 0
     ]
-    for match in matches:
-        rating_team1_before = (
-            sum(player_x_stats[player_id].elo_score for player_id in match.team1.player_ids)
-            / len(match.team1.player_ids)
-            if len(match.team1.player_ids) > 0
-            else START_ELO
-        )
-        rating_team2_before = (
-            sum(player_x_stats[player_id].elo_score for player_id in match.team2.player_ids)
-            / len(match.team2.player_ids)
-            if len(match.team2.player_ids) > 0
-            else START_ELO
-        )
-
-        for team_index, team in enumerate(match.teams):
-            if team.id is not None:
-                set_statistics_for_player_or_team(
-                    team_index,
-                    team_x_stats,
-                    match,
-                    team.id,
-                    rating_team1_before,
-                    rating_team2_before,
-                )
-
-            for player in team.players:
-                set_statistics_for_player_or_team(
-                    team_index,
-                    player_x_stats,
-                    match,
-                    assert_some(player.id),
-                    rating_team1_before,
-                    rating_team2_before,
-                )
+    checkpoints = ranking_checkpoints.get(tournament_id) or []
 
+    unchanged_rounds = 0
+    for checkpoint, (fingerprint, _) in zip(checkpoints, rounds):
+        if checkpoint.fingerprint != fingerprint:
+            break
+        unchanged_rounds += 1
+
+    checkpoints = checkpoints[:unchanged_rounds]
+    player_x_stats, team_x_stats = restore_ranking_checkpoints(checkpoints)
+
+    rounds_to_replay = rounds[unchanged_rounds:]
+    snapshots = replay_rounds(
+        [get_matches_to_rank(round_) for _, round_ in rounds_to_replay],
+        player_x_stats,
+        team_x_stats,
+        snapshot_rounds=True,
+    )
+    for (fingerprint, _), (player_snapshot, team_snapshot) in zip(
+        rounds_to_replay, snapshots, strict=True
+    ):
+        checkpoints.append(RankingCheckpoint(fingerprint, player_snapshot, team_snapshot))
+
+    ranking_checkpoints.set(tournament_id, checkpoints)
     return player_x_stats, team_x_stats
 
 
@@ -106,28 +260,21 @@ def determine_team_ranking_for_stage_item(
 
 
 async def recalculate_ranking_for_tournament_id(tournament_id: int) -> None:
+    # The revision is read first, so the ranking includes at least all changes up to it
+    revision = await sql_get_tournament_revision(tournament_id)
     stages = await get_full_tournament_details(tournament_id)
     stage_items = [stage_item for stage in stages for stage_item in stage.stage_items]
-    await recalculate_ranking_for_stage_items(tournament_id, stage_items)
+    await recalculate_ranking_for_stage_items(tournament_id, stage_items, revision)
 
 
 async def recalculate_ranking_for_stage_items(
-    tournament_id: int, stage_items: list[StageItemWithRounds]
+    tournament_id: int, stage_items: list[StageItemWithRounds], revision: int
 ) -> None:
-    elo_per_player, elo_per_team = determine_ranking_for_stage_items(stage_items)
-
-    for player_id, statistics in elo_per_player.items():
-        await update_player_stats(tournament_id, player_id, statistics)
-
-    for team_id, statistics in elo_per_team.items():
-        await update_team_stats(tournament_id, team_id, statistics)
-
-    all_players = await get_all_players_in_tournament(tournament_id)
-    for player in all_players:
-        if player.id not in elo_per_player:
-            await database.execute(
-                query=players.update().where(
-                    (players.c.id == player.id) & (players.c.tournament_id == tournament_id)
-                ),
-                values=PlayerStatistics().dict(),
-            )
+    elo_per_player, elo_per_team = determine_ranking_for_tournament_incrementally(
+        tournament_id, stage_items
+    )
+
+    async with database.transaction():
+        await update_player_stats(tournament_id, elo_per_player)
+        await update_team_stats(tournament_id, elo_per_team)
+        await sql_set_ranking_revision(tournament_id, revision)
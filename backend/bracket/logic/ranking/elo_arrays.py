@@ -0,0 +1,210 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any
+
+from bracket.logic.ranking.elo_common import D, K, RankingSnapshot, get_elo_score_diff
+from bracket.models.db.match import MatchWithDetailsDefinitive
+from bracket.models.db.players import START_ELO, PlayerStatistics
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, `replay_rounds` falls back to pure Python
+    np = None  # type: ignore[assignment]
+
+# The ELO score difference is truncated to an integer, so differences this close to an integer
+# are recomputed with `Decimal`, where floating point rounding could otherwise change the result
+EXACT_RECOMPUTE_MARGIN = 1e-9
+
+SWISS_SCORE_DIFFS = [Decimal('0.00'), Decimal('0.50'), Decimal('1.00')]
+
+
+def numpy_is_available() -> bool:
+    return np is not None
+
+
+class StatisticsArrays:
+    """
+    The statistics of players or teams, stored in arrays by a dense index per player or team.
+
+    Swiss scores are stored as an integer number of half points.
+    """
+
+    def __init__(self, stats: dict[int, PlayerStatistics], ids: Iterable[int]) -> None:
+        self.ids = list(dict.fromkeys([*stats.keys(), *ids]))
+        self.indices = {id_: index for index, id_ in enumerate(self.ids)}
+
+        default_stats = PlayerStatistics()
+        rows = [stats.get(id_, default_stats) for id_ in self.ids]
+        self.wins = np.array([row.wins for row in rows], dtype=np.int64)
+        self.draws = np.array([row.draws for row in rows], dtype=np.int64)
+        self.losses = np.array([row.losses for row in rows], dtype=np.int64)
+        self.elo_scores = np.array([row.elo_score for row in rows], dtype=np.int64)
+        self.half_swiss_scores = np.array(
+            [int(row.swiss_score * 2) for row in rows], dtype=np.int64
+        )
+
+    def add(self, indices: Any, wins: Any, draws: Any, losses: Any, elo_scores: Any) -> None:
+        np.add.at(self.wins, indices, wins)
+        np.add.at(self.draws, indices, draws)
+        np.add.at(self.losses, indices, losses)
+        np.add.at(self.elo_scores, indices, elo_scores)
+        np.add.at(self.half_swiss_scores, indices, 2 * wins + draws)
+
+    def get_statistics(self, ids: Iterable[int]) -> dict[int, PlayerStatistics]:
+        indices = [self.indices[id_] for id_ in ids]
+        return {
+            self.ids[index]: PlayerStatistics.construct(
+                wins=wins,
+                draws=draws,
+                losses=losses,
+                elo_score=elo_score,
+                swiss_score=Decimal(half_swiss_score * 50).scaleb(-2),
+            )
+            for index, wins, draws, losses, elo_score, half_swiss_score in zip(
+                indices,
+                self.wins[indices].tolist(),
+                self.draws[indices].tolist(),
+                self.losses[indices].tolist(),
+                self.elo_scores[indices].tolist(),
+                self.half_swiss_scores[indices].tolist(),
+            )
+        }
+
+
+def split_into_independent_batches(
+    matches: list[MatchWithDetailsDefinitive],
+) -> list[list[MatchWithDetailsDefinitive]]:
+    """
+    Splits consecutive matches into batches in which no match involves a player whose rating was
+    changed by an earlier match of the same batch, so every batch can be applied at once.
+    """
+    batches: list[list[MatchWithDetailsDefinitive]] = []
+    changed_player_ids: set[int] = set()
+    for match in matches:
+        player_ids = match.player_ids
+        if len(batches) < 1 or not changed_player_ids.isdisjoint(player_ids):
+            batches.append([])
+            changed_player_ids = set()
+
+        batches[-1].append(match)
+        changed_player_ids.update(player_ids)
+
+    return batches
+
+
+def apply_matches(
+    matches: list[MatchWithDetailsDefinitive],
+    players: StatisticsArrays,
+    teams: StatisticsArrays,
+) -> None:
+    # Every match has two sides, side `2 * i` is team 1 of match `i` and `2 * i + 1` is team 2
+    player_indices: list[int] = []
+    player_sides: list[int] = []
+    team_indices: list[int] = []
+    team_sides: list[int] = []
+    for match_index, match in enumerate(matches):
+        for team_index, team in enumerate(match.teams):
+            side = 2 * match_index + team_index
+            if team.id is not None:
+                team_indices.append(teams.indices[team.id])
+                team_sides.append(side)
+            for player_id in team.player_ids:
+                player_indices.append(players.indices[player_id])
+                player_sides.append(side)
+
+    side_count = 2 * len(matches)
+    # The sums of integer ELO scores are exact in float64, like the sums in `elo.py`
+    rating_sums = np.bincount(
+        player_sides,
+        weights=players.elo_scores[player_indices].astype(np.float64),
+        minlength=side_count,
+    )
+    player_counts = np.bincount(player_sides, minlength=side_count)
+    ratings = np.where(
+        player_counts > 0, rating_sums / np.maximum(player_counts, 1), float(START_ELO)
+    ).reshape(-1, 2)
+    rating_diffs = ratings[:, 1] - ratings[:, 0]
+    rating_diffs = np.stack([rating_diffs, -rating_diffs], axis=1).reshape(-1)
+
+    scores = np.array([(match.team1_score, match.team2_score) for match in matches])
+    opponent_scores = scores[:, ::-1].reshape(-1)
+    scores = scores.reshape(-1)
+    wins = (scores > opponent_scores).astype(np.int64)
+    draws = (scores == opponent_scores).astype(np.int64)
+    losses = (scores < opponent_scores).astype(np.int64)
+    half_points = 2 * wins + draws
+
+    expected_scores = 1.0 / (1.0 + np.power(10.0, rating_diffs / D))
+    elo_score_diffs_float = K * (half_points / 2 - expected_scores)
+    elo_score_diffs = np.trunc(elo_score_diffs_float).astype(np.int64)
+    close_to_integer = np.abs(elo_score_diffs_float - np.rint(elo_score_diffs_float))
+    for side in np.flatnonzero(close_to_integer < EXACT_RECOMPUTE_MARGIN).tolist():
+        elo_score_diffs[side] = get_elo_score_diff(
+            SWISS_SCORE_DIFFS[half_points[side]], float(rating_diffs[side])
+        )
+
+    player_sides_array = np.array(player_sides, dtype=np.int64)
+    team_sides_array = np.array(team_sides, dtype=np.int64)
+    players.add(
+        np.array(player_indices, dtype=np.int64),
+        wins[player_sides_array],
+        draws[player_sides_array],
+        losses[player_sides_array],
+        elo_score_diffs[player_sides_array],
+    )
+    teams.add(
+        np.array(team_indices, dtype=np.int64),
+        wins[team_sides_array],
+        draws[team_sides_array],
+        losses[team_sides_array],
+        elo_score_diffs[team_sides_array],
+    )
+
+
+def replay_rounds_with_arrays(
+    rounds: list[list[MatchWithDetailsDefinitive]],
+    player_x_stats: defaultdict[int, PlayerStatistics],
+    team_x_stats: defaultdict[int, PlayerStatistics],
+    *,
+    snapshot_rounds: bool = False,
+) -> list[RankingSnapshot]:
+    """
+    Same as `replay_rounds`, but applies independent matches at once using NumPy.
+
+    The results are identical to those of `replay_rounds`, including the rounding of ELO scores.
+    """
+    all_matches = [match for matches in rounds for match in matches]
+    players = StatisticsArrays(
+        player_x_stats, (player_id for match in all_matches for player_id in match.player_ids)
+    )
+    teams = StatisticsArrays(
+        team_x_stats,
+        (team.id for match in all_matches for team in match.teams if team.id is not None),
+    )
+
+    snapshots = []
+    for matches in rounds if snapshot_rounds else [all_matches]:
+        for batch in split_into_independent_batches(matches):
+            apply_matches(batch, players, teams)
+
+        if snapshot_rounds:
+            snapshots.append(
+                (
+                    players.get_statistics(
+                        {player_id: None for match in matches for player_id in match.player_ids}
+                    ),
+                    teams.get_statistics(
+                        {
+                            team.id: None
+                            for match in matches
+                            for team in match.teams
+                            if team.id is not None
+                        }
+                    ),
+                )
+            )
+
+    player_x_stats.update(players.get_statistics(players.ids))
+    team_x_stats.update(teams.get_statistics(teams.ids))
+    return snapshots
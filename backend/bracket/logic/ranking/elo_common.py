@@ -0,0 +1,14 @@
+import math
+from decimal import Decimal
+
+from bracket.models.db.players import PlayerStatistics
+
+K = 32
+D = 400
+
+RankingSnapshot = tuple[dict[int, PlayerStatistics], dict[int, PlayerStatistics]]
+
+
+def get_elo_score_diff(swiss_score_diff: Decimal, rating_diff: float) -> int:
+    expected_score = Decimal(1.0 / (1.0 + math.pow(10.0, rating_diff / D)))
+    return int(K * (swiss_score_diff - expected_score))
@@ -0,0 +1,74 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from bracket.config import config
+from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.utils.events import tournament_events
+from bracket.utils.logging import logger
+
+
+class RankingRecalculator:
+    """
+    Recalculates the ranking of tournaments in the background, shortly after they changed.
+
+    All changes to a tournament that are scheduled while a recalculation is pending result in a
+    single recalculation. Changes that are scheduled while it runs result in one more.
+    """
+
+    def __init__(self, recalculate: Callable[[int], Awaitable[None]], delay_seconds: float) -> None:
+        self.recalculate = recalculate
+        self.delay_seconds = delay_seconds
+        self._scheduled: set[int] = set()
+        self._tasks: dict[int, asyncio.Task[None]] = {}
+        self._flush_requests: dict[int, asyncio.Event] = {}
+
+    def schedule(self, tournament_id: int) -> None:
+        self._scheduled.add(tournament_id)
+        if tournament_id not in self._tasks:
+            self._flush_requests[tournament_id] = asyncio.Event()
+            self._tasks[tournament_id] = asyncio.create_task(self._run(tournament_id))
+
+    async def wait(self, tournament_id: int) -> None:
+        """
+        Recalculates the pending changes of the tournament without delay and waits until the
+        ranking includes them.
+        """
+        task = self._tasks.get(tournament_id)
+        if task is not None:
+            self._flush_requests[tournament_id].set()
+            await asyncio.shield(task)
+
+    async def wait_for_all(self) -> None:
+        while len(self._tasks) > 0:
+            await self.wait(next(iter(self._tasks)))
+
+    async def _run(self, tournament_id: int) -> None:
+        flush_request = self._flush_requests[tournament_id]
+        try:
+            while tournament_id in self._scheduled:
+                # On Python 3.10, `wait_for` raises `asyncio.TimeoutError`, which is not the builtin
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(flush_request.wait(), self.delay_seconds)
+
+                # Changes scheduled after this flush are delayed again
+                flush_request.clear()
+
+                self._scheduled.discard(tournament_id)
+                try:
+                    await self.recalculate(tournament_id)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception(f'Could not recalculate ranking of tournament {tournament_id}')
+        finally:
+            del self._tasks[tournament_id]
+            del self._flush_requests[tournament_id]
+
+
+async def recalculate_ranking_and_publish(tournament_id: int) -> None:
+    await recalculate_ranking_for_tournament_id(tournament_id)
+    tournament_events.publish(tournament_id)
+
+
+ranking_recalculator = RankingRecalculator(
+    recalculate_ranking_and_publish, config.ranking_recalculation_delay_seconds
+)
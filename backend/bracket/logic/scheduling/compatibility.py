@@ -0,0 +1,133 @@
+from collections.abc import Iterator
+
+from bracket.config import config
+from bracket.models.db.match import MatchWithDetailsDefinitive
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.models.db.util import RoundWithMatches
+from bracket.utils.cache import LRUCache
+from bracket.utils.types import assert_some
+
+
+def iterate_bits(bitmap: int) -> Iterator[int]:
+    while bitmap:
+        lowest_bit = bitmap & -bitmap
+        yield lowest_bit.bit_length() - 1
+        bitmap ^= lowest_bit
+
+
+class CompatibilityIndex:
+    """
+    Which teams of a stage item played each other and which teams share players, as bitmaps.
+
+    Bit `i` of a bitmap refers to the team at `team_ids[i]`, teams are ordered by id. Matches that
+    are added to the stage item are applied incrementally, other changes require a new index.
+    """
+
+    def __init__(self, teams: list[FullTeamWithPlayers]) -> None:
+        sorted_teams = sorted(teams, key=lambda team: assert_some(team.id))
+        self.team_ids = [assert_some(team.id) for team in sorted_teams]
+        self.indices = {team_id: index for index, team_id in enumerate(self.team_ids)}
+        self.player_ids = [tuple(team.player_ids) for team in sorted_teams]
+
+        teams_per_player: dict[int, int] = {}
+        for index, player_ids in enumerate(self.player_ids):
+            for player_id in player_ids:
+                teams_per_player[player_id] = teams_per_player.get(player_id, 0) | 1 << index
+
+        self.shared_players = [
+            self.get_bit(index) | self.get_teams_of_players(player_ids, teams_per_player)
+            for index, player_ids in enumerate(self.player_ids)
+        ]
+        self.played_before = [0] * len(self.team_ids)
+        self.times_played = [0] * len(self.team_ids)
+        self.matches: dict[int, tuple[int, int]] = {}
+
+    @staticmethod
+    def get_bit(index: int) -> int:
+        return 1 << index
+
+    @staticmethod
+    def get_teams_of_players(player_ids: tuple[int, ...], teams_per_player: dict[int, int]) -> int:
+        bitmap = 0
+        for player_id in player_ids:
+            bitmap |= teams_per_player[player_id]
+        return bitmap
+
+    def has_teams(self, teams: list[FullTeamWithPlayers]) -> bool:
+        sorted_teams = sorted(teams, key=lambda team: assert_some(team.id))
+        return self.team_ids == [team.id for team in sorted_teams] and self.player_ids == [
+            tuple(team.player_ids) for team in sorted_teams
+        ]
+
+    def add_match(self, match_id: int | None, team1_id: int, team2_id: int) -> None:
+        if match_id is not None:
+            self.matches[match_id] = (team1_id, team2_id)
+
+        index1, index2 = self.indices.get(team1_id), self.indices.get(team2_id)
+        if index1 is not None:
+            self.times_played[index1] += 1
+        if index2 is not None:
+            self.times_played[index2] += 1
+        if index1 is not None and index2 is not None:
+            self.played_before[index1] |= self.get_bit(index2)
+            self.played_before[index2] |= self.get_bit(index1)
+
+    def add_new_matches(self, matches: list[tuple[int | None, int, int]]) -> bool:
+        """
+        Adds the matches that were not added yet. Returns `False` without adding any match if
+        matches that were added before changed teams or were removed, or if a match has no id.
+        """
+        new_matches = []
+        known_match_count = 0
+        for match_id, team1_id, team2_id in matches:
+            if match_id is None:
+                return False
+
+            known_team_ids = self.matches.get(match_id)
+            if known_team_ids is None:
+                new_matches.append((match_id, team1_id, team2_id))
+            elif known_team_ids != (team1_id, team2_id):
+                return False
+            else:
+                known_match_count += 1
+
+        if known_match_count != len(self.matches):
+            return False
+
+        for match_id, team1_id, team2_id in new_matches:
+            self.add_match(match_id, team1_id, team2_id)
+
+        return True
+
+
+compatibility_indices: LRUCache[int, CompatibilityIndex] = LRUCache(
+    config.tournament_details_cache_size
+)
+
+
+def get_definitive_matches(rounds: list[RoundWithMatches]) -> list[tuple[int | None, int, int]]:
+    return [
+        (match.id, assert_some(match.team1.id), assert_some(match.team2.id))
+        for round_ in rounds
+        for match in round_.matches
+        if isinstance(match, MatchWithDetailsDefinitive)
+    ]
+
+
+def get_compatibility_index(
+    stage_item_id: int, rounds: list[RoundWithMatches], teams: list[FullTeamWithPlayers]
+) -> CompatibilityIndex:
+    matches = get_definitive_matches(rounds)
+    index = compatibility_indices.get(stage_item_id)
+    if index is not None and index.has_teams(teams) and index.add_new_matches(matches):
+        return index
+
+    index = CompatibilityIndex(teams)
+    for match_id, team1_id, team2_id in matches:
+        index.add_match(match_id, team1_id, team2_id)
+
+    # Matches without an id are not stored yet, they cannot be told apart later
+    if all(match_id is not None for match_id, _, _ in matches):
+        compatibility_indices.set(stage_item_id, index)
+
+    return index
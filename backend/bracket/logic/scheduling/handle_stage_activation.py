@@ -1,64 +1,103 @@
 from bracket.logic.ranking.elo import (
     determine_team_ranking_for_stage_item,
 )
-from bracket.models.db.match import MatchWithDetails
-from bracket.sql.matches import sql_get_match, sql_update_team_ids_for_match
-from bracket.sql.stage_items import get_stage_item
+from bracket.models.db.match import Match, MatchWithDetails
+from bracket.models.db.players import PlayerStatistics
+from bracket.models.db.util import StageWithStageItems
+from bracket.sql.matches import sql_get_match, sql_update_team_ids_for_matches
 from bracket.sql.stages import get_full_tournament_details
 from bracket.utils.types import assert_some
 
 
-async def determine_team_id(
-    tournament_id: int,
-    winner_from_stage_item_id: int | None,
-    winner_position: int | None,
-    winner_from_match_id: int | None,
-) -> int | None:
-    if winner_from_stage_item_id is not None and winner_position is not None:
-        stage_item = await get_stage_item(tournament_id, winner_from_stage_item_id)
-        assert stage_item is not None
+class TeamIdResolver:
+    """
+    Resolves the teams of matches that take the winners of stage items or other matches, using the
+    details of the tournament that are loaded once.
 
-        team_ranking = determine_team_ranking_for_stage_item(stage_item)
-        if len(team_ranking) >= winner_position:
-            return team_ranking[winner_position - 1][0]
+    Every stage item is ranked at most once. The team ids that were resolved are used when later
+    matches take the winner of a match that was resolved earlier.
+    """
 
-        return None
+    def __init__(self, stages: list[StageWithStageItems]) -> None:
+        self.stage_items = {
+            stage_item.id: stage_item for stage in stages for stage_item in stage.stage_items
+        }
+        self.matches: dict[int, Match] = {
+            assert_some(match.id): match
+            for stage_item in self.stage_items.values()
+            for round_ in stage_item.rounds
+            for match in round_.matches
+        }
+        self.team_rankings: dict[int, list[tuple[int, PlayerStatistics]]] = {}
+        self.resolved_team_ids: dict[int, tuple[int | None, int | None]] = {}
 
-    if winner_from_match_id is not None:
-        match = await sql_get_match(winner_from_match_id)
-        winner_index = match.get_winner_index()
-        if winner_index is not None:
-            team_id = match.team1_id if match.get_winner_index() == 1 else match.team2_id
-            assert team_id is not None
-            return team_id
+    def get_team_ranking(self, stage_item_id: int) -> list[tuple[int, PlayerStatistics]]:
+        if stage_item_id not in self.team_rankings:
+            stage_item = self.stage_items.get(stage_item_id)
+            assert stage_item is not None
+            self.team_rankings[stage_item_id] = determine_team_ranking_for_stage_item(stage_item)
 
-        return None
+        return self.team_rankings[stage_item_id]
 
-    raise ValueError('Unexpected match type')
+    async def get_match(self, match_id: int) -> Match:
+        match = self.matches.get(match_id)
+        if match is None:
+            match = self.matches[match_id] = await sql_get_match(match_id)
 
+        if match_id in self.resolved_team_ids:
+            team1_id, team2_id = self.resolved_team_ids[match_id]
+            return match.copy(update={'team1_id': team1_id, 'team2_id': team2_id})
 
-async def set_team_ids_for_match(tournament_id: int, match: MatchWithDetails) -> None:
-    team1_id = await determine_team_id(
-        tournament_id,
-        match.team1_winner_from_stage_item_id,
-        match.team1_winner_position,
-        match.team1_winner_from_match_id,
-    )
-    team2_id = await determine_team_id(
-        tournament_id,
-        match.team2_winner_from_stage_item_id,
-        match.team2_winner_position,
-        match.team2_winner_from_match_id,
-    )
+        return match
 
-    await sql_update_team_ids_for_match(assert_some(match.id), team1_id, team2_id)
+    async def determine_team_id(
+        self,
+        winner_from_stage_item_id: int | None,
+        winner_position: int | None,
+        winner_from_match_id: int | None,
+    ) -> int | None:
+        if winner_from_stage_item_id is not None and winner_position is not None:
+            team_ranking = self.get_team_ranking(winner_from_stage_item_id)
+            if len(team_ranking) >= winner_position:
+                return team_ranking[winner_position - 1][0]
+
+            return None
+
+        if winner_from_match_id is not None:
+            match = await self.get_match(winner_from_match_id)
+            winner_index = match.get_winner_index()
+            if winner_index is not None:
+                team_id = match.team1_id if winner_index == 1 else match.team2_id
+                assert team_id is not None
+                return team_id
+
+            return None
+
+        raise ValueError('Unexpected match type')
+
+    async def resolve_team_ids(self, match: MatchWithDetails) -> None:
+        team1_id = await self.determine_team_id(
+            match.team1_winner_from_stage_item_id,
+            match.team1_winner_position,
+            match.team1_winner_from_match_id,
+        )
+        team2_id = await self.determine_team_id(
+            match.team2_winner_from_stage_item_id,
+            match.team2_winner_position,
+            match.team2_winner_from_match_id,
+        )
+        self.resolved_team_ids[assert_some(match.id)] = (team1_id, team2_id)
 
 
 async def update_matches_in_activated_stage(tournament_id: int, stage_id: int) -> None:
-    [stage] = await get_full_tournament_details(tournament_id, stage_id=stage_id)
+    stages = await get_full_tournament_details(tournament_id)
+    resolver = TeamIdResolver(stages)
 
+    [stage] = [stage for stage in stages if stage.id == stage_id]
     for stage_item in stage.stage_items:
         for round_ in stage_item.rounds:
             for match in round_.matches:
                 if isinstance(match, MatchWithDetails):
-                    await set_team_ids_for_match(tournament_id, match)
+                    await resolver.resolve_team_ids(match)
+
+    await sql_update_team_ids_for_matches(resolver.resolved_team_ids)
@@ -1,19 +1,27 @@
-import random
-from collections import defaultdict
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from decimal import Decimal
+from random import Random
+from typing import NamedTuple
 
+import networkx as nx
 from fastapi import HTTPException
 
-from bracket.logic.scheduling.shared import check_team_combination_adheres_to_filter
-from bracket.models.db.match import (
-    MatchFilter,
-    MatchWithDetailsDefinitive,
-    SuggestedMatch,
-    get_match_hash,
-)
+from bracket.config import config
+from bracket.logic.scheduling.compatibility import get_compatibility_index, iterate_bits
+from bracket.models.db.match import MatchFilter, MatchWithDetailsDefinitive, SuggestedMatch
 from bracket.models.db.team import FullTeamWithPlayers
 from bracket.models.db.util import RoundWithMatches
+from bracket.utils.cache import LRUCache
 from bracket.utils.types import assert_some
 
+# A difference of one point in Swiss score costs as much as this difference in ELO score
+SWISS_SCORE_DIFF_COST = 1000
+# Every match that a team played less than the team that played most weighs this much, so teams
+# that are behind schedule are paired first when not every team can be paired
+BEHIND_SCHEDULE_WEIGHT = 1_000_000
+PAIRING_NEIGHBOURS = 8
+
 
 def get_draft_round_team_ids(draft_round: RoundWithMatches) -> list[int]:
     return [
@@ -24,31 +32,222 @@ def get_draft_round_team_ids(draft_round: RoundWithMatches) -> list[int]:
     ]
 
 
-def get_previous_matches_hashes(rounds: list[RoundWithMatches]) -> frozenset[str]:
-    return frozenset(
-        [
-            hash_
+def get_draft_round(rounds: list[RoundWithMatches]) -> RoundWithMatches:
+    draft_round = next((round_ for round_ in rounds if round_.is_draft), None)
+
+    if draft_round is None:
+        raise HTTPException(400, 'There is no draft round, so no matches can be scheduled.')
+
+    return draft_round
+
+
+class PairingCandidate(NamedTuple):
+    team1: FullTeamWithPlayers
+    team2: FullTeamWithPlayers
+    elo_diff: Decimal
+    swiss_diff: Decimal
+    is_recommended: bool
+
+    def to_suggested_match(self) -> SuggestedMatch:
+        return SuggestedMatch(
+            team1=self.team1,
+            team2=self.team2,
+            elo_diff=self.elo_diff,
+            swiss_diff=self.swiss_diff,
+            is_recommended=self.is_recommended,
+            player_behind_schedule_count=0,
+        )
+
+
+def get_pairing_candidates(
+    filter_: MatchFilter,
+    rounds: list[RoundWithMatches],
+    teams: list[FullTeamWithPlayers],
+) -> tuple[list[PairingCandidate], dict[int, int]]:
+    """
+    All pairs of teams that are not scheduled in the draft round yet, did not play each other
+    before, do not share players and adhere to the filter. The team with the lowest id is `team1`.
+
+    Also returns the number of matches every team that can be scheduled played so far.
+    """
+    draft_round = get_draft_round(rounds)
+    draft_round_team_ids = frozenset(get_draft_round_team_ids(draft_round))
+    sorted_teams = sorted(teams, key=lambda team: assert_some(team.id))
+    index = get_compatibility_index(draft_round.stage_item_id, rounds, sorted_teams)
+    positions_to_schedule = [
+        position
+        for position, team in enumerate(sorted_teams)
+        if team.id not in draft_round_team_ids and team.active
+    ]
+
+    if len(positions_to_schedule) < 1:
+        return [], {}
+
+    min_times_played = min(index.times_played[position] for position in positions_to_schedule)
+    elo_scores = {position: sorted_teams[position].get_elo() for position in positions_to_schedule}
+    swiss_scores = {
+        position: sorted_teams[position].get_swiss_score() for position in positions_to_schedule
+    }
+
+    # The teams within the ELO threshold of a team are a range of the teams ordered by ELO score,
+    # `elo_range_bitmaps[i]` holds the first `i` of those teams
+    positions_by_elo = sorted(positions_to_schedule, key=lambda position: elo_scores[position])
+    sorted_elo_scores = [elo_scores[position] for position in positions_by_elo]
+    elo_range_bitmaps = [0]
+    for position in positions_by_elo:
+        elo_range_bitmaps.append(elo_range_bitmaps[-1] | 1 << position)
+
+    candidates = []
+    for position1 in positions_to_schedule:
+        elo_score = elo_scores[position1]
+        elo_range_start = bisect_left(sorted_elo_scores, elo_score - filter_.elo_diff_threshold)
+        elo_range_end = bisect_right(sorted_elo_scores, elo_score + filter_.elo_diff_threshold)
+        compatible_teams = (
+            (elo_range_bitmaps[elo_range_end] ^ elo_range_bitmaps[elo_range_start])
+            & ~index.played_before[position1]
+            & ~index.shared_players[position1]
+            # Every pair is considered once, with the team that has the lowest id as team 1
+            & ~((2 << position1) - 1)
+        )
+        for position2 in iterate_bits(compatible_teams):
+            is_recommended = (
+                min(index.times_played[position1], index.times_played[position2])
+                <= min_times_played
+            )
+            if filter_.only_recommended and not is_recommended:
+                continue
+
+            candidates.append(
+                PairingCandidate(
+                    team1=sorted_teams[position1],
+                    team2=sorted_teams[position2],
+                    elo_diff=abs(elo_score - elo_scores[position2]),
+                    swiss_diff=abs(swiss_scores[position1] - swiss_scores[position2]),
+                    is_recommended=is_recommended,
+                )
+            )
+
+    return candidates, {
+        index.team_ids[position]: index.times_played[position] for position in positions_to_schedule
+    }
+
+
+MatchSetRevision = tuple[
+    tuple[tuple[int | None, int | None, int | None], ...],
+    tuple[tuple[int | None, Decimal, Decimal, tuple[int, ...]], ...],
+]
+
+
+class SwissSuggestions(NamedTuple):
+    revision: MatchSetRevision
+    scheduled_team_ids: frozenset[int]
+    # Ordered by ELO difference, pairs with the same difference are ordered by the seed
+    candidates: list[PairingCandidate]
+    times_played_per_team: dict[int, int]
+
+
+# Keyed by the id of the draft round, the ELO difference threshold and the seed
+SwissSuggestionsKey = tuple[int, int, int | None]
+
+swiss_suggestions_cache: LRUCache[SwissSuggestionsKey, SwissSuggestions] = LRUCache(
+    config.tournament_details_cache_size
+)
+
+
+def get_match_set_revision(
+    rounds: list[RoundWithMatches], teams: list[FullTeamWithPlayers]
+) -> MatchSetRevision:
+    """
+    Everything the suggestions depend on, apart from the matches in the draft round.
+    """
+    return (
+        tuple(
+            (match.id, match.team1_id, match.team2_id)
             for round_ in rounds
+            if not round_.is_draft
             for match in round_.matches
-            if isinstance(match, MatchWithDetailsDefinitive)
-            for hash_ in match.get_team_ids_hashes()
-        ]
+        ),
+        tuple(
+            (team.id, team.get_elo(), team.get_swiss_score(), tuple(team.player_ids))
+            for team in teams
+            if team.active
+        ),
+    )
+
+
+def get_swiss_suggestions(
+    filter_: MatchFilter,
+    rounds: list[RoundWithMatches],
+    teams: list[FullTeamWithPlayers],
+    revision: MatchSetRevision,
+) -> SwissSuggestions:
+    candidates, times_played_per_team = get_pairing_candidates(
+        filter_.copy(update={'only_recommended': False}), rounds, teams
+    )
+    if filter_.seed is not None:
+        Random(filter_.seed).shuffle(candidates)
+
+    return SwissSuggestions(
+        revision=revision,
+        scheduled_team_ids=frozenset(get_draft_round_team_ids(get_draft_round(rounds))),
+        candidates=sorted(candidates, key=lambda candidate: candidate.elo_diff),
+        times_played_per_team=times_played_per_team,
+    )
+
+
+def remove_scheduled_teams(
+    suggestions: SwissSuggestions, scheduled_team_ids: frozenset[int]
+) -> SwissSuggestions:
+    newly_scheduled_team_ids = scheduled_team_ids - suggestions.scheduled_team_ids
+    if len(newly_scheduled_team_ids) < 1:
+        return suggestions
+
+    return SwissSuggestions(
+        revision=suggestions.revision,
+        scheduled_team_ids=scheduled_team_ids,
+        candidates=[
+            candidate
+            for candidate in suggestions.candidates
+            if candidate.team1.id not in newly_scheduled_team_ids
+            and candidate.team2.id not in newly_scheduled_team_ids
+        ],
+        times_played_per_team={
+            team_id: times_played
+            for team_id, times_played in suggestions.times_played_per_team.items()
+            if team_id not in newly_scheduled_team_ids
+        },
     )
 
 
-def get_number_of_teams_played_per_team(
-    rounds: list[RoundWithMatches], excluded_team_ids: frozenset[int]
-) -> dict[int, int]:
-    result: dict[int, int] = defaultdict(int)
+def get_cached_swiss_suggestions(
+    filter_: MatchFilter,
+    rounds: list[RoundWithMatches],
+    teams: list[FullTeamWithPlayers],
+) -> SwissSuggestions:
+    """
+    The suggestions are cached per draft round. When matches are added to the draft round, the
+    pairs with the teams of those matches are removed from the cached suggestions. Any other change
+    to the stage item or the teams requires the suggestions to be computed again.
+    """
+    draft_round = get_draft_round(rounds)
+    revision = get_match_set_revision(rounds, teams)
+    if draft_round.id is None:
+        return get_swiss_suggestions(filter_, rounds, teams, revision)
 
-    for round_ in rounds:
-        for match in round_.matches:
-            if isinstance(match, MatchWithDetailsDefinitive):
-                for team in match.teams:
-                    if team.active and team.id not in excluded_team_ids:
-                        result[assert_some(team.id)] += 1
+    key = (draft_round.id, filter_.elo_diff_threshold, filter_.seed)
+    scheduled_team_ids = frozenset(get_draft_round_team_ids(draft_round))
+    suggestions = swiss_suggestions_cache.get(key)
+    if (
+        suggestions is not None
+        and suggestions.revision == revision
+        and suggestions.scheduled_team_ids <= scheduled_team_ids
+    ):
+        suggestions = remove_scheduled_teams(suggestions, scheduled_team_ids)
+    else:
+        suggestions = get_swiss_suggestions(filter_, rounds, teams, revision)
 
-    return result
+    swiss_suggestions_cache.set(key, suggestions)
+    return suggestions
 
 
 def get_possible_upcoming_matches_for_swiss(
@@ -56,64 +255,122 @@ def get_possible_upcoming_matches_for_swiss(
     rounds: list[RoundWithMatches],
     teams: list[FullTeamWithPlayers],
 ) -> list[SuggestedMatch]:
-    suggestions: list[SuggestedMatch] = []
-    scheduled_hashes: list[str] = []
-    draft_round = next((round_ for round_ in rounds if round_.is_draft), None)
+    suggestions = get_cached_swiss_suggestions(filter_, rounds, teams)
+    times_played_per_team = suggestions.times_played_per_team
+    min_times_played = min(times_played_per_team.values(), default=0)
 
-    if draft_round is None:
-        raise HTTPException(400, 'There is no draft round, so no matches can be scheduled.')
+    # Recommended pairs come first, the other pairs are only needed if there are too few of those
+    recommended: list[PairingCandidate] = []
+    other: list[PairingCandidate] = []
+    for candidate in suggestions.candidates:
+        is_recommended = (
+            min(
+                times_played_per_team[assert_some(candidate.team1.id)],
+                times_played_per_team[assert_some(candidate.team2.id)],
+            )
+            <= min_times_played
+        )
+        if is_recommended:
+            recommended.append(candidate._replace(is_recommended=True))
+            if len(recommended) >= filter_.limit:
+                break
+        elif not filter_.only_recommended:
+            other.append(candidate._replace(is_recommended=False))
 
-    draft_round_team_ids = get_draft_round_team_ids(draft_round)
-    teams_to_schedule = [
-        team for team in teams if team.id not in draft_round_team_ids and team.active
+    return [candidate.to_suggested_match() for candidate in (recommended + other)[: filter_.limit]]
+
+
+def get_pairing_weights(
+    candidates: list[PairingCandidate], times_played_per_team: dict[int, int]
+) -> dict[tuple[int, int], int]:
+    """
+    The weight of every pairing in the maximum-weight matching. Pairing teams with similar Swiss
+    and ELO scores weighs more, and so does pairing teams that played fewer matches than others.
+    """
+    costs = [
+        int(candidate.elo_diff + candidate.swiss_diff * SWISS_SCORE_DIFF_COST)
+        for candidate in candidates
     ]
+    max_cost = max(costs, default=0)
+    max_times_played = max(times_played_per_team.values(), default=0)
+    return {
+        (assert_some(candidate.team1.id), assert_some(candidate.team2.id)): max_cost
+        + 1
+        - cost
+        + BEHIND_SCHEDULE_WEIGHT
+        * (
+            2 * max_times_played
+            - times_played_per_team[assert_some(candidate.team1.id)]
+            - times_played_per_team[assert_some(candidate.team2.id)]
+        )
+        for candidate, cost in zip(candidates, costs)
+    }
+
+
+def get_max_weight_matching(
+    weights: dict[tuple[int, int], int], edges: Iterable[tuple[int, int]]
+) -> set[tuple[int, int]]:
+    graph = nx.Graph()
+    graph.add_weighted_edges_from((team1, team2, weights[team1, team2]) for team1, team2 in edges)
+    return {
+        (min(team1, team2), max(team1, team2))
+        for team1, team2 in nx.max_weight_matching(graph, maxcardinality=True)
+    }
+
+
+def get_optimal_swiss_pairings(
+    filter_: MatchFilter,
+    rounds: list[RoundWithMatches],
+    teams: list[FullTeamWithPlayers],
+) -> list[SuggestedMatch]:
+    """
+    Pairs as many teams as possible at once, using a maximum-weight matching over all pairs of
+    teams that can play each other (see `get_pairing_weights`).
 
-    if len(teams_to_schedule) < 1:
+    To keep the runtime low for large numbers of teams, every team is only connected to the
+    `PAIRING_NEIGHBOURS` teams that follow it in the standings and that it can play. Teams that
+    remain unpaired are then connected to all teams they can play, and the matching is solved again.
+    """
+    candidates, times_played_per_team = get_pairing_candidates(filter_, rounds, teams)
+    if len(candidates) < 1:
         return []
 
-    previous_match_team_hashes = get_previous_matches_hashes(rounds)
-    times_played_per_team = dict(
-        get_number_of_teams_played_per_team(
-            rounds, excluded_team_ids=frozenset(draft_round_team_ids)
-        )
-    )
-    for team in teams_to_schedule:
-        if team.id not in times_played_per_team:
-            times_played_per_team[assert_some(team.id)] = 0
-
-    min_times_played = min(times_played_per_team.values()) if len(times_played_per_team) > 0 else 0
-
-    teams1_random = random.choices(teams_to_schedule, k=filter_.iterations)
-    teams2_random = random.choices(teams_to_schedule, k=filter_.iterations)
-
-    for t1, t2 in zip(teams1_random, teams2_random):
-        if assert_some(t1.id) > assert_some(t2.id):
-            team2, team1 = t1, t2
-        elif assert_some(t1.id) < assert_some(t2.id):
-            team1, team2 = t1, t2
-        else:
-            continue
-
-        match_hash = get_match_hash(team1.id, team2.id)
-        if get_match_hash(team1.id, team2.id) in previous_match_team_hashes:
-            continue
-
-        times_played_min = min(
-            times_played_per_team[assert_some(team1.id)],
-            times_played_per_team[assert_some(team2.id)],
-        )
-        suggested_match = check_team_combination_adheres_to_filter(
-            team1, team2, filter_, is_recommended=times_played_min <= min_times_played
-        )
-        if (
-            suggested_match
-            and match_hash not in scheduled_hashes
-            and (not filter_.only_recommended or suggested_match.is_recommended)
-        ):
-            suggestions.append(suggested_match)
-            scheduled_hashes.append(match_hash)
-            scheduled_hashes.append(get_match_hash(team2.id, team1.id))
-
-    sorted_by_elo = sorted(suggestions, key=lambda x: x.elo_diff)
-    sorted_by_times_played = sorted(sorted_by_elo, key=lambda x: x.is_recommended, reverse=True)
-    return sorted_by_times_played[: filter_.limit]
+    candidates_per_pair = {
+        (assert_some(candidate.team1.id), assert_some(candidate.team2.id)): candidate
+        for candidate in candidates
+    }
+    weights = get_pairing_weights(candidates, times_played_per_team)
+
+    teams_to_pair = {
+        assert_some(team.id): team
+        for candidate in candidates
+        for team in (candidate.team1, candidate.team2)
+    }
+    scores = {
+        team_id: (team.get_swiss_score(), team.get_elo()) for team_id, team in teams_to_pair.items()
+    }
+    standings = sorted(scores, key=lambda team_id: scores[team_id])
+    edges = set()
+    for index, team1_id in enumerate(standings):
+        neighbours = 0
+        for team2_id in standings[index + 1 :]:
+            pair = (min(team1_id, team2_id), max(team1_id, team2_id))
+            if pair in candidates_per_pair:
+                edges.add(pair)
+                neighbours += 1
+                if neighbours >= PAIRING_NEIGHBOURS:
+                    break
+
+    matching = get_max_weight_matching(weights, edges)
+    paired_team_ids = {team_id for pair in matching for team_id in pair}
+    missing_edges = {
+        pair
+        for pair in candidates_per_pair
+        if pair not in edges and (pair[0] not in paired_team_ids or pair[1] not in paired_team_ids)
+    }
+    if len(missing_edges) > 0:
+        matching = get_max_weight_matching(weights, edges | missing_edges)
+
+    # The limit drops the pairs that weigh least, so teams behind schedule keep their match
+    pairs = sorted(matching, key=lambda pair: (-weights[pair], pair))[: filter_.limit]
+    return [candidates_per_pair[pair].to_suggested_match() for pair in pairs]
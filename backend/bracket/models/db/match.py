@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import NamedTuple
 
 from heliclockter import datetime_utc, timedelta
 from pydantic import BaseModel
@@ -52,10 +53,6 @@ class MatchWithDetails(Match):
     court: Court | None
 
 
-def get_match_hash(team_1_id: int | None, team_2_id: int | None) -> str:
-    return f'{team_1_id}-{team_2_id}'
-
-
 class MatchWithDetailsDefinitive(Match):
     team1: FullTeamWithPlayers
     team2: FullTeamWithPlayers
@@ -69,12 +66,6 @@ class MatchWithDetailsDefinitive(Match):
     def team_ids(self) -> list[int]:
         return [assert_some(self.team1.id), assert_some(self.team2.id)]
 
-    def get_team_ids_hashes(self) -> list[str]:
-        return [
-            get_match_hash(self.team1_id, self.team2_id),
-            get_match_hash(self.team2_id, self.team1_id),
-        ]
-
     @property
     def player_ids(self) -> list[int]:
         return self.team1.player_ids + self.team2.player_ids
@@ -116,11 +107,29 @@ class MatchRescheduleBody(BaseModelORM):
     new_position: int
 
 
+class ScheduledMatch(NamedTuple):
+    match_id: int
+    court_id: int | None
+    start_time: datetime_utc
+    position_in_schedule: int | None
+    duration_minutes: int
+    margin_minutes: int
+    custom_duration_minutes: int | None
+    custom_margin_minutes: int | None
+
+    @property
+    def end_time(self) -> datetime_utc:
+        return datetime_utc.from_datetime(
+            self.start_time + timedelta(minutes=self.duration_minutes + self.margin_minutes)
+        )
+
+
 class MatchFilter(BaseModel):
     elo_diff_threshold: int
     only_recommended: bool
     limit: int
-    iterations: int
+    # Orders suggestions with the same ELO difference, by team id if no seed is given
+    seed: int | None = None
 
 
 class SuggestedMatch(BaseModel):
@@ -11,3 +11,27 @@ class PlayerStatistics(BaseModel):
     losses: int = 0
     elo_score: int = START_ELO
     swiss_score: Decimal = Decimal('0.00')
+
+
+class MatchResults(BaseModel):
+    wins: int
+    draws: int
+    losses: int
+    swiss_score: Decimal
+
+
+class TeamResults(MatchResults):
+    team_id: int
+
+
+class PlayerResults(MatchResults):
+    player_id: int
+
+
+class StageItemStandings(BaseModel):
+    """
+    The results of the matches in the non-draft rounds of a stage item, ordered by Swiss score.
+    """
+
+    teams: list[TeamResults]
+    players: list[PlayerResults]
@@ -4,13 +4,14 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from pydantic import root_validator, validator
+from pydantic import BaseModel, root_validator, validator
 
 from bracket.models.db.match import Match, MatchWithDetails, MatchWithDetailsDefinitive
 from bracket.models.db.round import Round
 from bracket.models.db.stage import Stage
 from bracket.models.db.stage_item import StageItem, StageType
 from bracket.models.db.stage_item_inputs import StageItemInput
+from bracket.models.db.team import FullTeamWithPlayers
 from bracket.utils.types import assert_some
 
 
@@ -66,3 +67,28 @@ class StageWithStageItems(Stage):
             return values_json
 
         return values
+
+
+class RankingStatus(BaseModel):
+    """
+    The ranking of a tournament includes all changes up to `ranking_revision`.
+    """
+
+    revision: int
+    ranking_revision: int
+
+
+class TournamentChanges(BaseModel):
+    """
+    The rows of a tournament that changed since some revision, up to `revision`.
+    """
+
+    revision: int
+    stage_items: list[StageItem]
+    rounds: list[Round]
+    matches: list[Match]
+    teams: list[FullTeamWithPlayers]
+    deleted_stage_item_ids: list[int]
+    deleted_round_ids: list[int]
+    deleted_match_ids: list[int]
+    deleted_team_ids: list[int]
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from heliclockter import datetime_utc
 from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
 
 from bracket.database import database
 from bracket.models.db.court import Court, CourtBody, CourtToInsert
@@ -13,7 +15,9 @@ from bracket.routes.models import CourtsResponse, SingleCourtResponse, SuccessRe
 from bracket.schema import courts
 from bracket.sql.courts import get_all_courts_in_tournament, update_court
 from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.tournaments import sql_get_tournament_revision
 from bracket.utils.db import fetch_one_parsed
+from bracket.utils.http import get_etag_headers, get_not_modified_response, get_revision_etag
 from bracket.utils.types import assert_some
 
 router = APIRouter()
@@ -22,8 +26,16 @@ router = APIRouter()
 @router.get("/tournaments/{tournament_id}/courts", response_model=CourtsResponse)
 async def get_courts(
     tournament_id: int,
+    request: Request,
+    response: Response,
     _: UserPublic = Depends(user_authenticated_or_public_dashboard),
-) -> CourtsResponse:
+) -> CourtsResponse | Response:
+    etag = get_revision_etag(await sql_get_tournament_revision(tournament_id))
+    not_modified_response = get_not_modified_response(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    response.headers.update(get_etag_headers(etag))
     return CourtsResponse(data=await get_all_courts_in_tournament(tournament_id))
 
 
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
 from bracket.logic.planning.matches import (
-    create_match_and_assign_free_court,
     handle_match_reschedule,
     schedule_all_unscheduled_matches,
 )
-from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.logic.scheduling.upcoming_matches import (
+    get_optimal_pairings_for_swiss_round,
     get_upcoming_matches_for_swiss_round,
 )
 from bracket.models.db.match import (
@@ -16,7 +16,6 @@ from bracket.models.db.match import (
     MatchCreateBodyFrontend,
     MatchFilter,
     MatchRescheduleBody,
-    SuggestedMatch,
 )
 from bracket.models.db.round import Round
 from bracket.models.db.user import UserPublic
@@ -25,8 +24,14 @@ from bracket.routes.auth import user_authenticated_for_tournament
 from bracket.routes.models import SingleMatchResponse, SuccessResponse, UpcomingMatchesResponse
 from bracket.routes.util import match_dependency, round_dependency, round_with_matches_dependency
 from bracket.sql.courts import get_all_courts_in_tournament
-from bracket.sql.matches import sql_create_match, sql_delete_match, sql_update_match
+from bracket.sql.matches import (
+    sql_create_match,
+    sql_create_matches,
+    sql_delete_match,
+    sql_update_match,
+)
 from bracket.sql.tournaments import sql_get_tournament
+from bracket.utils.events import tournament_events
 from bracket.utils.types import assert_some
 
 router = APIRouter()
@@ -39,9 +44,10 @@ router = APIRouter()
 async def get_matches_to_schedule(
     tournament_id: int,
     elo_diff_threshold: int = 200,
-    iterations: int = 200,
+    iterations: int | None = Query(None, deprecated=True),
     only_recommended: bool = False,
     limit: int = 50,
+    seed: int | None = None,
     _: UserPublic = Depends(user_authenticated_for_tournament),
     round_: Round = Depends(round_dependency),
 ) -> UpcomingMatchesResponse:
@@ -49,12 +55,14 @@ async def get_matches_to_schedule(
         elo_diff_threshold=elo_diff_threshold,
         only_recommended=only_recommended,
         limit=limit,
-        iterations=iterations,
+        seed=seed,
     )
 
     if not round_.is_draft:
         raise HTTPException(400, 'There is no draft round, so no matches can be scheduled.')
 
+    # Suggestions are based on the statistics of the teams, so they must include all results
+    await ranking_recalculator.wait(tournament_id)
     return UpcomingMatchesResponse(
         data=await get_upcoming_matches_for_swiss_round(match_filter, round_, tournament_id)
     )
@@ -67,7 +75,8 @@ async def delete_match(
     match: Match = Depends(match_dependency),
 ) -> SuccessResponse:
     await sql_delete_match(assert_some(match.id))
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -84,7 +93,9 @@ async def create_match(
         margin_minutes=tournament.margin_minutes,
     )
 
-    return SingleMatchResponse(data=await sql_create_match(body_with_durations))
+    match = await sql_create_match(body_with_durations)
+    tournament_events.publish(tournament_id)
+    return SingleMatchResponse(data=match)
 
 
 @router.post("/tournaments/{tournament_id}/schedule_matches", response_model=SuccessResponse)
@@ -93,6 +104,7 @@ async def schedule_matches(
     _: UserPublic = Depends(user_authenticated_for_tournament),
 ) -> SuccessResponse:
     await schedule_all_unscheduled_matches(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -106,6 +118,7 @@ async def reschedule_match(
     _: UserPublic = Depends(user_authenticated_for_tournament),
 ) -> SuccessResponse:
     await handle_match_reschedule(tournament_id, body, match_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -116,7 +129,7 @@ async def reschedule_match(
 async def create_matches_automatically(
     tournament_id: int,
     elo_diff_threshold: int = 100,
-    iterations: int = 200,
+    iterations: int | None = Query(None, deprecated=True),
     only_recommended: bool = False,
     _: UserPublic = Depends(user_authenticated_for_tournament),
     round_: RoundWithMatches = Depends(round_with_matches_dependency),
@@ -124,34 +137,26 @@ async def create_matches_automatically(
     if not round_.is_draft:
         raise HTTPException(400, 'There is no draft round, so no matches can be scheduled.')
 
+    await ranking_recalculator.wait(tournament_id)
+    courts = await get_all_courts_in_tournament(tournament_id)
+    tournament = await sql_get_tournament(tournament_id)
+
+    # The teams of all free courts are paired at once, so the pairings are optimal for the round
     match_filter = MatchFilter(
         elo_diff_threshold=elo_diff_threshold,
         only_recommended=only_recommended,
-        limit=1,
-        iterations=iterations,
+        limit=max(len(courts) - len(round_.matches), 0),
     )
+    pairings = await get_optimal_pairings_for_swiss_round(match_filter, round_, tournament_id)
 
-    courts = await get_all_courts_in_tournament(tournament_id)
-    tournament = await sql_get_tournament(tournament_id)
-
-    limit = len(courts) - len(round_.matches)
-    for __ in range(limit):
-        all_matches_to_schedule = await get_upcoming_matches_for_swiss_round(
-            match_filter, round_, tournament_id
-        )
-        if len(all_matches_to_schedule) < 1:
-            break
-
-        match = all_matches_to_schedule[0]
-        assert isinstance(match, SuggestedMatch)
-
-        assert round_.id and match.team1.id and match.team2.id
-        await create_match_and_assign_free_court(
-            tournament_id,
+    # All matches of the round are inserted in a single statement
+    assert round_.id is not None
+    await sql_create_matches(
+        [
             MatchCreateBody(
                 round_id=round_.id,
-                team1_id=match.team1.id,
-                team2_id=match.team2.id,
+                team1_id=assert_some(match.team1.id),
+                team2_id=assert_some(match.team2.id),
                 court_id=None,
                 team1_winner_from_stage_item_id=None,
                 team1_winner_position=None,
@@ -163,9 +168,12 @@ async def create_matches_automatically(
                 margin_minutes=tournament.margin_minutes,
                 custom_duration_minutes=None,
                 custom_margin_minutes=None,
-            ),
-        )
+            )
+            for match in pairings
+        ]
+    )
 
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -180,5 +188,6 @@ async def update_match_by_id(
     tournament = await sql_get_tournament(tournament_id)
 
     await sql_update_match(match.id, match_body, tournament)
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
@@ -7,6 +7,7 @@ from bracket.models.db.club import Club
 from bracket.models.db.court import Court
 from bracket.models.db.match import Match, SuggestedMatch
 from bracket.models.db.player import Player
+from bracket.models.db.players import StageItemStandings
 from bracket.models.db.stage_item_inputs import (
     StageItemInputOptionFinal,
     StageItemInputOptionTentative,
@@ -14,7 +15,7 @@ from bracket.models.db.stage_item_inputs import (
 from bracket.models.db.team import FullTeamWithPlayers, Team
 from bracket.models.db.tournament import Tournament
 from bracket.models.db.user import UserPublic
-from bracket.models.db.util import StageWithStageItems
+from bracket.models.db.util import RankingStatus, StageWithStageItems, TournamentChanges
 from bracket.routes.auth import Token
 
 DataT = TypeVar('DataT')
@@ -44,6 +45,18 @@ class TournamentsResponse(DataResponse[list[Tournament]]):
     pass
 
 
+class TournamentChangesResponse(DataResponse[TournamentChanges]):
+    pass
+
+
+class RankingStatusResponse(DataResponse[RankingStatus]):
+    pass
+
+
+class StageItemStandingsResponse(DataResponse[StageItemStandings]):
+    pass
+
+
 class PlayersResponse(DataResponse[list[Player]]):
     pass
 
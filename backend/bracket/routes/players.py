@@ -2,6 +2,8 @@ from decimal import Decimal
 
 from fastapi import APIRouter, Depends
 from heliclockter import datetime_utc
+from starlette.requests import Request
+from starlette.responses import Response
 
 from bracket.database import database
 from bracket.models.db.player import Player, PlayerBody, PlayerMultiBody, PlayerToInsert
@@ -10,7 +12,9 @@ from bracket.models.db.user import UserPublic
 from bracket.routes.auth import user_authenticated_for_tournament
 from bracket.routes.models import PlayersResponse, SinglePlayerResponse, SuccessResponse
 from bracket.schema import players
+from bracket.sql.tournaments import sql_get_tournament_revision
 from bracket.utils.db import fetch_all_parsed, fetch_one_parsed
+from bracket.utils.http import get_etag_headers, get_not_modified_response, get_revision_etag
 from bracket.utils.types import assert_some
 
 router = APIRouter()
@@ -19,9 +23,17 @@ router = APIRouter()
 @router.get("/tournaments/{tournament_id}/players", response_model=PlayersResponse)
 async def get_players(
     tournament_id: int,
+    request: Request,
+    response: Response,
     not_in_team: bool = False,
     _: UserPublic = Depends(user_authenticated_for_tournament),
-) -> PlayersResponse:
+) -> PlayersResponse | Response:
+    etag = get_revision_etag(await sql_get_tournament_revision(tournament_id))
+    not_modified_response = get_not_modified_response(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    response.headers.update(get_etag_headers(etag))
     query = players.select().where(players.c.tournament_id == tournament_id)
     if not_in_team:
         query = query.where(players.c.team_id is None)
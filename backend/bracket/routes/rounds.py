@@ -3,7 +3,7 @@ from heliclockter import datetime_utc
 from starlette import status
 
 from bracket.database import database
-from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.models.db.round import (
     Round,
     RoundCreateBody,
@@ -12,15 +12,20 @@ from bracket.models.db.round import (
 )
 from bracket.models.db.user import UserPublic
 from bracket.models.db.util import RoundWithMatches
-from bracket.routes.auth import user_authenticated_for_tournament
-from bracket.routes.models import SuccessResponse
+from bracket.routes.auth import (
+    user_authenticated_for_tournament,
+    user_authenticated_or_public_dashboard,
+)
+from bracket.routes.models import StageItemStandingsResponse, SuccessResponse
 from bracket.routes.util import (
     round_dependency,
     round_with_matches_dependency,
 )
 from bracket.schema import rounds
+from bracket.sql.rankings import sql_get_standings_snapshot
 from bracket.sql.rounds import get_next_round_name, set_round_active_or_draft
 from bracket.sql.stage_items import get_stage_item
+from bracket.utils.events import tournament_events
 
 router = APIRouter()
 
@@ -43,7 +48,8 @@ async def delete_round(
             rounds.c.id == round_id and rounds.c.tournament_id == tournament_id
         ),
     )
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -77,6 +83,7 @@ async def create_round(
     )
 
     await set_round_active_or_draft(round_id, tournament_id, is_active=False, is_draft=True)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -91,6 +98,7 @@ async def update_round_by_id(
     await set_round_active_or_draft(
         round_id, tournament_id, is_active=round_body.is_active, is_draft=round_body.is_draft
     )
+    ranking_recalculator.schedule(tournament_id)
     query = '''
         UPDATE rounds
         SET name = :name
@@ -107,4 +115,24 @@ async def update_round_by_id(
         query=query,
         values={'tournament_id': tournament_id, 'round_id': round_id, 'name': round_body.name},
     )
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
+
+
+@router.get(
+    "/tournaments/{tournament_id}/rounds/{round_id}/standings",
+    response_model=StageItemStandingsResponse,
+)
+async def get_standings_as_of_round(
+    tournament_id: int,
+    round_id: int,
+    _: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> StageItemStandingsResponse:
+    standings = await sql_get_standings_snapshot(tournament_id, round_id)
+    if standings is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"There are no standings for round {round_id}, it has not been closed yet",
+        )
+
+    return StageItemStandingsResponse(data=standings)
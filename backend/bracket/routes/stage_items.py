@@ -7,7 +7,7 @@ from bracket.logic.planning.rounds import (
     get_active_and_next_rounds,
     schedule_all_matches_for_swiss_round,
 )
-from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.logic.scheduling.builder import (
     build_matches_for_stage_item,
 )
@@ -20,14 +20,17 @@ from bracket.models.db.user import UserPublic
 from bracket.models.db.util import StageItemWithRounds
 from bracket.routes.auth import (
     user_authenticated_for_tournament,
+    user_authenticated_or_public_dashboard,
 )
-from bracket.routes.models import SuccessResponse
+from bracket.routes.models import StageItemStandingsResponse, SuccessResponse
 from bracket.routes.util import stage_item_dependency
+from bracket.sql.rankings import sql_get_stage_item_standings
 from bracket.sql.rounds import set_round_active_or_draft
 from bracket.sql.shared import sql_delete_stage_item_with_foreign_keys
 from bracket.sql.stage_items import (
     sql_create_stage_item,
 )
+from bracket.utils.events import tournament_events
 
 router = APIRouter()
 
@@ -42,10 +45,25 @@ async def delete_stage_item(
     stage_item: StageItemWithRounds = Depends(stage_item_dependency),
 ) -> SuccessResponse:
     await sql_delete_stage_item_with_foreign_keys(stage_item_id)
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
+@router.get(
+    "/tournaments/{tournament_id}/stage_items/{stage_item_id}/standings",
+    response_model=StageItemStandingsResponse,
+)
+async def get_stage_item_standings(
+    tournament_id: int,
+    stage_item_id: int,
+    _: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> StageItemStandingsResponse:
+    return StageItemStandingsResponse(
+        data=await sql_get_stage_item_standings(tournament_id, stage_item_id)
+    )
+
+
 @router.post("/tournaments/{tournament_id}/stage_items", response_model=SuccessResponse)
 async def create_stage_item(
     tournament_id: int,
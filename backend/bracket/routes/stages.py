@@ -1,8 +1,14 @@
+from collections.abc import AsyncIterator
+
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
 from starlette import status
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
+from bracket.config import config
 from bracket.database import database
-from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.logic.scheduling.builder import determine_available_inputs
 from bracket.logic.scheduling.handle_stage_activation import update_matches_in_activated_stage
 from bracket.models.db.stage import Stage, StageActivateBody, StageUpdateBody
@@ -21,29 +27,120 @@ from bracket.routes.util import stage_dependency
 from bracket.sql.stages import (
     get_full_tournament_details,
     get_next_stage_in_tournament,
+    iterate_full_tournament_details,
     sql_activate_next_stage,
     sql_create_stage,
     sql_delete_stage,
 )
 from bracket.sql.teams import get_teams_with_members
+from bracket.sql.tournaments import sql_get_tournament_revision
+from bracket.utils.cache import RevisionedLRUCache, SingleFlightTTLCache
+from bracket.utils.events import tournament_events
+from bracket.utils.http import get_etag_headers, get_not_modified_response, get_revision_etag
+from bracket.utils.streaming import encode_json
 
 router = APIRouter()
 
+# Encoded response bodies of `get_stages`, keyed by (tournament_id, no_draft_rounds)
+stages_response_cache: RevisionedLRUCache[tuple[int, bool], bytes] = RevisionedLRUCache(
+    config.tournament_details_cache_size
+)
+
+# The latest revision and encoded response body of `get_stages` for anonymous users
+public_stages_response_cache: SingleFlightTTLCache[
+    tuple[int, bool], tuple[int, bytes]
+] = SingleFlightTTLCache(
+    config.public_dashboard_cache_seconds, config.tournament_details_cache_size
+)
+
+
+async def get_stages_response_body(
+    tournament_id: int, no_draft_rounds: bool, revision: int
+) -> bytes:
+    key = (tournament_id, no_draft_rounds)
+    body = stages_response_cache.get(key, revision)
+    if body is None:
+        stages_ = await get_full_tournament_details(tournament_id, no_draft_rounds=no_draft_rounds)
+        body = JSONResponse(jsonable_encoder(StagesWithStageItemsResponse(data=stages_))).body
+        stages_response_cache.set(key, revision, body)
+
+    return body
+
+
+async def get_latest_stages_response_body(
+    tournament_id: int, no_draft_rounds: bool
+) -> tuple[int, bytes]:
+    revision = await sql_get_tournament_revision(tournament_id)
+    return revision, await get_stages_response_body(tournament_id, no_draft_rounds, revision)
+
+
+async def stream_stages(tournament_id: int, no_draft_rounds: bool) -> AsyncIterator[bytes]:
+    yield b'{"data":['
+    previous_stage_id: int | None = None
+    async for stage, stage_item in iterate_full_tournament_details(
+        tournament_id, no_draft_rounds=no_draft_rounds
+    ):
+        if stage.id != previous_stage_id:
+            if previous_stage_id is not None:
+                yield b']},'
+
+            # Leave the stage object open, so the stage items can be appended to it
+            yield encode_json(stage)[:-1] + b',"stage_items":['
+            previous_stage_id = stage.id
+        elif stage_item is not None:
+            yield b','
+
+        if stage_item is not None:
+            yield encode_json(stage_item)
+
+    if previous_stage_id is not None:
+        yield b']}'
+
+    yield b']}'
+
 
 @router.get("/tournaments/{tournament_id}/stages", response_model=StagesWithStageItemsResponse)
 async def get_stages(
     tournament_id: int,
+    request: Request,
     user: UserPublic = Depends(user_authenticated_or_public_dashboard),
     no_draft_rounds: bool = False,
-) -> StagesWithStageItemsResponse:
+    stream: bool = False,
+) -> Response:
     if no_draft_rounds is False and user is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Can't view draft rounds when not authorized",
         )
 
-    stages_ = await get_full_tournament_details(tournament_id, no_draft_rounds=no_draft_rounds)
-    return StagesWithStageItemsResponse(data=stages_)
+    body: bytes | None = None
+    if user is None and not stream:
+        # Anonymous viewers of public dashboards share a response that may be slightly outdated
+        revision, body = await public_stages_response_cache.get_or_compute(
+            (tournament_id, no_draft_rounds),
+            lambda: get_latest_stages_response_body(tournament_id, no_draft_rounds),
+        )
+    else:
+        revision = await sql_get_tournament_revision(tournament_id)
+
+    etag = get_revision_etag(revision)
+    not_modified_response = get_not_modified_response(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    if stream:
+        return StreamingResponse(
+            stream_stages(tournament_id, no_draft_rounds),
+            media_type=JSONResponse.media_type,
+            headers=get_etag_headers(etag),
+        )
+
+    if body is None:
+        body = await get_stages_response_body(tournament_id, no_draft_rounds, revision)
+
+    return Response(
+        content=body, media_type=JSONResponse.media_type, headers=get_etag_headers(etag)
+    )
 
 
 @router.delete("/tournaments/{tournament_id}/stages/{stage_id}", response_model=SuccessResponse)
@@ -67,7 +164,8 @@ async def delete_stage(
 
     await sql_delete_stage(tournament_id, stage_id)
 
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from heliclockter import datetime_utc
 from starlette import status
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from bracket.database import database
-from bracket.logic.ranking.elo import recalculate_ranking_for_tournament_id
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.models.db.team import FullTeamWithPlayers, Team, TeamBody, TeamMultiBody, TeamToInsert
 from bracket.models.db.user import UserPublic
 from bracket.routes.auth import (
@@ -14,8 +16,16 @@ from bracket.routes.models import SingleTeamResponse, SuccessResponse, TeamsWith
 from bracket.routes.util import team_dependency, team_with_players_dependency
 from bracket.schema import players_x_teams, teams
 from bracket.sql.stages import get_full_tournament_details
-from bracket.sql.teams import get_team_by_id, get_teams_with_members
+from bracket.sql.teams import (
+    get_team_by_id,
+    get_teams_with_members,
+    iterate_teams_with_members,
+)
+from bracket.sql.tournaments import sql_get_tournament_revision
 from bracket.utils.db import fetch_one_parsed
+from bracket.utils.events import tournament_events
+from bracket.utils.http import get_etag_headers, get_not_modified_response, get_revision_etag
+from bracket.utils.streaming import stream_data_list
 from bracket.utils.types import assert_some
 
 router = APIRouter()
@@ -39,13 +49,29 @@ async def update_team_members(team_id: int, tournament_id: int, player_ids: list
             & (players_x_teams.c.team_id == team_id)
         ),
     )
-    await recalculate_ranking_for_tournament_id(tournament_id)
 
 
 @router.get("/tournaments/{tournament_id}/teams", response_model=TeamsWithPlayersResponse)
 async def get_teams(
-    tournament_id: int, _: UserPublic = Depends(user_authenticated_or_public_dashboard)
-) -> TeamsWithPlayersResponse:
+    tournament_id: int,
+    request: Request,
+    response: Response,
+    _: UserPublic = Depends(user_authenticated_or_public_dashboard),
+    stream: bool = False,
+) -> TeamsWithPlayersResponse | Response:
+    etag = get_revision_etag(await sql_get_tournament_revision(tournament_id))
+    not_modified_response = get_not_modified_response(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    if stream:
+        return StreamingResponse(
+            stream_data_list(iterate_teams_with_members(tournament_id)),
+            media_type=JSONResponse.media_type,
+            headers=get_etag_headers(etag),
+        )
+
+    response.headers.update(get_etag_headers(etag))
     return TeamsWithPlayersResponse.parse_obj({'data': await get_teams_with_members(tournament_id)})
 
 
@@ -63,7 +89,8 @@ async def update_team_by_id(
         values=team_body.dict(exclude={'player_ids'}),
     )
     await update_team_members(assert_some(team.id), tournament_id, team_body.player_ids)
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
 
     return SingleTeamResponse(
         data=assert_some(
@@ -105,7 +132,8 @@ async def delete_team(
             teams.c.id == team.id and teams.c.tournament_id == tournament_id
         ),
     )
-    await recalculate_ranking_for_tournament_id(tournament_id)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
     return SuccessResponse()
 
 
@@ -124,6 +152,8 @@ async def create_team(
         ).dict(),
     )
     await update_team_members(last_record_id, tournament_id, team_to_insert.player_ids)
+    ranking_recalculator.schedule(tournament_id)
+    tournament_events.publish(tournament_id)
 
     team_result = await get_team_by_id(last_record_id, tournament_id)
     assert team_result is not None
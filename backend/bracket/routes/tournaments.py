@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile
+import asyncio
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, UploadFile
 from heliclockter import datetime_utc
 from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
 
+from bracket.config import config
 from bracket.database import database
 from bracket.logic.planning.matches import update_start_times_of_matches
 from bracket.models.db.tournament import (
@@ -17,11 +23,26 @@ from bracket.routes.auth import (
     user_authenticated_or_public_dashboard,
     user_authenticated_or_public_dashboard_by_endpoint_name,
 )
-from bracket.routes.models import SuccessResponse, TournamentResponse, TournamentsResponse
+from bracket.routes.models import (
+    RankingStatusResponse,
+    SuccessResponse,
+    TournamentChangesResponse,
+    TournamentResponse,
+    TournamentsResponse,
+)
 from bracket.schema import tournaments
-from bracket.sql.tournaments import sql_get_tournament_by_endpoint_name, sql_get_tournaments
+from bracket.sql.tournament_changes import sql_get_tournament_changes
+from bracket.sql.tournaments import (
+    get_tournament_by_endpoint_name,
+    sql_get_ranking_status,
+    sql_get_tournament_revision,
+    sql_get_tournaments,
+)
 from bracket.sql.users import get_user_access_to_club, get_which_clubs_has_user_access_to
 from bracket.utils.db import fetch_one_parsed_certain
+from bracket.utils.events import tournament_events
+from bracket.utils.http import get_etag_headers, get_not_modified_response, get_revision_etag
+from bracket.utils.streaming import encode_json
 from bracket.utils.types import assert_some
 
 router = APIRouter()
@@ -34,17 +55,99 @@ unauthorized_exception = HTTPException(
 
 @router.get("/tournaments/{tournament_id}", response_model=TournamentResponse)
 async def get_tournament(
-    tournament_id: int, user: UserPublic | None = Depends(user_authenticated_or_public_dashboard)
-) -> TournamentResponse:
-    tournament = await fetch_one_parsed_certain(
-        database, Tournament, tournaments.select().where(tournaments.c.id == tournament_id)
-    )
-    if user is None and not tournament.dashboard_public:
-        raise unauthorized_exception
+    tournament_id: int,
+    request: Request,
+    response: Response,
+    user: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> TournamentResponse | Response:
+    etag = get_revision_etag(await sql_get_tournament_revision(tournament_id))
+    query = tournaments.select().where(tournaments.c.id == tournament_id)
+
+    # Anonymous users can only view tournaments with a public dashboard
+    tournament = None
+    if user is None:
+        tournament = await fetch_one_parsed_certain(database, Tournament, query)
+        if not tournament.dashboard_public:
+            raise unauthorized_exception
 
+    not_modified_response = get_not_modified_response(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    if tournament is None:
+        tournament = await fetch_one_parsed_certain(database, Tournament, query)
+
+    response.headers.update(get_etag_headers(etag))
     return TournamentResponse(data=tournament)
 
 
+@router.get("/tournaments/{tournament_id}/changes", response_model=TournamentChangesResponse)
+async def get_tournament_changes(
+    tournament_id: int,
+    since: int = Query(ge=0),
+    no_draft_rounds: bool = False,
+    user: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> TournamentChangesResponse:
+    if no_draft_rounds is False and user is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Can't view draft rounds when not authorized",
+        )
+
+    return TournamentChangesResponse(
+        data=await sql_get_tournament_changes(tournament_id, since, no_draft_rounds=no_draft_rounds)
+    )
+
+
+@router.get("/tournaments/{tournament_id}/ranking_status", response_model=RankingStatusResponse)
+async def get_ranking_status(
+    tournament_id: int,
+    _: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+) -> RankingStatusResponse:
+    return RankingStatusResponse(data=await sql_get_ranking_status(tournament_id))
+
+
+async def stream_tournament_events(
+    tournament_id: int, last_revision: int | None
+) -> AsyncIterator[bytes]:
+    """
+    Sends a server-sent event with the revision of the tournament every time it changes.
+    """
+    with tournament_events.subscribe(tournament_id) as changed:
+        while True:
+            changed.clear()
+            revision = await sql_get_tournament_revision(tournament_id)
+            if revision != last_revision:
+                data = encode_json({'revision': revision}).decode()
+                yield f'id: {revision}\nevent: revision\ndata: {data}\n\n'.encode()
+                last_revision = revision
+            else:
+                # A comment, to keep the connection from being closed by proxies
+                yield b': ping\n\n'
+
+            try:
+                await asyncio.wait_for(changed.wait(), config.tournament_events_poll_seconds)
+            # On Python 3.10, `wait_for` raises `asyncio.TimeoutError`, which is not the builtin
+            except asyncio.TimeoutError:  # noqa: UP041
+                pass
+
+
+@router.get("/tournaments/{tournament_id}/events")
+async def get_tournament_events(
+    tournament_id: int,
+    _: UserPublic | None = Depends(user_authenticated_or_public_dashboard),
+    last_event_id: str | None = Header(None),
+) -> StreamingResponse:
+    last_revision = (
+        int(last_event_id) if last_event_id is not None and last_event_id.isdigit() else None
+    )
+    return StreamingResponse(
+        stream_tournament_events(tournament_id, last_revision),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
 @router.get("/tournaments", response_model=TournamentsResponse)
 async def get_tournaments(
     user: UserPublic | None = Depends(user_authenticated_or_public_dashboard_by_endpoint_name),
@@ -55,9 +158,7 @@ async def get_tournaments(
             raise unauthorized_exception
 
         case _, str(endpoint_name):
-            return TournamentsResponse(
-                data=[await sql_get_tournament_by_endpoint_name(endpoint_name)]
-            )
+            return TournamentsResponse(data=[await get_tournament_by_endpoint_name(endpoint_name)])
 
         case _, _ if isinstance(user, UserPublic):
             user_club_ids = await get_which_clubs_has_user_access_to(assert_some(user.id))
@@ -1,4 +1,15 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Table
+from sqlalchemy import (
+    DDL,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Sequence,
+    String,
+    Table,
+    event,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base  # type: ignore[attr-defined]
 from sqlalchemy.sql.sqltypes import BigInteger, Boolean, DateTime, Enum, Float, Text
 
@@ -102,8 +113,8 @@ matches = Table(
     Column('custom_duration_minutes', Integer, nullable=True),
     Column('custom_margin_minutes', Integer, nullable=True),
     Column('round_id', BigInteger, ForeignKey('rounds.id'), nullable=False),
-    Column('team1_id', BigInteger, ForeignKey('teams.id'), nullable=True),
-    Column('team2_id', BigInteger, ForeignKey('teams.id'), nullable=True),
+    Column('team1_id', BigInteger, ForeignKey('teams.id'), nullable=True, index=True),
+    Column('team2_id', BigInteger, ForeignKey('teams.id'), nullable=True, index=True),
     Column(
         'team1_winner_from_stage_item_id', BigInteger, ForeignKey('stage_items.id'), nullable=True
     ),
@@ -184,3 +195,355 @@ courts = Table(
     Column('created', DateTimeTZ, nullable=False),
     Column('tournament_id', BigInteger, ForeignKey('tournaments.id'), nullable=False, index=True),
 )
+
+tournament_revisions = Table(
+    'tournament_revisions',
+    metadata,
+    Column(
+        'tournament_id',
+        BigInteger,
+        ForeignKey('tournaments.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    Column('revision', BigInteger, nullable=False),
+    Column('ranking_revision', BigInteger, nullable=False, server_default='0'),
+)
+
+tournament_revision_seq = Sequence('tournament_revision_seq', metadata=metadata)
+
+# For every table that is part of a tournament, a query that maps the rows touched by a
+# statement (available as `changed_rows` in the trigger) to the ids of their tournaments.
+TOURNAMENT_ID_LOOKUPS: dict[str, str] = {
+    'tournaments': 'SELECT id FROM changed_rows',
+    'stages': 'SELECT tournament_id FROM changed_rows',
+    'stage_item_inputs': 'SELECT tournament_id FROM changed_rows',
+    'teams': 'SELECT tournament_id FROM changed_rows',
+    'players': 'SELECT tournament_id FROM changed_rows',
+    'courts': 'SELECT tournament_id FROM changed_rows',
+    'players_x_teams': '''
+        SELECT t.tournament_id FROM changed_rows
+        JOIN teams t ON t.id = changed_rows.team_id
+    ''',
+    'stage_items': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN stages s ON s.id = changed_rows.stage_id
+    ''',
+    'rounds': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN stage_items si ON si.id = changed_rows.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+    ''',
+    'matches': '''
+        SELECT s.tournament_id FROM changed_rows
+        JOIN rounds r ON r.id = changed_rows.round_id
+        JOIN stage_items si ON si.id = r.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+    ''',
+}
+
+
+def get_bump_tournament_revision_function_ddl(
+    table: str, new_revision: str = "nextval('tournament_revision_seq')"
+) -> str:
+    """
+    `new_revision` is the revision that is assigned to tournaments that have a revision already.
+    """
+    return f'''
+        CREATE OR REPLACE FUNCTION bump_tournament_revision_for_{table}() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO tournament_revisions (tournament_id, revision)
+            SELECT tournaments.id, nextval('tournament_revision_seq')
+            FROM tournaments
+            WHERE tournaments.id IN ({TOURNAMENT_ID_LOOKUPS[table]})
+            ON CONFLICT (tournament_id) DO UPDATE
+            SET revision = {new_revision};
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        '''
+
+
+def get_tournament_revision_triggers_ddl() -> list[str]:
+    """
+    Every statement that modifies a tournament (or one of its children) assigns a new revision
+    to that tournament. The revision is taken from a sequence, so values are never reused, not
+    even when a transaction is rolled back.
+
+    The new revision of an existing row is only taken after locking that row, so transactions that
+    modify the same tournament get increasing revisions in the order in which they commit.
+    """
+    statements = []
+    for table in TOURNAMENT_ID_LOOKUPS:
+        statements.append(get_bump_tournament_revision_function_ddl(table))
+
+        operations = (
+            ['INSERT', 'UPDATE'] if table == 'tournaments' else ['INSERT', 'UPDATE', 'DELETE']
+        )
+        for operation in operations:
+            transition_table = 'OLD' if operation == 'DELETE' else 'NEW'
+            statements.append(
+                f'''
+                CREATE TRIGGER {table}_revision_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {transition_table} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE PROCEDURE bump_tournament_revision_for_{table}()
+                '''
+            )
+
+    return statements
+
+
+stage_item_documents = Table(
+    'stage_item_documents',
+    metadata,
+    Column(
+        'stage_item_id',
+        BigInteger,
+        ForeignKey('stage_items.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    Column('version', BigInteger, nullable=False),
+    Column('document_version', BigInteger, nullable=True),
+    Column('document', JSONB, nullable=True),
+)
+
+# For every table of which the rows are embedded in stage item documents, a query that maps the
+# rows touched by a statement to the ids of the stage items whose documents are outdated now.
+STAGE_ITEM_ID_LOOKUPS: dict[str, str] = {
+    'stage_items': 'SELECT id FROM changed_rows',
+    'stage_item_inputs': 'SELECT stage_item_id FROM changed_rows',
+    'rounds': 'SELECT stage_item_id FROM changed_rows',
+    'matches': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN rounds r ON r.id = changed_rows.round_id
+    ''',
+    'courts': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.court_id = changed_rows.id
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'teams': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.team1_id = changed_rows.id
+        JOIN rounds r ON r.id = m.round_id
+        UNION
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.team2_id = changed_rows.id
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'players_x_teams': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.team1_id = changed_rows.team_id
+        JOIN rounds r ON r.id = m.round_id
+        UNION
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN matches m ON m.team2_id = changed_rows.team_id
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+    'players': '''
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN players_x_teams pt ON pt.player_id = changed_rows.id
+        JOIN matches m ON m.team1_id = pt.team_id
+        JOIN rounds r ON r.id = m.round_id
+        UNION
+        SELECT r.stage_item_id FROM changed_rows
+        JOIN players_x_teams pt ON pt.player_id = changed_rows.id
+        JOIN matches m ON m.team2_id = pt.team_id
+        JOIN rounds r ON r.id = m.round_id
+    ''',
+}
+
+
+def get_stage_item_document_triggers_ddl() -> list[str]:
+    """
+    Every statement that modifies a part of a stage item document assigns a new version to the
+    document. A document is only up to date if it was built for its current version.
+
+    These triggers are not part of the schema, they are only installed while stage item documents
+    are enabled (see `sql_set_stage_item_document_triggers`).
+    """
+    statements = []
+    for table, lookup in STAGE_ITEM_ID_LOOKUPS.items():
+        statements.append(
+            f'''
+            CREATE OR REPLACE FUNCTION invalidate_stage_item_documents_for_{table}()
+            RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO stage_item_documents (stage_item_id, version)
+                SELECT stage_items.id, nextval('tournament_revision_seq')
+                FROM stage_items
+                WHERE stage_items.id IN ({lookup})
+                ON CONFLICT (stage_item_id) DO UPDATE SET version = EXCLUDED.version;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            '''
+        )
+
+        # Documents of deleted stage items are removed by the foreign key cascade
+        operations = (
+            ['INSERT', 'UPDATE'] if table == 'stage_items' else ['INSERT', 'UPDATE', 'DELETE']
+        )
+        for operation in operations:
+            transition_table = 'OLD' if operation == 'DELETE' else 'NEW'
+            statements.append(
+                f'''
+                CREATE TRIGGER {table}_stage_item_documents_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {transition_table} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE PROCEDURE invalidate_stage_item_documents_for_{table}()
+                '''
+            )
+
+    return statements
+
+
+def get_drop_stage_item_document_triggers_ddl() -> list[str]:
+    statements = []
+    for table in STAGE_ITEM_ID_LOOKUPS:
+        for operation in ['INSERT', 'UPDATE', 'DELETE']:
+            trigger = f'{table}_stage_item_documents_{operation.lower()}'
+            statements.append(f'DROP TRIGGER IF EXISTS {trigger} ON {table}')
+
+        statements.append(f'DROP FUNCTION IF EXISTS invalidate_stage_item_documents_for_{table}')
+
+    return statements
+
+
+tournament_changes = Table(
+    'tournament_changes',
+    metadata,
+    Column(
+        'tournament_id',
+        BigInteger,
+        ForeignKey('tournaments.id', ondelete='CASCADE'),
+        primary_key=True,
+    ),
+    Column('table_name', Text, primary_key=True),
+    Column('row_id', BigInteger, primary_key=True),
+    Column('revision', BigInteger, nullable=False),
+    Column('deleted', Boolean, nullable=False),
+    Index('ix_tournament_changes_tournament_id_revision', 'tournament_id', 'revision'),
+)
+
+standings_snapshots = Table(
+    'standings_snapshots',
+    metadata,
+    Column('round_id', BigInteger, ForeignKey('rounds.id', ondelete='CASCADE'), primary_key=True),
+    Column(
+        'stage_item_id',
+        BigInteger,
+        ForeignKey('stage_items.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True,
+    ),
+    Column('created', DateTimeTZ, nullable=False),
+    Column('standings', JSONB, nullable=False),
+)
+
+# For every table of which the changes are logged, the table that is logged as changed and a query
+# that maps the rows touched by a statement to the changed rows (`row_id`) and their tournaments.
+TOURNAMENT_CHANGE_LOOKUPS: dict[str, tuple[str, str]] = {
+    'stage_items': (
+        'stage_items',
+        '''
+        SELECT changed_rows.id AS row_id, s.tournament_id FROM changed_rows
+        JOIN stages s ON s.id = changed_rows.stage_id
+        ''',
+    ),
+    'rounds': (
+        'rounds',
+        '''
+        SELECT changed_rows.id AS row_id, s.tournament_id FROM changed_rows
+        JOIN stage_items si ON si.id = changed_rows.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+        ''',
+    ),
+    'matches': (
+        'matches',
+        '''
+        SELECT changed_rows.id AS row_id, s.tournament_id FROM changed_rows
+        JOIN rounds r ON r.id = changed_rows.round_id
+        JOIN stage_items si ON si.id = r.stage_item_id
+        JOIN stages s ON s.id = si.stage_id
+        ''',
+    ),
+    'teams': ('teams', 'SELECT id AS row_id, tournament_id FROM changed_rows'),
+    'players_x_teams': (
+        'teams',
+        '''
+        SELECT t.id AS row_id, t.tournament_id FROM changed_rows
+        JOIN teams t ON t.id = changed_rows.team_id
+        ''',
+    ),
+    'players': (
+        'teams',
+        '''
+        SELECT t.id AS row_id, t.tournament_id FROM changed_rows
+        JOIN players_x_teams pt ON pt.player_id = changed_rows.id
+        JOIN teams t ON t.id = pt.team_id
+        ''',
+    ),
+}
+
+
+def get_tournament_change_log_triggers_ddl() -> list[str]:
+    """
+    Every statement that modifies rows of the logged tables stores the revision at which those
+    rows last changed in `tournament_changes`, so clients can fetch only what changed since a
+    revision they already have.
+
+    The revision of the tournament is bumped (and its row locked) first, so changes that are not
+    committed yet always get a higher revision than the ones a client has seen already. These
+    triggers are named such that they run before the triggers of `tournament_revisions`.
+    """
+    statements = []
+    for table, (changed_table, lookup) in TOURNAMENT_CHANGE_LOOKUPS.items():
+        deleted = "TG_OP = 'DELETE'" if changed_table == table else 'FALSE'
+        statements.append(
+            f'''
+            CREATE OR REPLACE FUNCTION log_tournament_changes_for_{table}() RETURNS trigger AS $$
+            BEGIN
+                WITH changes AS (
+                    SELECT DISTINCT row_id, tournament_id FROM ({lookup}) lookup
+                    WHERE tournament_id IN (SELECT id FROM tournaments)
+                ), revisions AS (
+                    INSERT INTO tournament_revisions (tournament_id, revision)
+                    SELECT tournament_id, nextval('tournament_revision_seq')
+                    FROM (SELECT DISTINCT tournament_id FROM changes) changed_tournaments
+                    ON CONFLICT (tournament_id) DO UPDATE
+                    SET revision = nextval('tournament_revision_seq')
+                    RETURNING tournament_id, revision
+                )
+                INSERT INTO tournament_changes (
+                    tournament_id, table_name, row_id, revision, deleted
+                )
+                SELECT changes.tournament_id, '{changed_table}', row_id, revision, {deleted}
+                FROM changes
+                JOIN revisions ON revisions.tournament_id = changes.tournament_id
+                ON CONFLICT (tournament_id, table_name, row_id) DO UPDATE
+                SET revision = EXCLUDED.revision, deleted = EXCLUDED.deleted;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            '''
+        )
+
+        for operation in ['INSERT', 'UPDATE', 'DELETE']:
+            transition_table = 'OLD' if operation == 'DELETE' else 'NEW'
+            statements.append(
+                f'''
+                CREATE TRIGGER {table}_changes_{operation.lower()}
+                AFTER {operation} ON {table}
+                REFERENCING {transition_table} TABLE AS changed_rows
+                FOR EACH STATEMENT EXECUTE PROCEDURE log_tournament_changes_for_{table}()
+                '''
+            )
+
+    return statements
+
+
+for ddl_statement in (
+    get_tournament_revision_triggers_ddl() + get_tournament_change_log_triggers_ddl()
+):
+    event.listen(metadata, 'after_create', DDL(ddl_statement))
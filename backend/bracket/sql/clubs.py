@@ -1,5 +1,6 @@
 from bracket.database import database
 from bracket.models.db.club import Club, ClubCreateBody, ClubUpdateBody
+from bracket.utils.decoding import parse_trusted
 from bracket.utils.types import assert_some
 
 
@@ -14,7 +15,7 @@ async def create_club(club: ClubCreateBody, user_id: int) -> Club:
         if result is None:
             raise ValueError('Could not create club')
 
-        club_created = Club.parse_obj(result._mapping)
+        club_created = parse_trusted(Club, result._mapping)
 
         query_many_to_many = '''
             INSERT INTO users_x_clubs (club_id, user_id)
@@ -36,7 +37,7 @@ async def sql_update_club(club_id: int, club: ClubUpdateBody) -> Club | None:
         RETURNING *
         '''
     result = await database.fetch_one(query=query, values={'name': club.name, 'club_id': club_id})
-    return Club.parse_obj(result) if result is not None else None
+    return parse_trusted(Club, result._mapping) if result is not None else None
 
 
 async def sql_delete_club(club_id: int) -> None:
@@ -63,7 +64,7 @@ async def get_clubs_for_user_id(user_id: int) -> list[Club]:
         WHERE uxc.user_id = :user_id
         '''
     results = await database.fetch_all(query=query, values={'user_id': user_id})
-    return [Club.parse_obj(result._mapping) for result in results]
+    return [parse_trusted(Club, result._mapping) for result in results]
 
 
 async def todo_get_club_for_user_id(club_id: int, user_id: int) -> Club | None:
@@ -74,4 +75,4 @@ async def todo_get_club_for_user_id(club_id: int, user_id: int) -> Club | None:
         AND club_id = :club_id
         '''
     result = await database.fetch_one(query=query, values={'user_id': user_id, 'club_id': club_id})
-    return Club.parse_obj(result._mapping) if result is not None else None
+    return parse_trusted(Club, result._mapping) if result is not None else None
@@ -1,5 +1,6 @@
 from bracket.database import database
 from bracket.models.db.court import Court, CourtBody
+from bracket.utils.decoding import parse_trusted
 
 
 async def get_all_courts_in_tournament(tournament_id: int) -> list[Court]:
@@ -10,7 +11,7 @@ async def get_all_courts_in_tournament(tournament_id: int) -> list[Court]:
         ORDER BY name
         '''
     result = await database.fetch_all(query=query, values={'tournament_id': tournament_id})
-    return [Court.parse_obj(x._mapping) for x in result]
+    return [parse_trusted(Court, x._mapping) for x in result]
 
 
 async def update_court(tournament_id: int, court_id: int, court_body: CourtBody) -> list[Court]:
@@ -24,4 +25,4 @@ async def update_court(tournament_id: int, court_id: int, court_body: CourtBody)
         query=query,
         values={'tournament_id': tournament_id, 'court_id': court_id, 'name': court_body.name},
     )
-    return [Court.parse_obj(x._mapping) for x in result]
+    return [parse_trusted(Court, x._mapping) for x in result]
@@ -1,10 +1,10 @@
+from collections.abc import Mapping
 from datetime import datetime
 
-from heliclockter import datetime_utc
-
 from bracket.database import database
-from bracket.models.db.match import Match, MatchBody, MatchCreateBody
+from bracket.models.db.match import Match, MatchBody, MatchCreateBody, ScheduledMatch
 from bracket.models.db.tournament import Tournament
+from bracket.utils.decoding import parse_trusted
 
 
 async def sql_delete_match(match_id: int) -> None:
@@ -75,7 +75,76 @@ async def sql_create_match(match: MatchCreateBody) -> Match:
     if result is None:
         raise ValueError('Could not create stage')
 
-    return Match.parse_obj(result._mapping)
+    return parse_trusted(Match, result._mapping)
+
+
+async def sql_create_matches(matches: list[MatchCreateBody]) -> list[Match]:
+    if len(matches) < 1:
+        return []
+
+    query = '''
+        INSERT INTO matches (
+            round_id,
+            court_id,
+            team1_id,
+            team2_id,
+            team1_winner_from_stage_item_id,
+            team2_winner_from_stage_item_id,
+            team1_winner_position,
+            team2_winner_position,
+            team1_winner_from_match_id,
+            team2_winner_from_match_id,
+            duration_minutes,
+            custom_duration_minutes,
+            margin_minutes,
+            custom_margin_minutes,
+            team1_score,
+            team2_score,
+            created
+        )
+        SELECT *, 0, 0, NOW()
+        FROM unnest(
+            CAST(:round_ids AS bigint[]),
+            CAST(:court_ids AS bigint[]),
+            CAST(:team1_ids AS bigint[]),
+            CAST(:team2_ids AS bigint[]),
+            CAST(:team1_winner_from_stage_item_ids AS bigint[]),
+            CAST(:team2_winner_from_stage_item_ids AS bigint[]),
+            CAST(:team1_winner_positions AS integer[]),
+            CAST(:team2_winner_positions AS integer[]),
+            CAST(:team1_winner_from_match_ids AS bigint[]),
+            CAST(:team2_winner_from_match_ids AS bigint[]),
+            CAST(:duration_minutes AS integer[]),
+            CAST(:custom_duration_minutes AS integer[]),
+            CAST(:margin_minutes AS integer[]),
+            CAST(:custom_margin_minutes AS integer[])
+        )
+        RETURNING *
+    '''
+    results = await database.fetch_all(
+        query=query,
+        values={
+            'round_ids': [match.round_id for match in matches],
+            'court_ids': [match.court_id for match in matches],
+            'team1_ids': [match.team1_id for match in matches],
+            'team2_ids': [match.team2_id for match in matches],
+            'team1_winner_from_stage_item_ids': [
+                match.team1_winner_from_stage_item_id for match in matches
+            ],
+            'team2_winner_from_stage_item_ids': [
+                match.team2_winner_from_stage_item_id for match in matches
+            ],
+            'team1_winner_positions': [match.team1_winner_position for match in matches],
+            'team2_winner_positions': [match.team2_winner_position for match in matches],
+            'team1_winner_from_match_ids': [match.team1_winner_from_match_id for match in matches],
+            'team2_winner_from_match_ids': [match.team2_winner_from_match_id for match in matches],
+            'duration_minutes': [match.duration_minutes for match in matches],
+            'custom_duration_minutes': [match.custom_duration_minutes for match in matches],
+            'margin_minutes': [match.margin_minutes for match in matches],
+            'custom_margin_minutes': [match.custom_margin_minutes for match in matches],
+        },
+    )
+    return [parse_trusted(Match, result._mapping) for result in results]
 
 
 async def sql_update_match(match_id: int, match: MatchBody, tournament: Tournament) -> None:
@@ -114,86 +183,91 @@ async def sql_update_match(match_id: int, match: MatchBody, tournament: Tourname
     )
 
 
-async def sql_update_team_ids_for_match(
-    match_id: int, team1_id: int | None, team2_id: int | None
+async def sql_update_team_ids_for_matches(
+    team_ids_per_match: Mapping[int, tuple[int | None, int | None]],
 ) -> None:
+    if len(team_ids_per_match) < 1:
+        return
+
     query = '''
         UPDATE matches
-        SET team1_id = :team1_id,
-            team2_id = :team2_id
-        WHERE matches.id = :match_id
+        SET team1_id = team_ids.team1_id,
+            team2_id = team_ids.team2_id
+        FROM unnest(
+            CAST(:match_ids AS bigint[]),
+            CAST(:team1_ids AS bigint[]),
+            CAST(:team2_ids AS bigint[])
+        ) AS team_ids(match_id, team1_id, team2_id)
+        WHERE matches.id = team_ids.match_id
         '''
     await database.execute(
-        query=query, values={'match_id': match_id, 'team1_id': team1_id, 'team2_id': team2_id}
+        query=query,
+        values={
+            'match_ids': list(team_ids_per_match.keys()),
+            'team1_ids': [team1_id for team1_id, _ in team_ids_per_match.values()],
+            'team2_ids': [team2_id for _, team2_id in team_ids_per_match.values()],
+        },
     )
 
 
-async def sql_reschedule_match(
-    match_id: int,
-    court_id: int | None,
-    start_time: datetime_utc,
-    position_in_schedule: int | None,
-    duration_minutes: int,
-    margin_minutes: int,
-    custom_duration_minutes: int | None,
-    custom_margin_minutes: int | None,
-) -> None:
+async def sql_reschedule_matches(scheduled_matches: list[ScheduledMatch]) -> None:
+    """
+    Reschedules all matches in a single statement. If a match occurs more than once, the last
+    occurrence is applied.
+    """
+    scheduled_matches = list({match.match_id: match for match in scheduled_matches}.values())
+    if len(scheduled_matches) < 1:
+        return
+
     query = '''
         UPDATE matches
-        SET court_id = :court_id,
-            start_time = :start_time,
-            position_in_schedule = :position_in_schedule,
-            duration_minutes = :duration_minutes,
-            margin_minutes = :margin_minutes,
-            custom_duration_minutes = :custom_duration_minutes,
-            custom_margin_minutes = :custom_margin_minutes
-        WHERE matches.id = :match_id
+        SET court_id = schedule.court_id,
+            start_time = schedule.start_time,
+            position_in_schedule = schedule.position_in_schedule,
+            duration_minutes = schedule.duration_minutes,
+            margin_minutes = schedule.margin_minutes,
+            custom_duration_minutes = schedule.custom_duration_minutes,
+            custom_margin_minutes = schedule.custom_margin_minutes
+        FROM unnest(
+            CAST(:match_ids AS bigint[]),
+            CAST(:court_ids AS bigint[]),
+            CAST(:start_times AS timestamptz[]),
+            CAST(:positions_in_schedule AS integer[]),
+            CAST(:duration_minutes AS integer[]),
+            CAST(:margin_minutes AS integer[]),
+            CAST(:custom_duration_minutes AS integer[]),
+            CAST(:custom_margin_minutes AS integer[])
+        ) AS schedule(
+            match_id,
+            court_id,
+            start_time,
+            position_in_schedule,
+            duration_minutes,
+            margin_minutes,
+            custom_duration_minutes,
+            custom_margin_minutes
+        )
+        WHERE matches.id = schedule.match_id
         '''
     await database.execute(
         query=query,
         values={
-            'court_id': court_id,
-            'match_id': match_id,
-            'position_in_schedule': position_in_schedule,
-            'start_time': datetime.fromisoformat(start_time.isoformat()),
-            'duration_minutes': duration_minutes,
-            'margin_minutes': margin_minutes,
-            'custom_duration_minutes': custom_duration_minutes,
-            'custom_margin_minutes': custom_margin_minutes,
+            'match_ids': [match.match_id for match in scheduled_matches],
+            'court_ids': [match.court_id for match in scheduled_matches],
+            'start_times': [
+                datetime.fromisoformat(match.start_time.isoformat()) for match in scheduled_matches
+            ],
+            'positions_in_schedule': [match.position_in_schedule for match in scheduled_matches],
+            'duration_minutes': [match.duration_minutes for match in scheduled_matches],
+            'margin_minutes': [match.margin_minutes for match in scheduled_matches],
+            'custom_duration_minutes': [
+                match.custom_duration_minutes for match in scheduled_matches
+            ],
+            'custom_margin_minutes': [match.custom_margin_minutes for match in scheduled_matches],
         },
     )
 
 
-async def sql_reschedule_match_and_determine_duration_and_margin(
-    match_id: int,
-    court_id: int | None,
-    start_time: datetime_utc,
-    position_in_schedule: int | None,
-    match: Match,
-    tournament: Tournament,
-) -> None:
-    duration_minutes = (
-        tournament.duration_minutes
-        if match.custom_duration_minutes is None
-        else match.custom_duration_minutes
-    )
-    margin_minutes = (
-        tournament.margin_minutes
-        if match.custom_margin_minutes is None
-        else match.custom_margin_minutes
-    )
-    await sql_reschedule_match(
-        match_id,
-        court_id,
-        start_time,
-        position_in_schedule,
-        duration_minutes,
-        margin_minutes,
-        match.custom_duration_minutes,
-        match.custom_margin_minutes,
-    )
-
-
 async def sql_get_match(match_id: int) -> Match:
     query = '''
         SELECT *
@@ -205,4 +279,4 @@ async def sql_get_match(match_id: int) -> Match:
     if result is None:
         raise ValueError('Could not create stage')
 
-    return Match.parse_obj(result._mapping)
+    return parse_trusted(Match, result._mapping)
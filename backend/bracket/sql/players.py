@@ -1,41 +1,85 @@
+from collections.abc import Mapping
+from typing import Any
+
 from bracket.database import database
-from bracket.models.db.player import Player
 from bracket.models.db.players import PlayerStatistics
 
+STATISTICS_VALUES_QUERY = '''
+    SELECT *
+    FROM unnest(
+        CAST(:ids AS bigint[]),
+        CAST(:wins AS integer[]),
+        CAST(:draws AS integer[]),
+        CAST(:losses AS integer[]),
+        CAST(:elo_scores AS double precision[]),
+        CAST(:swiss_scores AS double precision[])
+    ) AS stats(id, wins, draws, losses, elo_score, swiss_score)
+'''
 
-async def get_all_players_in_tournament(tournament_id: int) -> list[Player]:
-    query = '''
-        SELECT *
-        FROM players
-        WHERE players.tournament_id = :tournament_id
-        '''
-    result = await database.fetch_all(query=query, values={'tournament_id': tournament_id})
-    return [Player.parse_obj(x._mapping) for x in result]
+
+def get_statistics_values(statistics: Mapping[int, PlayerStatistics]) -> dict[str, list[Any]]:
+    """
+    The arrays to pass to `STATISTICS_VALUES_QUERY`, to write all statistics in one statement.
+    """
+    return {
+        'ids': list(statistics.keys()),
+        'wins': [stats.wins for stats in statistics.values()],
+        'draws': [stats.draws for stats in statistics.values()],
+        'losses': [stats.losses for stats in statistics.values()],
+        'elo_scores': [float(stats.elo_score) for stats in statistics.values()],
+        'swiss_scores': [float(stats.swiss_score) for stats in statistics.values()],
+    }
 
 
 async def update_player_stats(
-    tournament_id: int, player_id: int, player_statistics: PlayerStatistics
+    tournament_id: int, player_x_stats: Mapping[int, PlayerStatistics]
 ) -> None:
-    query = '''
+    """
+    Sets the statistics of all players in the tournament, players without statistics are reset.
+
+    Rows of which the statistics did not change are not updated.
+    """
+    query = f'''
+        WITH stats AS ({STATISTICS_VALUES_QUERY}), new_stats AS (
+            SELECT
+                players.id,
+                COALESCE(stats.wins, :default_wins) AS wins,
+                COALESCE(stats.draws, :default_draws) AS draws,
+                COALESCE(stats.losses, :default_losses) AS losses,
+                COALESCE(stats.elo_score, :default_elo_score) AS elo_score,
+                COALESCE(stats.swiss_score, :default_swiss_score) AS swiss_score
+            FROM players
+            LEFT JOIN stats ON stats.id = players.id
+            WHERE players.tournament_id = :tournament_id
+        )
         UPDATE players
         SET
-            wins = :wins,
-            draws = :draws,
-            losses = :losses,
-            elo_score = :elo_score,
-            swiss_score = :swiss_score
-        WHERE players.tournament_id = :tournament_id
-        AND players.id = :player_id
+            wins = new_stats.wins,
+            draws = new_stats.draws,
+            losses = new_stats.losses,
+            elo_score = new_stats.elo_score,
+            swiss_score = new_stats.swiss_score
+        FROM new_stats
+        WHERE players.id = new_stats.id
+        AND (players.wins, players.draws, players.losses, players.elo_score, players.swiss_score)
+        IS DISTINCT FROM (
+            new_stats.wins,
+            new_stats.draws,
+            new_stats.losses,
+            new_stats.elo_score,
+            new_stats.swiss_score
+        )
         '''
+    default_stats = PlayerStatistics()
     await database.execute(
         query=query,
         values={
             'tournament_id': tournament_id,
-            'player_id': player_id,
-            'wins': player_statistics.wins,
-            'draws': player_statistics.draws,
-            'losses': player_statistics.losses,
-            'elo_score': player_statistics.elo_score,
-            'swiss_score': float(player_statistics.swiss_score),
+            'default_wins': default_stats.wins,
+            'default_draws': default_stats.draws,
+            'default_losses': default_stats.losses,
+            'default_elo_score': float(default_stats.elo_score),
+            'default_swiss_score': float(default_stats.swiss_score),
+            **get_statistics_values(player_x_stats),
         },
     )
@@ -0,0 +1,176 @@
+from bracket.database import database
+from bracket.models.db.players import PlayerResults, StageItemStandings, TeamResults
+from bracket.utils.decoding import parse_trusted, parse_trusted_raw
+
+
+def get_match_results_query(stage_item_filter: str) -> str:
+    """
+    One row per team per match that counts for the ranking, the same matches that
+    `determine_ranking_for_stage_items` uses.
+    """
+    return f'''
+        SELECT sides.team_id, sides.score, sides.opponent_score
+        FROM matches
+        JOIN rounds ON rounds.id = matches.round_id
+        JOIN stage_items ON stage_items.id = rounds.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        CROSS JOIN LATERAL (
+            VALUES
+                (matches.team1_id, matches.team1_score, matches.team2_score),
+                (matches.team2_id, matches.team2_score, matches.team1_score)
+        ) AS sides(team_id, score, opponent_score)
+        WHERE stages.tournament_id = :tournament_id
+        AND rounds.is_draft IS FALSE
+        AND matches.team1_id IS NOT NULL
+        AND matches.team2_id IS NOT NULL
+        AND (matches.team1_score != 0 OR matches.team2_score != 0)
+        {stage_item_filter}
+    '''
+
+
+MATCH_RESULTS_COLUMNS = '''
+    COUNT(*) FILTER (WHERE results.score > results.opponent_score) AS wins,
+    COUNT(*) FILTER (WHERE results.score = results.opponent_score) AS draws,
+    COUNT(*) FILTER (WHERE results.score < results.opponent_score) AS losses,
+    SUM(
+        CASE
+            WHEN results.score > results.opponent_score THEN 1.00
+            WHEN results.score = results.opponent_score THEN 0.50
+            ELSE 0.00
+        END
+    ) AS swiss_score
+'''
+
+
+TEAM_RESULTS_ORDER = 'swiss_score DESC, wins DESC, draws DESC, team_id'
+PLAYER_RESULTS_ORDER = 'swiss_score DESC, wins DESC, draws DESC, player_id'
+
+
+def get_team_results_query(match_filter: str) -> str:
+    return f'''
+        SELECT results.team_id, {MATCH_RESULTS_COLUMNS}
+        FROM ({get_match_results_query(match_filter)}) results
+        GROUP BY results.team_id
+    '''
+
+
+def get_player_results_query(match_filter: str) -> str:
+    return f'''
+        SELECT players_x_teams.player_id, {MATCH_RESULTS_COLUMNS}
+        FROM ({get_match_results_query(match_filter)}) results
+        JOIN players_x_teams ON players_x_teams.team_id = results.team_id
+        GROUP BY players_x_teams.player_id
+    '''
+
+
+async def sql_get_team_results(
+    tournament_id: int, stage_item_id: int | None = None
+) -> list[TeamResults]:
+    stage_item_filter = 'AND stage_items.id = :stage_item_id' if stage_item_id is not None else ''
+    query = f'''
+        SELECT * FROM ({get_team_results_query(stage_item_filter)}) team_results
+        ORDER BY {TEAM_RESULTS_ORDER}
+    '''
+    values = {'tournament_id': tournament_id}
+    if stage_item_id is not None:
+        values['stage_item_id'] = stage_item_id
+
+    result = await database.fetch_all(query=query, values=values)
+    return [parse_trusted(TeamResults, row._mapping) for row in result]
+
+
+async def sql_get_player_results(
+    tournament_id: int, stage_item_id: int | None = None
+) -> list[PlayerResults]:
+    stage_item_filter = 'AND stage_items.id = :stage_item_id' if stage_item_id is not None else ''
+    query = f'''
+        SELECT * FROM ({get_player_results_query(stage_item_filter)}) player_results
+        ORDER BY {PLAYER_RESULTS_ORDER}
+    '''
+    values = {'tournament_id': tournament_id}
+    if stage_item_id is not None:
+        values['stage_item_id'] = stage_item_id
+
+    result = await database.fetch_all(query=query, values=values)
+    return [parse_trusted(PlayerResults, row._mapping) for row in result]
+
+
+async def sql_get_stage_item_standings(
+    tournament_id: int, stage_item_id: int
+) -> StageItemStandings:
+    return StageItemStandings(
+        teams=await sql_get_team_results(tournament_id, stage_item_id),
+        players=await sql_get_player_results(tournament_id, stage_item_id),
+    )
+
+
+async def sql_write_standings_snapshots(tournament_id: int, round_ids: list[int]) -> None:
+    """
+    Stores the standings of the stage items of the rounds as of those rounds, so they include the
+    matches of all non-draft rounds of the stage item up to and including each round.
+    """
+    if len(round_ids) < 1:
+        return
+
+    snapshot_filter = '''
+        AND stage_items.id = snapshot_rounds.stage_item_id
+        AND rounds.id <= snapshot_rounds.id
+    '''
+    query = f'''
+        INSERT INTO standings_snapshots (round_id, stage_item_id, created, standings)
+        SELECT
+            snapshot_rounds.id,
+            snapshot_rounds.stage_item_id,
+            NOW(),
+            json_build_object(
+                'teams', COALESCE(
+                    (
+                        SELECT json_agg(team_results ORDER BY {TEAM_RESULTS_ORDER})
+                        FROM ({get_team_results_query(snapshot_filter)}) team_results
+                    ),
+                    '[]'
+                ),
+                'players', COALESCE(
+                    (
+                        SELECT json_agg(player_results ORDER BY {PLAYER_RESULTS_ORDER})
+                        FROM ({get_player_results_query(snapshot_filter)}) player_results
+                    ),
+                    '[]'
+                )
+            )
+        FROM rounds snapshot_rounds
+        WHERE snapshot_rounds.id = ANY(CAST(:round_ids AS bigint[]))
+        ON CONFLICT (round_id) DO UPDATE
+        SET created = EXCLUDED.created, standings = EXCLUDED.standings
+    '''
+    await database.execute(
+        query=query, values={'tournament_id': tournament_id, 'round_ids': round_ids}
+    )
+
+
+async def sql_delete_standings_snapshots(round_ids: list[int]) -> None:
+    if len(round_ids) < 1:
+        return
+
+    query = '''
+        DELETE FROM standings_snapshots
+        WHERE round_id = ANY(CAST(:round_ids AS bigint[]))
+    '''
+    await database.execute(query=query, values={'round_ids': round_ids})
+
+
+async def sql_get_standings_snapshot(
+    tournament_id: int, round_id: int
+) -> StageItemStandings | None:
+    query = '''
+        SELECT standings_snapshots.standings
+        FROM standings_snapshots
+        JOIN stage_items ON stage_items.id = standings_snapshots.stage_item_id
+        JOIN stages ON stages.id = stage_items.stage_id
+        WHERE standings_snapshots.round_id = :round_id
+        AND stages.tournament_id = :tournament_id
+    '''
+    result = await database.fetch_val(
+        query=query, values={'tournament_id': tournament_id, 'round_id': round_id}
+    )
+    return parse_trusted_raw(StageItemStandings, result) if result is not None else None
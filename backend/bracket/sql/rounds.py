@@ -1,7 +1,8 @@
 from bracket.database import database
 from bracket.models.db.util import RoundWithMatches
-from bracket.sql.stage_items import get_stage_item
-from bracket.sql.stages import get_full_tournament_details
+from bracket.sql.rankings import sql_delete_standings_snapshots, sql_write_standings_snapshots
+from bracket.sql.stage_items import get_rounds_with_matches_query, get_stage_item
+from bracket.utils.decoding import parse_trusted_raw
 
 
 async def get_rounds_for_stage_item(
@@ -18,17 +19,14 @@ async def get_rounds_for_stage_item(
 
 
 async def get_round_by_id(tournament_id: int, round_id: int) -> RoundWithMatches | None:
-    stages = await get_full_tournament_details(
-        tournament_id, no_draft_rounds=False, round_id=round_id
+    query = f'''
+        WITH {get_rounds_with_matches_query('AND rounds.id = :round_id')}
+        SELECT to_json(rounds_with_matches) FROM rounds_with_matches
+    '''
+    result = await database.fetch_val(
+        query=query, values={'tournament_id': tournament_id, 'round_id': round_id}
     )
-
-    for stage in stages:
-        for stage_item in stage.stage_items:
-            for round_ in stage_item.rounds:
-                if round_ is not None:
-                    return round_
-
-    return None
+    return parse_trusted_raw(RoundWithMatches, result) if result is not None else None
 
 
 async def get_next_round_name(tournament_id: int, stage_item_id: int) -> str:
@@ -58,31 +56,51 @@ async def sql_delete_rounds_for_stage_item_id(stage_item_id: int) -> None:
 async def set_round_active_or_draft(
     round_id: int, tournament_id: int, *, is_active: bool, is_draft: bool
 ) -> None:
+    """
+    Rounds that are neither active nor draft anymore are closed, the standings as of those rounds
+    are stored in `standings_snapshots`. Snapshots of rounds that are reopened are removed.
+    """
     query = '''
-        UPDATE rounds
-        SET
-            is_draft =
-                CASE WHEN rounds.id=:round_id THEN :is_draft
-                     ELSE is_draft AND NOT :is_draft
-                END,
-            is_active =
-                CASE WHEN rounds.id=:round_id THEN :is_active
-                     ELSE is_active AND NOT :is_active
-                END
-        WHERE rounds.id IN (
-            SELECT rounds.id
+        WITH previous_rounds AS (
+            SELECT rounds.id, rounds.is_draft OR rounds.is_active AS was_open
             FROM rounds
             JOIN stage_items ON rounds.stage_item_id = stage_items.id
             JOIN stages s on s.id = stage_items.stage_id
             WHERE s.tournament_id = :tournament_id
+        ), updated_rounds AS (
+            UPDATE rounds
+            SET
+                is_draft =
+                    CASE WHEN rounds.id=:round_id THEN :is_draft
+                         ELSE is_draft AND NOT :is_draft
+                    END,
+                is_active =
+                    CASE WHEN rounds.id=:round_id THEN :is_active
+                         ELSE is_active AND NOT :is_active
+                    END
+            WHERE rounds.id IN (SELECT id FROM previous_rounds)
+            RETURNING rounds.id, rounds.is_draft OR rounds.is_active AS is_open
         )
+        SELECT updated_rounds.id, updated_rounds.is_open, previous_rounds.was_open
+        FROM updated_rounds
+        JOIN previous_rounds ON previous_rounds.id = updated_rounds.id
     '''
-    await database.execute(
-        query=query,
-        values={
-            'tournament_id': tournament_id,
-            'round_id': round_id,
-            'is_active': is_active,
-            'is_draft': is_draft,
-        },
-    )
+    async with database.transaction():
+        result = await database.fetch_all(
+            query=query,
+            values={
+                'tournament_id': tournament_id,
+                'round_id': round_id,
+                'is_active': is_active,
+                'is_draft': is_draft,
+            },
+        )
+        await sql_delete_standings_snapshots([row['id'] for row in result if row['is_open']])
+        await sql_write_standings_snapshots(
+            tournament_id,
+            [
+                row['id']
+                for row in result
+                if not row['is_open'] and (row['was_open'] or row['id'] == round_id)
+            ],
+        )
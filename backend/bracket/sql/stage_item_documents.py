@@ -0,0 +1,147 @@
+from bracket.database import database
+from bracket.models.db.util import StageWithStageItems
+from bracket.schema import (
+    get_drop_stage_item_document_triggers_ddl,
+    get_stage_item_document_triggers_ddl,
+)
+from bracket.sql.stage_items import STAGE_ITEM_WITH_ROUNDS_COLUMNS, get_rounds_with_matches_query
+from bracket.utils.decoding import parse_trusted
+from bracket.utils.types import dict_without_none
+
+
+async def sql_set_stage_item_document_triggers(enabled: bool) -> None:
+    """
+    Installs the triggers that invalidate stage item documents if they are enabled, and removes
+    them otherwise, so writes don't pay for documents that are never read.
+
+    Changes made while the triggers were removed are not reflected in the versions of the
+    documents, so all documents are invalidated when the triggers are installed.
+    """
+    async with database.transaction():
+        # Serializes the statements of multiple workers that start at the same time
+        await database.execute(
+            query="SELECT pg_advisory_xact_lock(hashtext('stage_item_document_triggers'))"
+        )
+        for statement in get_drop_stage_item_document_triggers_ddl():
+            await database.execute(query=statement)
+
+        if enabled:
+            for statement in get_stage_item_document_triggers_ddl():
+                await database.execute(query=statement)
+
+            await database.execute(
+                query="UPDATE stage_item_documents SET version = nextval('tournament_revision_seq')"
+            )
+
+
+async def sql_refresh_stage_item_documents(tournament_id: int) -> None:
+    """
+    Rebuilds the documents of the stage items in a tournament that are not up to date.
+
+    A document is stored together with the version it was built for. If the stage item is
+    modified while the document is being built, the version is bumped in the meantime, so the
+    document will not be considered up to date.
+    """
+    stale_rounds_filter = 'AND rounds.stage_item_id IN (SELECT id FROM stale_stage_items)'
+    query = f'''
+        WITH stale_stage_items AS (
+            SELECT stage_items.id, COALESCE(d.version, 0) AS version
+            FROM stage_items
+            JOIN stages s on s.id = stage_items.stage_id
+            LEFT JOIN stage_item_documents d on d.stage_item_id = stage_items.id
+            WHERE s.tournament_id = :tournament_id
+            AND (d.stage_item_id IS NULL OR d.document_version IS DISTINCT FROM d.version)
+        ), {get_rounds_with_matches_query(stale_rounds_filter)}
+        INSERT INTO stage_item_documents (stage_item_id, version, document_version, document)
+        SELECT
+            stale_stage_items.id,
+            stale_stage_items.version,
+            stale_stage_items.version,
+            to_jsonb(stage_item_with_rounds)
+        FROM (
+            SELECT {STAGE_ITEM_WITH_ROUNDS_COLUMNS}
+            FROM stage_items
+            WHERE stage_items.id IN (SELECT id FROM stale_stage_items)
+        ) stage_item_with_rounds
+        JOIN stale_stage_items ON stale_stage_items.id = stage_item_with_rounds.id
+        ON CONFLICT (stage_item_id) DO UPDATE
+        SET document = EXCLUDED.document, document_version = EXCLUDED.document_version
+        WHERE stage_item_documents.document_version IS DISTINCT FROM stage_item_documents.version
+    '''
+    await database.execute(query=query, values={'tournament_id': tournament_id})
+
+
+async def sql_get_full_tournament_details_from_documents(
+    tournament_id: int,
+    round_id: int | None = None,
+    stage_id: int | None = None,
+    stage_item_id: int | None = None,
+    *,
+    no_draft_rounds: bool = False,
+) -> list[StageWithStageItems] | None:
+    """
+    Same as `sql_get_full_tournament_details`, but reads the precomputed stage item documents.
+
+    Returns None if some of the documents are not up to date.
+    """
+    round_conditions = []
+    if no_draft_rounds:
+        round_conditions.append("(round->>'is_draft')::boolean IS FALSE")
+    if round_id is not None:
+        round_conditions.append("(round->>'id')::bigint = :round_id")
+
+    document = 'd.document'
+    if len(round_conditions) > 0:
+        document = f'''
+            jsonb_set(
+                d.document,
+                '{{rounds}}',
+                COALESCE(
+                    (
+                        SELECT jsonb_agg(round ORDER BY position)
+                        FROM jsonb_array_elements(d.document->'rounds')
+                            WITH ORDINALITY AS r(round, position)
+                        WHERE {' AND '.join(round_conditions)}
+                    ),
+                    '[]'::jsonb
+                )
+            )
+        '''
+
+    stage_filter = 'AND stages.id = :stage_id' if stage_id is not None else ''
+    stage_item_filter = 'AND stage_items.id = :stage_item_id' if stage_item_id is not None else ''
+    query = f'''
+        SELECT
+            stages.*,
+            COALESCE(
+                jsonb_agg({document} ORDER BY stage_items.name, stage_items.id)
+                    FILTER (WHERE stage_items.id IS NOT NULL),
+                '[]'::jsonb
+            ) AS stage_items,
+            COALESCE(
+                bool_and(COALESCE(d.document_version = d.version, FALSE))
+                    FILTER (WHERE stage_items.id IS NOT NULL),
+                TRUE
+            ) AS documents_up_to_date
+        FROM stages
+        LEFT JOIN stage_items on stage_items.stage_id = stages.id
+        LEFT JOIN stage_item_documents d on d.stage_item_id = stage_items.id
+        WHERE stages.tournament_id = :tournament_id
+        {stage_filter}
+        {stage_item_filter}
+        GROUP BY stages.id
+        ORDER BY stages.id
+    '''
+    values = dict_without_none(
+        {
+            'tournament_id': tournament_id,
+            'round_id': round_id,
+            'stage_id': stage_id,
+            'stage_item_id': stage_item_id,
+        }
+    )
+    result = await database.fetch_all(query=query, values=values)
+    if not all(stage._mapping['documents_up_to_date'] for stage in result):
+        return None
+
+    return [parse_trusted(StageWithStageItems, x._mapping) for x in result]
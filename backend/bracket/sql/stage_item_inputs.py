@@ -5,6 +5,7 @@ from bracket.models.db.stage_item_inputs import (
     StageItemInputCreateBodyFinal,
     StageItemInputCreateBodyTentative,
 )
+from bracket.utils.decoding import parse_trusted
 
 
 async def sql_delete_stage_item_inputs(stage_item_id: int) -> None:
@@ -61,4 +62,4 @@ async def sql_create_stage_item_input(
     if result is None:
         raise ValueError('Could not create stage')
 
-    return StageItemInputBase.parse_obj(result._mapping)
+    return parse_trusted(StageItemInputBase, result._mapping)
@@ -2,7 +2,7 @@ from bracket.database import database
 from bracket.models.db.stage_item import StageItem, StageItemCreateBody
 from bracket.models.db.util import StageItemWithRounds
 from bracket.sql.stage_item_inputs import sql_create_stage_item_input
-from bracket.sql.stages import get_full_tournament_details
+from bracket.utils.decoding import parse_trusted, parse_trusted_raw
 
 
 async def sql_create_stage_item(tournament_id: int, stage_item: StageItemCreateBody) -> StageItem:
@@ -25,7 +25,7 @@ async def sql_create_stage_item(tournament_id: int, stage_item: StageItemCreateB
         if result is None:
             raise ValueError('Could not create stage')
 
-        stage_item_result = StageItem.parse_obj(result._mapping)
+        stage_item_result = parse_trusted(StageItem, result._mapping)
 
         for input_ in stage_item.inputs:
             await sql_create_stage_item_input(tournament_id, stage_item_result.id, input_)
@@ -41,9 +41,102 @@ async def sql_delete_stage_item(stage_item_id: int) -> None:
     await database.execute(query=query, values={'stage_item_id': stage_item_id})
 
 
-async def get_stage_item(tournament_id: int, stage_item_id: int) -> StageItemWithRounds | None:
-    stages = await get_full_tournament_details(tournament_id, stage_item_id=stage_item_id)
-    if len(stages) < 1 or len(stages[0].stage_items) < 1:
-        return None
+def get_rounds_with_matches_query(rounds_filter: str) -> str:
+    """
+    CTEs that build `rounds_with_matches` for the rounds selected by `rounds_filter`.
+
+    Only the matches, teams and players of those rounds are aggregated, instead of the ones of the
+    whole tournament.
+    """
+    return f'''
+        filtered_rounds AS (
+            SELECT rounds.*
+            FROM rounds
+            JOIN stage_items si on rounds.stage_item_id = si.id
+            JOIN stages s on s.id = si.stage_id
+            WHERE s.tournament_id = :tournament_id
+            {rounds_filter}
+        ), filtered_matches AS (
+            SELECT matches.*
+            FROM matches
+            JOIN filtered_rounds r on matches.round_id = r.id
+        ), teams_with_players AS (
+            SELECT
+                teams.*,
+                to_json(array_remove(array_agg(p), NULL)) as players
+            FROM teams
+            LEFT JOIN players_x_teams pt on pt.team_id = teams.id
+            LEFT JOIN players p on pt.player_id = p.id
+            WHERE teams.tournament_id = :tournament_id
+            AND teams.id IN (
+                SELECT team1_id FROM filtered_matches
+                UNION
+                SELECT team2_id FROM filtered_matches
+            )
+            GROUP BY teams.id
+        ), matches_with_teams AS (
+            SELECT
+                m.*,
+                to_json(t1) as team1,
+                to_json(t2) as team2,
+                to_json(c) as court
+            FROM filtered_matches m
+            LEFT JOIN teams_with_players t1 on t1.id = m.team1_id
+            LEFT JOIN teams_with_players t2 on t2.id = m.team2_id
+            LEFT JOIN courts c on m.court_id = c.id
+        ), rounds_with_matches AS (
+            SELECT
+                rounds.*,
+                COALESCE(
+                    (
+                        SELECT to_json(array_agg(m.* ORDER BY m.id))
+                        FROM matches_with_teams m
+                        WHERE m.round_id = rounds.id
+                    ),
+                    '[]'::json
+                ) AS matches
+            FROM filtered_rounds rounds
+        )
+    '''
+
 
-    return stages[0].stage_items[0]
+# The columns of a stage item with its inputs and its rounds, to be selected from `stage_items`
+# using the CTEs of `get_rounds_with_matches_query`.
+STAGE_ITEM_WITH_ROUNDS_COLUMNS = '''
+    stage_items.*,
+    COALESCE(
+        (
+            SELECT to_json(array_agg(sii ORDER BY sii.slot))
+            FROM stage_item_inputs sii
+            WHERE sii.stage_item_id = stage_items.id
+            AND sii.tournament_id = :tournament_id
+        ),
+        '[]'::json
+    ) AS inputs,
+    COALESCE(
+        (
+            SELECT to_json(array_agg(r.* ORDER BY r.id))
+            FROM rounds_with_matches r
+            WHERE r.stage_item_id = stage_items.id
+        ),
+        '[]'::json
+    ) AS rounds
+'''
+
+
+async def get_stage_item(tournament_id: int, stage_item_id: int) -> StageItemWithRounds | None:
+    query = f'''
+        WITH {get_rounds_with_matches_query('AND rounds.stage_item_id = :stage_item_id')}
+        SELECT to_json(stage_item_with_rounds)
+        FROM (
+            SELECT {STAGE_ITEM_WITH_ROUNDS_COLUMNS}
+            FROM stage_items
+            JOIN stages on stages.id = stage_items.stage_id
+            WHERE stage_items.id = :stage_item_id
+            AND stages.tournament_id = :tournament_id
+        ) stage_item_with_rounds
+    '''
+    result = await database.fetch_val(
+        query=query, values={'tournament_id': tournament_id, 'stage_item_id': stage_item_id}
+    )
+    return parse_trusted_raw(StageItemWithRounds, result) if result is not None else None
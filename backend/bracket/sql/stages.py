@@ -1,10 +1,26 @@
+from collections.abc import AsyncIterator
 from typing import Literal, cast
 
+from bracket.config import config
 from bracket.database import database
 from bracket.models.db.stage import Stage
-from bracket.models.db.util import StageWithStageItems
+from bracket.models.db.util import StageItemWithRounds, StageWithStageItems
+from bracket.sql.stage_item_documents import (
+    sql_get_full_tournament_details_from_documents,
+    sql_refresh_stage_item_documents,
+)
+from bracket.sql.stage_items import STAGE_ITEM_WITH_ROUNDS_COLUMNS, get_rounds_with_matches_query
+from bracket.sql.tournaments import sql_get_tournament_revision
+from bracket.utils.cache import RevisionedLRUCache
+from bracket.utils.decoding import parse_trusted, parse_trusted_raw
 from bracket.utils.types import dict_without_none
 
+TournamentDetailsKey = tuple[int, int | None, int | None, int | None, bool]
+
+tournament_details_cache: RevisionedLRUCache[
+    TournamentDetailsKey, list[StageWithStageItems]
+] = RevisionedLRUCache(config.tournament_details_cache_size)
+
 
 async def get_full_tournament_details(
     tournament_id: int,
@@ -13,6 +29,59 @@ async def get_full_tournament_details(
     stage_item_id: int | None = None,
     *,
     no_draft_rounds: bool = False,
+) -> list[StageWithStageItems]:
+    """
+    The parsed stages are shared between callers, so they should not be mutated.
+    """
+    # The revision has to be fetched before the details, otherwise newer details could be cached
+    # with an older revision.
+    revision = await sql_get_tournament_revision(tournament_id)
+    key = (tournament_id, round_id, stage_id, stage_item_id, no_draft_rounds)
+
+    stages = tournament_details_cache.get(key, revision)
+    if stages is None:
+        stages = await get_full_tournament_details_uncached(
+            tournament_id, round_id, stage_id, stage_item_id, no_draft_rounds=no_draft_rounds
+        )
+        tournament_details_cache.set(key, revision, stages)
+
+    return stages
+
+
+async def get_full_tournament_details_uncached(
+    tournament_id: int,
+    round_id: int | None = None,
+    stage_id: int | None = None,
+    stage_item_id: int | None = None,
+    *,
+    no_draft_rounds: bool = False,
+) -> list[StageWithStageItems]:
+    if config.use_stage_item_documents:
+        stages = await sql_get_full_tournament_details_from_documents(
+            tournament_id, round_id, stage_id, stage_item_id, no_draft_rounds=no_draft_rounds
+        )
+        if stages is None:
+            await sql_refresh_stage_item_documents(tournament_id)
+            stages = await sql_get_full_tournament_details_from_documents(
+                tournament_id, round_id, stage_id, stage_item_id, no_draft_rounds=no_draft_rounds
+            )
+
+        # The documents can only be outdated again if they were modified concurrently
+        if stages is not None:
+            return stages
+
+    return await sql_get_full_tournament_details(
+        tournament_id, round_id, stage_id, stage_item_id, no_draft_rounds=no_draft_rounds
+    )
+
+
+async def sql_get_full_tournament_details(
+    tournament_id: int,
+    round_id: int | None = None,
+    stage_id: int | None = None,
+    stage_item_id: int | None = None,
+    *,
+    no_draft_rounds: bool = False,
 ) -> list[StageWithStageItems]:
     draft_filter = 'AND rounds.is_draft IS FALSE' if no_draft_rounds else ''
     round_filter = 'AND rounds.id = :round_id' if round_id is not None else ''
@@ -106,7 +175,42 @@ async def get_full_tournament_details(
         }
     )
     result = await database.fetch_all(query=query, values=values)
-    return [StageWithStageItems.parse_obj(x._mapping) for x in result]
+    return [parse_trusted(StageWithStageItems, x._mapping) for x in result]
+
+
+async def iterate_full_tournament_details(
+    tournament_id: int, *, no_draft_rounds: bool = False
+) -> AsyncIterator[tuple[Stage, StageItemWithRounds | None]]:
+    """
+    Yields the same stages and stage items as `get_full_tournament_details` one stage item at a
+    time, fetched using a cursor. Every stage is yielded with each of its stage items, or once
+    with None if it has no stage items.
+    """
+    draft_filter = 'AND rounds.is_draft IS FALSE' if no_draft_rounds else ''
+    query = f'''
+        WITH {get_rounds_with_matches_query(draft_filter)}
+        SELECT
+            stages.id AS stage_id,
+            to_json(stages) AS stage,
+            to_json(stage_item_with_rounds) AS stage_item
+        FROM stages
+        LEFT JOIN LATERAL (
+            SELECT {STAGE_ITEM_WITH_ROUNDS_COLUMNS}
+            FROM stage_items
+            WHERE stage_items.stage_id = stages.id
+        ) stage_item_with_rounds ON TRUE
+        WHERE stages.tournament_id = :tournament_id
+        ORDER BY stages.id, stage_item_with_rounds.name, stage_item_with_rounds.id
+    '''
+    stage: Stage | None = None
+    async for row in database.iterate(query=query, values={'tournament_id': tournament_id}):
+        if stage is None or stage.id != row['stage_id']:
+            stage = parse_trusted_raw(Stage, row['stage'])
+
+        stage_item = row['stage_item']
+        yield stage, (
+            parse_trusted_raw(StageItemWithRounds, stage_item) if stage_item is not None else None
+        )
 
 
 async def sql_delete_stage(tournament_id: int, stage_id: int) -> None:
@@ -141,7 +245,7 @@ async def sql_create_stage(tournament_id: int) -> Stage:
     if result is None:
         raise ValueError('Could not create stage')
 
-    return Stage.parse_obj(result._mapping)
+    return parse_trusted(Stage, result._mapping)
 
 
 async def get_next_stage_in_tournament(
@@ -1,6 +1,11 @@
+from collections.abc import AsyncIterator, Mapping
+from typing import Any
+
 from bracket.database import database
 from bracket.models.db.players import PlayerStatistics
 from bracket.models.db.team import FullTeamWithPlayers, Team
+from bracket.sql.players import STATISTICS_VALUES_QUERY, get_statistics_values
+from bracket.utils.decoding import parse_trusted
 from bracket.utils.types import dict_without_none
 
 
@@ -14,12 +19,12 @@ async def get_team_by_id(team_id: int, tournament_id: int) -> Team | None:
     result = await database.fetch_one(
         query=query, values={'team_id': team_id, 'tournament_id': tournament_id}
     )
-    return Team.parse_obj(result._mapping) if result is not None else None
+    return parse_trusted(Team, result._mapping) if result is not None else None
 
 
-async def get_teams_with_members(
+def get_teams_with_members_query(
     tournament_id: int, *, only_active_teams: bool = False, team_id: int | None = None
-) -> list[FullTeamWithPlayers]:
+) -> tuple[str, dict[str, Any]]:
     active_team_filter = 'AND teams.active IS TRUE' if only_active_teams else ''
     team_id_filter = 'AND teams.id = :team_id' if team_id is not None else ''
     query = f'''
@@ -36,33 +41,43 @@ async def get_teams_with_members(
         ORDER BY teams.elo_score DESC, teams.wins DESC, name ASC
         '''
     values = dict_without_none({'tournament_id': tournament_id, 'team_id': team_id})
+    return query, values
+
+
+async def get_teams_with_members(
+    tournament_id: int, *, only_active_teams: bool = False, team_id: int | None = None
+) -> list[FullTeamWithPlayers]:
+    query, values = get_teams_with_members_query(
+        tournament_id, only_active_teams=only_active_teams, team_id=team_id
+    )
     result = await database.fetch_all(query=query, values=values)
-    return [FullTeamWithPlayers.parse_obj(x._mapping) for x in result]
+    return [parse_trusted(FullTeamWithPlayers, x._mapping) for x in result]
+
+
+async def iterate_teams_with_members(tournament_id: int) -> AsyncIterator[FullTeamWithPlayers]:
+    query, values = get_teams_with_members_query(tournament_id)
+    async for team in database.iterate(query=query, values=values):
+        yield parse_trusted(FullTeamWithPlayers, team._mapping)  # type: ignore[attr-defined]
 
 
 async def update_team_stats(
-    tournament_id: int, team_id: int, team_statistics: PlayerStatistics
+    tournament_id: int, team_x_stats: Mapping[int, PlayerStatistics]
 ) -> None:
-    query = '''
+    query = f'''
         UPDATE teams
         SET
-            wins = :wins,
-            draws = :draws,
-            losses = :losses,
-            elo_score = :elo_score,
-            swiss_score = :swiss_score
+            wins = stats.wins,
+            draws = stats.draws,
+            losses = stats.losses,
+            elo_score = stats.elo_score,
+            swiss_score = stats.swiss_score
+        FROM ({STATISTICS_VALUES_QUERY}) stats
         WHERE teams.tournament_id = :tournament_id
-        AND teams.id = :team_id
+        AND teams.id = stats.id
+        AND (teams.wins, teams.draws, teams.losses, teams.elo_score, teams.swiss_score)
+        IS DISTINCT FROM (stats.wins, stats.draws, stats.losses, stats.elo_score, stats.swiss_score)
         '''
     await database.execute(
         query=query,
-        values={
-            'tournament_id': tournament_id,
-            'team_id': team_id,
-            'wins': team_statistics.wins,
-            'draws': team_statistics.draws,
-            'losses': team_statistics.losses,
-            'elo_score': team_statistics.elo_score,
-            'swiss_score': float(team_statistics.swiss_score),
-        },
+        values={'tournament_id': tournament_id, **get_statistics_values(team_x_stats)},
     )
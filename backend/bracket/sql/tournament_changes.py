@@ -0,0 +1,118 @@
+from bracket.database import database
+from bracket.models.db.match import Match
+from bracket.models.db.round import Round
+from bracket.models.db.stage_item import StageItem
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.models.db.util import TournamentChanges
+from bracket.sql.tournaments import sql_get_tournament_revision
+from bracket.utils.decoding import parse_trusted
+
+
+def get_changed_rows_filter(table_name: str) -> str:
+    return f'''
+        {table_name}.id IN (
+            SELECT row_id
+            FROM tournament_changes
+            WHERE tournament_id = :tournament_id
+            AND table_name = '{table_name}'
+            AND revision > :since
+            AND deleted IS FALSE
+        )
+    '''
+
+
+async def sql_get_tournament_changes(
+    tournament_id: int, since: int, *, no_draft_rounds: bool = False
+) -> TournamentChanges:
+    # The revision is read first, so changes that are committed while the rows are being read
+    # are returned again when the client asks for the changes since this revision.
+    revision = await sql_get_tournament_revision(tournament_id)
+    values = {'tournament_id': tournament_id, 'since': since}
+    draft_filter = 'AND rounds.is_draft IS FALSE' if no_draft_rounds else ''
+
+    # Publishing a draft round only logs a change of the round, so without draft rounds, all
+    # matches of a changed round are returned and rounds that became drafts are reported removed.
+    changed_matches_filter = get_changed_rows_filter('matches')
+    if no_draft_rounds:
+        changed_matches_filter = (
+            f"({changed_matches_filter} OR {get_changed_rows_filter('rounds')})"
+        )
+
+    stage_items_query = f'''
+        SELECT *
+        FROM stage_items
+        WHERE {get_changed_rows_filter('stage_items')}
+        ORDER BY stage_items.id
+    '''
+    rounds_query = f'''
+        SELECT *
+        FROM rounds
+        WHERE {get_changed_rows_filter('rounds')}
+        {draft_filter}
+        ORDER BY rounds.id
+    '''
+    matches_query = f'''
+        SELECT matches.*
+        FROM matches
+        JOIN rounds ON rounds.id = matches.round_id
+        WHERE {changed_matches_filter}
+        {draft_filter}
+        ORDER BY matches.id
+    '''
+    teams_query = f'''
+        SELECT
+            teams.*,
+            to_json(array_agg(p.*)) AS players
+        FROM teams
+        LEFT JOIN players_x_teams pt on pt.team_id = teams.id
+        LEFT JOIN players p on pt.player_id = p.id
+        WHERE {get_changed_rows_filter('teams')}
+        GROUP BY teams.id
+        ORDER BY teams.id
+    '''
+    deleted_query = '''
+        SELECT table_name, array_agg(row_id ORDER BY row_id) AS row_ids
+        FROM tournament_changes
+        WHERE tournament_id = :tournament_id
+        AND revision > :since
+        AND deleted IS TRUE
+        GROUP BY table_name
+    '''
+    hidden_query = f'''
+        SELECT 'rounds' AS table_name, array_agg(rounds.id ORDER BY rounds.id) AS row_ids
+        FROM rounds
+        WHERE {get_changed_rows_filter('rounds')}
+        AND rounds.is_draft IS TRUE
+        UNION ALL
+        SELECT 'matches' AS table_name, array_agg(matches.id ORDER BY matches.id) AS row_ids
+        FROM matches
+        JOIN rounds ON rounds.id = matches.round_id
+        WHERE {changed_matches_filter}
+        AND rounds.is_draft IS TRUE
+    '''
+
+    stage_items = await database.fetch_all(query=stage_items_query, values=values)
+    rounds = await database.fetch_all(query=rounds_query, values=values)
+    matches = await database.fetch_all(query=matches_query, values=values)
+    teams = await database.fetch_all(query=teams_query, values=values)
+    deleted: dict[str, list[int]] = {
+        row._mapping['table_name']: row._mapping['row_ids']
+        for row in await database.fetch_all(query=deleted_query, values=values)
+    }
+    if no_draft_rounds:
+        for row in await database.fetch_all(query=hidden_query, values=values):
+            if row._mapping['row_ids'] is not None:
+                table_name = row._mapping['table_name']
+                deleted[table_name] = sorted(deleted.get(table_name, []) + row._mapping['row_ids'])
+
+    return TournamentChanges(
+        revision=revision,
+        stage_items=[parse_trusted(StageItem, x._mapping) for x in stage_items],
+        rounds=[parse_trusted(Round, x._mapping) for x in rounds],
+        matches=[parse_trusted(Match, x._mapping) for x in matches],
+        teams=[parse_trusted(FullTeamWithPlayers, x._mapping) for x in teams],
+        deleted_stage_item_ids=deleted.get('stage_items', []),
+        deleted_round_ids=deleted.get('rounds', []),
+        deleted_match_ids=deleted.get('matches', []),
+        deleted_team_ids=deleted.get('teams', []),
+    )
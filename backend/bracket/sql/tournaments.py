@@ -1,7 +1,16 @@
 from typing import Any
 
+from bracket.config import config
 from bracket.database import database
 from bracket.models.db.tournament import Tournament
+from bracket.models.db.util import RankingStatus
+from bracket.utils.cache import SingleFlightTTLCache
+from bracket.utils.decoding import parse_trusted
+
+# Tournaments of public dashboards by their endpoint name, shared by all anonymous viewers
+public_dashboard_cache: SingleFlightTTLCache[str, Tournament] = SingleFlightTTLCache(
+    config.public_dashboard_cache_seconds, config.tournament_details_cache_size
+)
 
 
 async def sql_get_tournament(tournament_id: int) -> Tournament:
@@ -12,7 +21,42 @@ async def sql_get_tournament(tournament_id: int) -> Tournament:
         '''
     result = await database.fetch_one(query=query, values={'tournament_id': tournament_id})
     assert result is not None
-    return Tournament.parse_obj(result._mapping)
+    return parse_trusted(Tournament, result._mapping)
+
+
+async def sql_get_tournament_revision(tournament_id: int) -> int:
+    query = '''
+        SELECT revision
+        FROM tournament_revisions
+        WHERE tournament_id = :tournament_id
+        '''
+    result = await database.fetch_val(query=query, values={'tournament_id': tournament_id})
+    return int(result) if result is not None else 0
+
+
+async def sql_get_ranking_status(tournament_id: int) -> RankingStatus:
+    query = '''
+        SELECT revision, ranking_revision
+        FROM tournament_revisions
+        WHERE tournament_id = :tournament_id
+        '''
+    result = await database.fetch_one(query=query, values={'tournament_id': tournament_id})
+    if result is None:
+        return RankingStatus(revision=0, ranking_revision=0)
+
+    return parse_trusted(RankingStatus, result._mapping)
+
+
+async def sql_set_ranking_revision(tournament_id: int, ranking_revision: int) -> None:
+    query = '''
+        UPDATE tournament_revisions
+        SET ranking_revision = GREATEST(ranking_revision, :ranking_revision)
+        WHERE tournament_id = :tournament_id
+        '''
+    await database.execute(
+        query=query,
+        values={'tournament_id': tournament_id, 'ranking_revision': ranking_revision},
+    )
 
 
 async def sql_get_tournament_by_endpoint_name(endpoint_name: str) -> Tournament:
@@ -24,7 +68,17 @@ async def sql_get_tournament_by_endpoint_name(endpoint_name: str) -> Tournament:
         '''
     result = await database.fetch_one(query=query, values={'endpoint_name': endpoint_name})
     assert result is not None
-    return Tournament.parse_obj(result._mapping)
+    return parse_trusted(Tournament, result._mapping)
+
+
+async def get_tournament_by_endpoint_name(endpoint_name: str) -> Tournament:
+    """
+    Same as `sql_get_tournament_by_endpoint_name`, but the result may be up to
+    `PUBLIC_DASHBOARD_CACHE_SECONDS` old.
+    """
+    return await public_dashboard_cache.get_or_compute(
+        endpoint_name, lambda: sql_get_tournament_by_endpoint_name(endpoint_name)
+    )
 
 
 async def sql_get_tournaments(
@@ -43,4 +97,4 @@ async def sql_get_tournaments(
         params = {**params, 'endpoint_name': endpoint_name}
 
     result = await database.fetch_all(query=query, values=params)
-    return [Tournament.parse_obj(x._mapping) for x in result]
+    return [parse_trusted(Tournament, x._mapping) for x in result]
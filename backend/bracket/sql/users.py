@@ -4,6 +4,7 @@ from bracket.database import database
 from bracket.models.db.user import User, UserInDB, UserPublic, UserToUpdate
 from bracket.schema import users
 from bracket.utils.db import fetch_one_parsed
+from bracket.utils.decoding import parse_trusted
 from bracket.utils.types import assert_some
 
 
@@ -59,7 +60,7 @@ async def get_user_by_id(user_id: int) -> UserPublic | None:
         WHERE id = :user_id
         '''
     result = await database.fetch_one(query=query, values={'user_id': user_id})
-    return UserPublic.parse_obj(result._mapping) if result is not None else None
+    return parse_trusted(UserPublic, result._mapping) if result is not None else None
 
 
 async def create_user(user: User) -> User:
@@ -77,7 +78,7 @@ async def create_user(user: User) -> User:
             'created': datetime.fromisoformat(user.created.isoformat()),
         },
     )
-    return User.parse_obj(assert_some(result)._mapping)
+    return parse_trusted(User, assert_some(result)._mapping)
 
 
 async def delete_user(user_id: int) -> None:
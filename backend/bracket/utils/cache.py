@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+KeyT = TypeVar('KeyT', bound=Hashable)
+ValueT = TypeVar('ValueT')
+
+
+class LRUCache(Generic[KeyT, ValueT]):
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[KeyT, ValueT] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: KeyT) -> ValueT | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: KeyT, value: ValueT) -> None:
+        if self.max_size < 1:
+            return
+
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RevisionedLRUCache(Generic[KeyT, ValueT]):
+    """
+    Bounded LRU cache of which every entry is only valid for the revision it was stored with.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: OrderedDict[KeyT, tuple[int, ValueT]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: KeyT, revision: int) -> ValueT | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        entry_revision, value = entry
+        if entry_revision != revision:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: KeyT, revision: int, value: ValueT) -> None:
+        if self.max_size < 1:
+            return
+
+        self._entries[key] = (revision, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SingleFlightTTLCache(Generic[KeyT, ValueT]):
+    """
+    Bounded cache of which every entry expires a fixed number of seconds after it was computed.
+
+    When an entry is missing or expired, only one coroutine computes it, concurrent callers wait
+    for that result instead of computing it as well. The value is computed in a separate task, so
+    it is not lost when the coroutine that started it is cancelled.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[KeyT, tuple[float, ValueT]] = OrderedDict()
+        self._pending: dict[KeyT, asyncio.Task[ValueT]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_compute(self, key: KeyT, compute: Callable[[], Awaitable[ValueT]]) -> ValueT:
+        if self.ttl_seconds <= 0 or self.max_size < 1:
+            return await compute()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                return value
+
+            del self._entries[key]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, compute))
+            self._pending[key] = task
+
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: KeyT, compute: Callable[[], Awaitable[ValueT]]) -> ValueT:
+        try:
+            value = await compute()
+        finally:
+            del self._pending[key]
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -3,6 +3,7 @@ from sqlalchemy import Table
 from sqlalchemy.sql import Select
 
 from bracket.utils.conversion import to_string_mapping
+from bracket.utils.decoding import parse_trusted
 from bracket.utils.logging import logger
 from bracket.utils.types import BaseModelT, assert_some
 
@@ -11,7 +12,7 @@ async def fetch_one_parsed(
     database: Database, model: type[BaseModelT], query: Select
 ) -> BaseModelT | None:
     record = await database.fetch_one(query)
-    return model.parse_obj(record._mapping) if record is not None else None
+    return parse_trusted(model, record._mapping) if record is not None else None
 
 
 async def fetch_one_parsed_certain(
@@ -24,7 +25,7 @@ async def fetch_all_parsed(
     database: Database, model: type[BaseModelT], query: Select
 ) -> list[BaseModelT]:
     records = await database.fetch_all(query)
-    return [model.parse_obj(record._mapping) for record in records]
+    return [parse_trusted(model, record._mapping) for record in records]
 
 
 async def insert_generic(
@@ -0,0 +1,267 @@
+import json
+from collections.abc import Callable, Mapping
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from functools import cache
+from types import NoneType
+from typing import Any
+
+from heliclockter import datetime_utc
+from pydantic import BaseModel, ValidationError
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+
+from bracket.config import config
+from bracket.utils.types import BaseModelT
+
+Decoder = Callable[[Any, dict[str, Any]], Any]
+
+
+def decode_datetime_utc(value: Any) -> datetime_utc:
+    if isinstance(value, datetime_utc):
+        return value
+
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = parse_datetime(value)
+    elif not isinstance(value, datetime):
+        value = parse_datetime(value)
+
+    return datetime_utc.from_datetime(value)
+
+
+def decode_decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value).strip())
+
+
+def get_validating_decoder(model: type[BaseModel], field: ModelField) -> Decoder:
+    def decode(value: Any, values: dict[str, Any]) -> Any:
+        result, errors = field.validate(value, values, loc=field.name, cls=model)
+        if errors:
+            raise ValidationError([errors], model)
+        return result
+
+    return decode
+
+
+def get_scalar_decoder(model: type[BaseModel], field: ModelField) -> Decoder:
+    """
+    Returns values of the exact type that is expected as-is, converts some well-known types
+    and leaves the rest to pydantic.
+    """
+    type_ = field.type_
+    validate = get_validating_decoder(model, field)
+    if type_ is datetime_utc:
+        return lambda value, _: decode_datetime_utc(value)
+    if type_ is Decimal:
+        return lambda value, _: decode_decimal(value)
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return lambda value, values: value if isinstance(value, type_) else type_(value)
+
+    # Also covers constrained types like `conint`, which are subclasses of their base type
+    for base_type in (bool, int, float, str):
+        if isinstance(type_, type) and issubclass(type_, base_type):
+            # The exact type, `bool` values of `int` fields are converted by pydantic
+            return lambda value, values: (
+                value
+                if type(value) is base_type  # pylint: disable=unidiomatic-typecheck
+                else validate(value, values)
+            )
+
+    if type_ is NoneType:
+        return lambda value, values: value if value is None else validate(value, values)
+
+    return validate
+
+
+@cache
+def get_union_member_checks(model: type[BaseModel]) -> list[tuple[str, bool, bool, bool]]:
+    return [
+        (
+            field.alias,
+            bool(field.required),
+            bool(field.required) or not field.allow_none,
+            field.type_ is NoneType,
+        )
+        for field in model.__fields__.values()
+    ]
+
+
+def fits_model(model: type[BaseModel], value: Any) -> bool:
+    """
+    Whether a value would be parsed as this model when it is one of the options of a union.
+    """
+    if isinstance(value, model):
+        return True
+    if not isinstance(value, Mapping):
+        return False
+
+    for name, required, disallows_none, must_be_none in get_union_member_checks(model):
+        if name not in value:
+            if required:
+                return False
+            continue
+
+        field_value = value[name]
+        if field_value is None:
+            if disallows_none:
+                return False
+        elif must_be_none:
+            return False
+
+    return True
+
+
+def get_union_decoder(model: type[BaseModel], field: ModelField) -> Decoder:
+    sub_fields = field.sub_fields or []
+    members = [sub_field.type_ for sub_field in sub_fields]
+    if not all(isinstance(member, type) and issubclass(member, BaseModel) for member in members):
+        return get_validating_decoder(model, field)
+
+    options = [(member, get_model_decoder(member)) for member in members]
+
+    def decode(value: Any, values: dict[str, Any]) -> Any:
+        for member, decode_member in options:
+            if fits_model(member, value):
+                try:
+                    return decode_member(value)
+                except (ValidationError, TypeError, ValueError):
+                    # Like pydantic, try the next member of the union instead
+                    continue
+
+        return get_validating_decoder(model, field)(value, values)
+
+    return decode
+
+
+def get_field_decoder(model: type[BaseModel], field: ModelField) -> Decoder:
+    if field.class_validators and any(not v.pre for v in field.class_validators.values()):
+        decode_value = get_validating_decoder(model, field)
+    elif field.shape == SHAPE_LIST and field.sub_fields:
+        decode_item = get_field_decoder(model, field.sub_fields[0])
+
+        def decode_value(value: Any, values: dict[str, Any]) -> Any:
+            return [decode_item(item, values) for item in value]
+
+    elif field.shape != SHAPE_SINGLETON:
+        decode_value = get_validating_decoder(model, field)
+    elif field.sub_fields:
+        decode_value = get_union_decoder(model, field)
+    elif isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+        decode_model = get_model_decoder(field.type_)
+
+        def decode_value(value: Any, values: dict[str, Any]) -> Any:
+            return decode_model(value)
+
+    else:
+        decode_value = get_scalar_decoder(model, field)
+
+    pre_validators = field.pre_validators or []
+    allow_none = field.allow_none
+
+    def decode(value: Any, values: dict[str, Any]) -> Any:
+        for validator in pre_validators:
+            value = validator(model, value, values, field, model.__config__)
+        if value is None and allow_none:
+            return None
+        return decode_value(value, values)
+
+    return decode
+
+
+def get_passthrough_type(field: ModelField) -> type | None:
+    """
+    The type of values that can be used as-is for this field, if there is one.
+    """
+    if field.pre_validators or field.class_validators or field.shape != SHAPE_SINGLETON:
+        return None
+    if field.sub_fields or not isinstance(field.type_, type):
+        return None
+    if field.type_ in (bool, int, float, str):
+        return field.type_
+    return None
+
+
+@cache
+def get_model_decoder(model: type[BaseModelT]) -> Callable[[Any], BaseModelT]:
+    """
+    Builds a function that creates a model from trusted data without validating it.
+
+    Values are only converted where they differ from the type of the field, and validators of the
+    model are still applied, so the result is the same as the result of `model.parse_obj`.
+    """
+    fields = [
+        (
+            name,
+            field.alias,
+            field,
+            get_passthrough_type(field),
+            field.allow_none and not field.pre_validators,
+            get_field_decoder(model, field),
+        )
+        for name, field in model.__fields__.items()
+    ]
+    pre_root_validators = model.__pre_root_validators__
+    post_root_validators = [validator for _, validator in model.__post_root_validators__]
+    init_private_attributes = len(model.__private_attributes__) > 0
+
+    def decode(data: Any) -> BaseModelT:
+        if isinstance(data, model):
+            return data
+
+        values = dict(data) if len(pre_root_validators) > 0 else data
+        for root_validator in pre_root_validators:
+            values = root_validator(model, values)
+
+        result: dict[str, Any] = {}
+        fields_set: set[str] = set()
+        for name, alias, field, passthrough_type, allows_none, decode_field in fields:
+            if alias in values:
+                value = values[alias]
+                # The exact type, values of subclasses like `bool` for `int` fields are converted
+                if type(value) is passthrough_type or (  # pylint: disable=unidiomatic-typecheck
+                    value is None and allows_none
+                ):
+                    result[name] = value
+                else:
+                    result[name] = decode_field(value, result)
+                fields_set.add(name)
+            elif field.required:
+                # Let pydantic raise a proper error
+                return model.parse_obj(data)
+            else:
+                result[name] = field.get_default()
+
+        for root_validator in post_root_validators:
+            result = root_validator(model, result)
+
+        # Equivalent to `model.construct(fields_set, **result)`, which would copy `result` again
+        instance = model.__new__(model)
+        object.__setattr__(instance, '__dict__', result)
+        object.__setattr__(instance, '__fields_set__', fields_set)
+        if init_private_attributes:
+            instance._init_private_attributes()
+        return instance
+
+    return decode
+
+
+def parse_trusted(model: type[BaseModelT], data: Any) -> BaseModelT:
+    """
+    Creates a model from a row returned by our own database, skipping most of the validation.
+
+    Set `VALIDATE_DB_ROWS` to validate the rows fully instead, to find rows that do not match
+    their models while debugging.
+    """
+    if config.validate_db_rows:
+        return model.parse_obj(data)
+
+    decode: Callable[[Any], BaseModelT] = get_model_decoder(model)
+    return decode(data)
+
+
+def parse_trusted_raw(model: type[BaseModelT], data: str | bytes) -> BaseModelT:
+    return parse_trusted(model, json.loads(data))
@@ -0,0 +1,34 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class TournamentEventBroker:
+    """
+    Wakes up the event streams of a tournament in this process when the tournament changes.
+
+    Changes made by other processes are not published here, so listeners should also check the
+    revision of the tournament periodically.
+    """
+
+    def __init__(self) -> None:
+        self.listeners: defaultdict[int, set[asyncio.Event]] = defaultdict(set)
+
+    def publish(self, tournament_id: int) -> None:
+        for listener in self.listeners.get(tournament_id, ()):
+            listener.set()
+
+    @contextmanager
+    def subscribe(self, tournament_id: int) -> Iterator[asyncio.Event]:
+        listener = asyncio.Event()
+        self.listeners[tournament_id].add(listener)
+        try:
+            yield listener
+        finally:
+            self.listeners[tournament_id].discard(listener)
+            if len(self.listeners[tournament_id]) < 1:
+                del self.listeners[tournament_id]
+
+
+tournament_events = TournamentEventBroker()
@@ -1,5 +1,9 @@
 from enum import auto
 
+from starlette import status
+from starlette.requests import Request
+from starlette.responses import Response
+
 from bracket.utils.types import EnumAutoStr
 
 
@@ -13,3 +17,34 @@ class HTTPMethod(EnumAutoStr):
     OPTIONS = auto()
     TRACE = auto()
     PATCH = auto()
+
+
+def get_revision_etag(revision: int) -> str:
+    return f'"{revision}"'
+
+
+def get_etag_headers(etag: str) -> dict[str, str]:
+    # `no-cache` makes clients revalidate their cached response using the ETag on every request
+    return {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    return any(tag.strip().removeprefix('W/') == etag for tag in if_none_match.split(','))
+
+
+def get_not_modified_response(request: Request, etag: str) -> Response | None:
+    """
+    Returns a `304 Not Modified` response if the client already has the version of the resource
+    with this ETag.
+    """
+    if not etag_matches(request, etag):
+        return None
+
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=get_etag_headers(etag))
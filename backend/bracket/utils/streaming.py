@@ -0,0 +1,32 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+
+def encode_json(value: Any) -> bytes:
+    """
+    Encodes a value to exactly the same bytes as FastAPI's default `JSONResponse` does.
+    """
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':'),
+    ).encode('utf-8')
+
+
+async def stream_data_list(items: AsyncIterator[BaseModel]) -> AsyncIterator[bytes]:
+    """
+    Encodes the items as `{"data": [...]}` while they are being fetched, one item at a time.
+    """
+    yield b'{"data":['
+    separator = b''
+    async for item in items:
+        yield separator + encode_json(item)
+        separator = b','
+
+    yield b']}'
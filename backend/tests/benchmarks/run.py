@@ -0,0 +1,263 @@
+"""
+Benchmarks of the ranking, Swiss pairing and round robin scheduling logic on synthetic stage items.
+
+Run from the backend directory:
+
+    python -m tests.benchmarks.run --teams 64 --rounds 20 --players-per-team 2
+
+Timings are stored relative to a fixed calibration workload, so a baseline that was recorded on one
+machine can be compared against runs on another one. Use `--update-baseline` to store the results
+as the new baseline after an intended change in performance.
+"""
+
+import json
+import math
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import click
+
+from bracket.logic.ranking.elo import determine_ranking_for_stage_items
+from bracket.logic.scheduling.ladder_teams import (
+    get_optimal_swiss_pairings,
+    get_possible_upcoming_matches_for_swiss,
+    swiss_suggestions_cache,
+)
+from bracket.logic.scheduling.round_robin import get_round_robin_combinations
+from bracket.models.db.match import MatchFilter, SuggestedMatch
+from tests.benchmarks.synthetic import get_synthetic_stage_item
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+MIN_BATCH_SECONDS = 0.05
+
+
+class Benchmark(NamedTuple):
+    name: str
+    run: Callable[[], Any]
+    # The number of items (matches, pairing attempts, ...) that one run processes
+    items_per_run: int
+    unit: str
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    seconds: float
+    relative_time: float
+    items_per_second: float
+    unit: str
+    peak_memory_bytes: int
+
+
+def calibrate(repeat: int) -> float:
+    """
+    Time of a fixed pure Python workload, the unit in which benchmark timings are compared.
+    """
+
+    def workload() -> None:
+        values: dict[int, float] = {}
+        for i in range(20_000):
+            values[i % 1000] = values.get(i % 1000, 0.0) + i / 7
+
+    return measure_time(workload, repeat)
+
+
+def measure_time(run: Callable[[], Any], repeat: int) -> float:
+    """
+    The fastest average time of a run over `repeat` batches, of which every batch takes at least
+    `MIN_BATCH_SECONDS`.
+    """
+    timer = timeit.Timer(run)
+    runs_per_batch = max(1, math.ceil(MIN_BATCH_SECONDS / max(timer.timeit(1), 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=runs_per_batch)) / runs_per_batch
+
+
+def measure_peak_memory(run: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def get_benchmarks(team_count: int, round_count: int, players_per_team: int) -> list[Benchmark]:
+    stage_item, teams = get_synthetic_stage_item(team_count, round_count, players_per_team)
+    match_count = sum(len(round_.matches) for round_ in stage_item.rounds)
+    match_filter = MatchFilter(elo_diff_threshold=200, limit=team_count, only_recommended=False)
+    team_pair_count = team_count * (team_count - 1) // 2
+
+    round_robin_match_count = sum(
+        len(matches) for matches in get_round_robin_combinations(team_count)
+    )
+
+    def get_upcoming_matches() -> list[SuggestedMatch]:
+        # Measures computing the suggestions, not reading them from the cache
+        swiss_suggestions_cache.clear()
+        return get_possible_upcoming_matches_for_swiss(match_filter, stage_item.rounds, teams)
+
+    return [
+        Benchmark(
+            'determine_ranking_for_stage_items',
+            lambda: determine_ranking_for_stage_items([stage_item]),
+            match_count,
+            'matches',
+        ),
+        Benchmark(
+            'get_possible_upcoming_matches_for_swiss',
+            get_upcoming_matches,
+            team_pair_count,
+            'team pairs',
+        ),
+        Benchmark(
+            'get_optimal_swiss_pairings',
+            lambda: get_optimal_swiss_pairings(match_filter, stage_item.rounds, teams),
+            team_pair_count,
+            'team pairs',
+        ),
+        Benchmark(
+            'get_round_robin_combinations',
+            lambda: get_round_robin_combinations(team_count),
+            round_robin_match_count,
+            'matches',
+        ),
+    ]
+
+
+def run_benchmarks(
+    team_count: int, round_count: int, players_per_team: int, repeat: int
+) -> list[BenchmarkResult]:
+    results = []
+    for benchmark_ in get_benchmarks(team_count, round_count, players_per_team):
+        # Warm up caches (lazy imports, the decoders of models) before measuring
+        benchmark_.run()
+        # Calibrating right before every benchmark compensates for changes in machine load
+        calibration_seconds = calibrate(repeat)
+        seconds = measure_time(benchmark_.run, repeat)
+        results.append(
+            BenchmarkResult(
+                name=benchmark_.name,
+                seconds=seconds,
+                relative_time=seconds / calibration_seconds,
+                items_per_second=benchmark_.items_per_run / seconds if seconds > 0 else 0.0,
+                unit=benchmark_.unit,
+                peak_memory_bytes=measure_peak_memory(benchmark_.run),
+            )
+        )
+
+    return results
+
+
+def get_baseline_key(team_count: int, round_count: int, players_per_team: int) -> str:
+    return f'teams={team_count},rounds={round_count},players_per_team={players_per_team}'
+
+
+def get_regressions(
+    results: list[BenchmarkResult],
+    baseline: dict[str, dict[str, float]],
+    max_slowdown: float,
+    max_memory_growth: float,
+) -> list[str]:
+    """
+    Describes every benchmark of which the time exceeds the baseline by more than a factor
+    `max_slowdown`, or of which the peak memory exceeds it by more than `max_memory_growth`.
+    """
+    regressions = []
+    for result in results:
+        if result.name not in baseline:
+            continue
+
+        expected = baseline[result.name]
+        if result.relative_time > expected['relative_time'] * max_slowdown:
+            regressions.append(
+                f'{result.name} takes {result.relative_time:.3f} calibration units, '
+                f'the baseline is {expected["relative_time"]:.3f}'
+            )
+        if result.peak_memory_bytes > expected['peak_memory_bytes'] * max_memory_growth:
+            regressions.append(
+                f'{result.name} uses {result.peak_memory_bytes} bytes at its peak, '
+                f'the baseline is {expected["peak_memory_bytes"]}'
+            )
+
+    return regressions
+
+
+def load_baselines(path: Path) -> dict[str, dict[str, dict[str, float]]]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def store_baseline(path: Path, key: str, results: list[BenchmarkResult]) -> None:
+    baselines = load_baselines(path)
+    baselines[key] = {
+        result.name: {
+            'relative_time': round(result.relative_time, 4),
+            'peak_memory_bytes': result.peak_memory_bytes,
+        }
+        for result in results
+    }
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+
+@click.command()
+@click.option('--teams', 'team_count', default=32, show_default=True)
+@click.option('--rounds', 'round_count', default=10, show_default=True)
+@click.option('--players-per-team', default=2, show_default=True)
+@click.option(
+    '--repeat', default=5, show_default=True, help='Runs per benchmark, the fastest one counts.'
+)
+@click.option(
+    '--max-slowdown',
+    default=2.0,
+    show_default=True,
+    help='Fail when a benchmark is slower than the baseline by this factor.',
+)
+@click.option(
+    '--max-memory-growth',
+    default=1.2,
+    show_default=True,
+    help='Fail when a benchmark uses more memory than the baseline by this factor.',
+)
+@click.option('--update-baseline', is_flag=True, help='Store the results as the new baseline.')
+@click.option('--baseline', 'baseline_path', type=click.Path(path_type=Path), default=BASELINE_PATH)
+def benchmark(
+    team_count: int,
+    round_count: int,
+    players_per_team: int,
+    repeat: int,
+    max_slowdown: float,
+    max_memory_growth: float,
+    update_baseline: bool,
+    baseline_path: Path,
+) -> None:
+    results = run_benchmarks(team_count, round_count, players_per_team, repeat)
+    for result in results:
+        click.echo(
+            f'{result.name:<42} {result.seconds * 1000:>10.3f} ms'
+            f' {result.items_per_second:>14,.0f} {result.unit}/s'
+            f' {result.peak_memory_bytes / 1024:>10,.1f} KiB peak'
+        )
+
+    key = get_baseline_key(team_count, round_count, players_per_team)
+    if update_baseline:
+        store_baseline(baseline_path, key, results)
+        click.echo(f'Stored the baseline for {key}')
+        return
+
+    baseline = load_baselines(baseline_path).get(key)
+    if baseline is None:
+        click.echo(f'There is no baseline for {key}, run with --update-baseline to store one')
+        return
+
+    regressions = get_regressions(results, baseline, max_slowdown, max_memory_growth)
+    for regression in regressions:
+        click.echo(f'Regression: {regression}', err=True)
+
+    if len(regressions) > 0:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    benchmark()  # pylint: disable=no-value-for-parameter
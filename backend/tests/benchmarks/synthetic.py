@@ -0,0 +1,107 @@
+import random
+from decimal import Decimal
+
+from bracket.logic.scheduling.round_robin import get_round_robin_combinations
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.stage_item import StageType
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.models.db.util import RoundWithMatches, StageItemWithRounds
+from bracket.utils.dummy_records import (
+    DUMMY_MATCH1,
+    DUMMY_PLAYER1,
+    DUMMY_ROUND1,
+    DUMMY_STAGE_ITEM1,
+    DUMMY_TEAM1,
+)
+
+SCORES = [0, 1, 2, 3, 5, 10]
+
+
+def get_synthetic_teams(
+    team_count: int, players_per_team: int, rng: random.Random
+) -> list[FullTeamWithPlayers]:
+    return [
+        FullTeamWithPlayers(
+            **DUMMY_TEAM1.copy(
+                update={
+                    'id': team_id,
+                    'name': f'Team {team_id}',
+                    'elo_score': Decimal(rng.randint(1000, 1400)),
+                }
+            ).dict(),
+            players=[
+                DUMMY_PLAYER1.copy(
+                    update={'id': player_id, 'name': f'Player {player_id}', 'team_id': team_id}
+                )
+                for player_id in range(team_id * players_per_team, (team_id + 1) * players_per_team)
+            ],
+        )
+        for team_id in range(1, team_count + 1)
+    ]
+
+
+def get_synthetic_stage_item(
+    team_count: int, round_count: int, players_per_team: int, seed: int = 0
+) -> tuple[StageItemWithRounds, list[FullTeamWithPlayers]]:
+    """
+    A stage item in which the teams play round robin pairings with random scores, followed by a
+    draft round without matches.
+    """
+    rng = random.Random(seed)
+    teams = get_synthetic_teams(team_count, players_per_team, rng)
+    pairings = get_round_robin_combinations(team_count)
+
+    rounds = []
+    match_id = 1
+    for round_index in range(round_count + 1):
+        is_draft = round_index == round_count
+        matches: list[MatchWithDetailsDefinitive | MatchWithDetails] = []
+        for team1_index, team2_index in [] if is_draft else pairings[round_index % len(pairings)]:
+            if team1_index >= team_count or team2_index >= team_count:
+                continue
+
+            team1, team2 = teams[team1_index], teams[team2_index]
+            matches.append(
+                MatchWithDetailsDefinitive(
+                    **DUMMY_MATCH1.copy(
+                        update={
+                            'id': match_id,
+                            'round_id': round_index + 1,
+                            'team1_id': team1.id,
+                            'team2_id': team2.id,
+                            'team1_score': rng.choice(SCORES),
+                            'team2_score': rng.choice(SCORES),
+                            'court_id': None,
+                        }
+                    ).dict(),
+                    team1=team1,
+                    team2=team2,
+                    court=None,
+                )
+            )
+            match_id += 1
+
+        rounds.append(
+            RoundWithMatches(
+                **DUMMY_ROUND1.copy(
+                    update={
+                        'id': round_index + 1,
+                        'stage_item_id': 1,
+                        'name': f'Round {round_index + 1:02d}',
+                        'is_draft': is_draft,
+                    }
+                ).dict(),
+                matches=matches,
+            )
+        )
+
+    # `construct` skips the validation of `team_count`, which is limited to 64 teams in the API
+    stage_item = StageItemWithRounds.construct(
+        **DUMMY_STAGE_ITEM1.copy(
+            update={'id': 1, 'stage_id': 1, 'type': StageType.SWISS, 'team_count': team_count}
+        ).dict(),
+        rounds=rounds,
+        inputs=[],
+        type_name='Swiss',
+    )
+    return stage_item, teams
@@ -9,7 +9,9 @@ import pytest
 from databases import Database
 
 from bracket.database import database, engine
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.schema import metadata
+from bracket.sql.stage_item_documents import sql_set_stage_item_document_triggers
 from tests.integration_tests.api.shared import UvicornTestServer
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import inserted_auth_context
@@ -28,6 +30,27 @@ async def startup_and_shutdown_uvicorn_server() -> AsyncIterator[None]:
         await server.down()
 
 
+@pytest.fixture(autouse=True)
+async def wait_for_ranking_recalculations() -> AsyncIterator[None]:
+    """
+    Finish recalculating rankings in the background before the next test changes the database
+    """
+    yield
+    await ranking_recalculator.wait_for_all()
+
+
+@pytest.fixture
+async def stage_item_document_triggers() -> AsyncIterator[None]:
+    """
+    Installs the triggers that invalidate stage item documents, which are disabled by default
+    """
+    await sql_set_stage_item_document_triggers(True)
+    try:
+        yield
+    finally:
+        await sql_set_stage_item_document_triggers(False)
+
+
 @pytest.fixture(scope="session")
 def event_loop() -> AsyncIterator[AbstractEventLoop]:  # type: ignore[misc]
     try:
@@ -1,10 +1,13 @@
 from bracket.database import database
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.models.db.match import Match
 from bracket.models.db.stage_item import StageType
 from bracket.schema import matches
+from bracket.sql.teams import get_team_by_id
 from bracket.utils.db import fetch_one_parsed_certain
 from bracket.utils.dummy_records import (
     DUMMY_COURT1,
+    DUMMY_COURT2,
     DUMMY_MATCH1,
     DUMMY_PLAYER1,
     DUMMY_PLAYER2,
@@ -15,6 +18,8 @@ from bracket.utils.dummy_records import (
     DUMMY_STAGE_ITEM1,
     DUMMY_TEAM1,
     DUMMY_TEAM2,
+    DUMMY_TEAM3,
+    DUMMY_TEAM4,
 )
 from bracket.utils.http import HTTPMethod
 from bracket.utils.types import assert_some
@@ -169,6 +174,13 @@ async def test_update_match(
         assert updated_match.team2_score == body['team2_score']
         assert updated_match.court_id == body['court_id']
 
+        tournament_id = assert_some(auth_context.tournament.id)
+        await ranking_recalculator.wait(tournament_id)
+        team1 = assert_some(await get_team_by_id(assert_some(team1_inserted.id), tournament_id))
+        team2 = assert_some(await get_team_by_id(assert_some(team2_inserted.id), tournament_id))
+        assert (team1.wins, team1.losses, team1.elo_score, team1.swiss_score) == (1, 0, 1216, 1)
+        assert (team2.wins, team2.losses, team2.elo_score, team2.swiss_score) == (0, 1, 1184, 0)
+
         await assert_row_count_and_clear(matches, 1)
 
 
@@ -313,3 +325,53 @@ async def test_upcoming_matches_endpoint(
                 }
             ]
         }
+
+
+async def test_create_matches_automatically(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id, 'type': StageType.SWISS})
+        ) as stage_item,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'is_draft': True, 'stage_item_id': stage_item.id})
+        ) as round_,
+        inserted_court(DUMMY_COURT1.copy(update={'tournament_id': tournament_id})),
+        inserted_court(DUMMY_COURT2.copy(update={'tournament_id': tournament_id})),
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_team(DUMMY_TEAM3.copy(update={'tournament_id': tournament_id})) as team3,
+        inserted_team(DUMMY_TEAM4.copy(update={'tournament_id': tournament_id})) as team4,
+    ):
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST, f'rounds/{round_.id}/schedule_auto', auth_context, {}
+            )
+            == SUCCESS_RESPONSE
+        )
+
+        # Both courts get a match, so every team plays
+        rows = await database.fetch_all(
+            query=matches.select().where(matches.c.round_id == round_.id)
+        )
+        assert len(rows) == 2
+        assert sorted(
+            team_id for row in rows for team_id in (row['team1_id'], row['team2_id'])
+        ) == [
+            team1.id,
+            team2.id,
+            team3.id,
+            team4.id,
+        ]
+
+        # All courts are taken, so scheduling again does not add matches
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST, f'rounds/{round_.id}/schedule_auto', auth_context, {}
+            )
+            == SUCCESS_RESPONSE
+        )
+        await assert_row_count_and_clear(matches, 2)
@@ -1,6 +1,10 @@
-from bracket.models.db.match import MatchRescheduleBody
+from heliclockter import timedelta
+
+from bracket.database import database
+from bracket.models.db.match import Match, MatchRescheduleBody
 from bracket.schema import matches
 from bracket.sql.matches import sql_get_match
+from bracket.utils.db import insert_generic
 from bracket.utils.dummy_records import (
     DUMMY_COURT1,
     DUMMY_COURT2,
@@ -82,3 +86,68 @@ async def test_reschedule_match(
 
     assert match.court_id == body.new_court_id
     assert match.position_in_schedule == 0
+
+
+async def test_reschedule_match_keeps_earlier_matches(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    start_time = auth_context.tournament.start_time + timedelta(minutes=60)
+    async with (
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id})) as stage_item,
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id})) as round_,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_court(DUMMY_COURT1.copy(update={'tournament_id': tournament_id})) as court,
+    ):
+        # The matches take 15 minutes each and start one hour after the start of the tournament
+        inserted_matches = [
+            (
+                await insert_generic(
+                    database,
+                    DUMMY_MATCH1.copy(
+                        update={
+                            'round_id': round_.id,
+                            'team1_id': team1.id,
+                            'team2_id': team2.id,
+                            'court_id': court.id,
+                            'start_time': start_time + timedelta(minutes=15 * position),
+                            'position_in_schedule': position,
+                        }
+                    ),
+                    matches,
+                    Match,
+                )
+            )[1]
+            for position in range(3)
+        ]
+        body = MatchRescheduleBody(
+            old_court_id=assert_some(court.id),
+            old_position=2,
+            new_court_id=assert_some(court.id),
+            new_position=1,
+        )
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST,
+                f'matches/{inserted_matches[2].id}/reschedule',
+                auth_context,
+                json=body.dict(),
+            )
+            == SUCCESS_RESPONSE
+        )
+        match1, match2, match3 = [
+            await sql_get_match(assert_some(match.id)) for match in inserted_matches
+        ]
+        await assert_row_count_and_clear(matches, 3)
+
+    assert (match1.position_in_schedule, match1.start_time) == (0, start_time)
+    assert (match3.position_in_schedule, match3.start_time) == (
+        1,
+        start_time + timedelta(minutes=15),
+    )
+    assert (match2.position_in_schedule, match2.start_time) == (
+        2,
+        start_time + timedelta(minutes=30),
+    )
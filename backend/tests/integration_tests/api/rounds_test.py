@@ -1,14 +1,23 @@
 from bracket.database import database
 from bracket.models.db.round import Round
 from bracket.models.db.stage_item import StageType
-from bracket.schema import rounds
+from bracket.schema import rounds, standings_snapshots
 from bracket.utils.db import fetch_one_parsed_certain
-from bracket.utils.dummy_records import DUMMY_ROUND1, DUMMY_STAGE1, DUMMY_STAGE_ITEM1, DUMMY_TEAM1
+from bracket.utils.dummy_records import (
+    DUMMY_MATCH1,
+    DUMMY_ROUND1,
+    DUMMY_STAGE1,
+    DUMMY_STAGE_ITEM1,
+    DUMMY_TEAM1,
+    DUMMY_TEAM2,
+)
 from bracket.utils.http import HTTPMethod
+from bracket.utils.types import assert_some
 from tests.integration_tests.api.shared import SUCCESS_RESPONSE, send_tournament_request
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import (
     assert_row_count_and_clear,
+    inserted_match,
     inserted_round,
     inserted_stage,
     inserted_stage_item,
@@ -94,3 +103,84 @@ async def test_update_round(
         assert updated_round.is_active == body['is_active']
 
         await assert_row_count_and_clear(rounds, 1)
+
+
+async def test_standings_as_of_round(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    closed = {'is_draft': False, 'is_active': False}
+    async with (
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id})) as stage_item,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id, 'is_active': True})
+        ) as round1,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id, 'is_draft': True})
+        ) as round2,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round1.id,
+                    'team1_id': team1.id,
+                    'team2_id': team2.id,
+                    'team1_score': 3,
+                    'team2_score': 1,
+                    'court_id': None,
+                }
+            )
+        ),
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round2.id,
+                    'team1_id': team1.id,
+                    'team2_id': team2.id,
+                    'team1_score': 0,
+                    'team2_score': 2,
+                    'court_id': None,
+                }
+            )
+        ),
+    ):
+        response = await send_tournament_request(
+            HTTPMethod.GET, f'rounds/{round1.id}/standings', auth_context
+        )
+        assert response['detail'] == (
+            f'There are no standings for round {round1.id}, it has not been closed yet'
+        )
+
+        for round_ in (round1, round2):
+            body = {'name': round_.name, **closed}
+            assert (
+                await send_tournament_request(
+                    HTTPMethod.PUT, f'rounds/{round_.id}', auth_context, None, body
+                )
+                == SUCCESS_RESPONSE
+            )
+
+        # Later rounds do not change the standings as of an earlier round
+        response = await send_tournament_request(
+            HTTPMethod.GET, f'rounds/{round1.id}/standings', auth_context
+        )
+        assert response['data']['teams'] == [
+            {'team_id': team1.id, 'wins': 1, 'draws': 0, 'losses': 0, 'swiss_score': 1.0},
+            {'team_id': team2.id, 'wins': 0, 'draws': 0, 'losses': 1, 'swiss_score': 0.0},
+        ]
+        response = await send_tournament_request(
+            HTTPMethod.GET, f'rounds/{round2.id}/standings', auth_context
+        )
+        assert response['data']['teams'] == [
+            {'team_id': team1.id, 'wins': 1, 'draws': 0, 'losses': 1, 'swiss_score': 1.0},
+            {'team_id': team2.id, 'wins': 1, 'draws': 0, 'losses': 1, 'swiss_score': 1.0},
+        ]
+
+        # Reopening a round removes its snapshot
+        body = {'name': round2.name, 'is_draft': False, 'is_active': True}
+        await send_tournament_request(
+            HTTPMethod.PUT, f'rounds/{round2.id}', auth_context, None, body
+        )
+        await assert_row_count_and_clear(standings_snapshots, 1)
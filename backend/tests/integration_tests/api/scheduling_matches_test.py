@@ -1,3 +1,6 @@
+from heliclockter import timedelta
+
+from bracket.logic.planning.matches import todo_schedule_all_matches
 from bracket.logic.scheduling.builder import build_matches_for_stage_item
 from bracket.models.db.stage_item import StageItemCreateBody
 from bracket.models.db.stage_item_inputs import (
@@ -9,10 +12,12 @@ from bracket.sql.stage_items import sql_create_stage_item
 from bracket.sql.stages import get_full_tournament_details
 from bracket.utils.dummy_records import (
     DUMMY_COURT1,
+    DUMMY_COURT2,
     DUMMY_STAGE2,
     DUMMY_STAGE_ITEM1,
     DUMMY_STAGE_ITEM3,
     DUMMY_TEAM1,
+    DUMMY_TOURNAMENT,
 )
 from bracket.utils.http import HTTPMethod
 from bracket.utils.types import assert_some
@@ -117,3 +122,57 @@ async def test_schedule_all_matches(
     assert len(stage_item.rounds) == 3
     for round_ in stage_item.rounds:
         assert len(round_.matches) == 2
+
+
+async def test_schedule_all_matches_on_courts(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_court(DUMMY_COURT1.copy(update={'tournament_id': tournament_id})),
+        inserted_court(DUMMY_COURT2.copy(update={'tournament_id': tournament_id})),
+        inserted_stage(DUMMY_STAGE2.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team3,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team4,
+    ):
+        stage_item = await sql_create_stage_item(
+            tournament_id,
+            StageItemCreateBody(
+                stage_id=assert_some(stage.id),
+                name=DUMMY_STAGE_ITEM1.name,
+                team_count=4,
+                type=DUMMY_STAGE_ITEM1.type,
+                inputs=[
+                    StageItemInputCreateBodyFinal(slot=slot, team_id=assert_some(team.id))
+                    for slot, team in enumerate([team1, team2, team3, team4], start=1)
+                ],
+            ),
+        )
+        await build_matches_for_stage_item(stage_item, tournament_id)
+        await todo_schedule_all_matches(tournament_id)
+
+        stages = await get_full_tournament_details(tournament_id)
+        await sql_delete_stage_item_with_foreign_keys(stage_item.id)
+
+    matches = [match for round_ in stages[0].stage_items[0].rounds for match in round_.matches]
+    assert len(matches) == 6
+
+    # Two matches are played at a time, so every team plays once in every time slot
+    for match in matches:
+        assert match.court_id is not None
+        assert match.start_time is not None
+        overlapping_matches = [
+            other_match
+            for other_match in matches
+            if other_match.id != match.id
+            and {match.team1_id, match.team2_id} & {other_match.team1_id, other_match.team2_id}
+            and assert_some(other_match.start_time) < match.end_time
+            and match.start_time < other_match.end_time
+        ]
+        assert overlapping_matches == []
+
+    assert max(match.end_time for match in matches) == auth_context.tournament.start_time + (
+        timedelta(minutes=3 * (DUMMY_TOURNAMENT.duration_minutes + DUMMY_TOURNAMENT.margin_minutes))
+    )
@@ -121,3 +121,36 @@ async def send_tournament_request(
         json=json,
         headers=auth_context.headers,
     )
+
+
+async def send_conditional_tournament_request(
+    endpoint: str, auth_context: AuthContext, etag: str | None
+) -> tuple[int, str | None]:
+    """
+    Sends a GET request with an `If-None-Match` header, returns the status code and the ETag.
+    """
+    tournament_endpoint = f'tournaments/{auth_context.tournament.id}'
+    headers = {**auth_context.headers, **({'If-None-Match': etag} if etag is not None else {})}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+            url=get_root_uvicorn_url() + f'{tournament_endpoint}/{endpoint}'.rstrip('/'),
+            headers=headers,
+        ) as resp:
+            await resp.read()
+            return resp.status, resp.headers.get('ETag')
+
+
+async def read_server_sent_event(response: aiohttp.ClientResponse) -> dict[str, str]:
+    """
+    Reads the next event from a `text/event-stream` response, skipping comments.
+    """
+    event: dict[str, str] = {}
+    async for line in response.content:
+        decoded = line.decode().rstrip('\n')
+        if decoded == '' and len(event) > 0:
+            return event
+        if decoded != '' and not decoded.startswith(':'):
+            field, _, value = decoded.partition(': ')
+            event[field] = value
+
+    raise AssertionError('Stream ended before an event was received')
@@ -1,14 +1,27 @@
+from heliclockter import timedelta
+
+from bracket.database import database
+from bracket.logic.ranking.elo import determine_ranking_for_stage_items
 from bracket.models.db.stage_item import StageType
 from bracket.models.db.stage_item_inputs import StageItemInputCreateBodyFinal
 from bracket.schema import matches, rounds, stage_items, stages
+from bracket.sql.rounds import get_round_by_id
 from bracket.sql.stage_items import get_stage_item
+from bracket.sql.stages import sql_get_full_tournament_details
 from bracket.utils.dummy_records import (
+    DUMMY_COURT1,
+    DUMMY_MATCH1,
+    DUMMY_PLAYER1,
+    DUMMY_PLAYER2,
+    DUMMY_ROUND1,
     DUMMY_STAGE1,
     DUMMY_STAGE2,
     DUMMY_STAGE_ITEM1,
     DUMMY_TEAM1,
+    DUMMY_TEAM2,
 )
 from bracket.utils.http import HTTPMethod
+from bracket.utils.types import assert_some
 from tests.integration_tests.api.shared import (
     SUCCESS_RESPONSE,
     send_tournament_request,
@@ -16,6 +29,10 @@ from tests.integration_tests.api.shared import (
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import (
     assert_row_count_and_clear,
+    inserted_court,
+    inserted_match,
+    inserted_player_in_team,
+    inserted_round,
     inserted_stage,
     inserted_stage_item,
     inserted_team,
@@ -61,6 +78,63 @@ async def test_create_stage_item(
         await assert_row_count_and_clear(stages, 1)
 
 
+async def test_get_stage_item_matches_full_tournament_details(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_stage(
+            DUMMY_STAGE2.copy(update={'tournament_id': auth_context.tournament.id})
+        ) as stage_inserted_1,
+        inserted_team(
+            DUMMY_TEAM1.copy(update={'tournament_id': auth_context.tournament.id})
+        ) as team_inserted_1,
+        inserted_team(
+            DUMMY_TEAM1.copy(update={'tournament_id': auth_context.tournament.id})
+        ) as team_inserted_2,
+    ):
+        assert auth_context.tournament.id and team_inserted_1.id and team_inserted_2.id
+        inputs = [
+            StageItemInputCreateBodyFinal(slot=1, team_id=team_inserted_1.id).dict(),
+            StageItemInputCreateBodyFinal(slot=2, team_id=team_inserted_2.id).dict(),
+        ]
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST,
+                'stage_items',
+                auth_context,
+                json={
+                    'type': StageType.SINGLE_ELIMINATION.value,
+                    'team_count': 2,
+                    'stage_id': stage_inserted_1.id,
+                    'inputs': inputs,
+                },
+            )
+            == SUCCESS_RESPONSE
+        )
+
+        [stage] = await sql_get_full_tournament_details(auth_context.tournament.id)
+        [expected_stage_item] = stage.stage_items
+        [expected_round] = expected_stage_item.rounds
+        assert len(expected_round.matches) == 1
+        assert len(expected_stage_item.inputs) == 2
+
+        stage_item = await get_stage_item(auth_context.tournament.id, expected_stage_item.id)
+        assert stage_item is not None
+        assert stage_item.dict(exclude={'inputs'}) == expected_stage_item.dict(exclude={'inputs'})
+        assert sorted(input_.slot for input_ in stage_item.inputs) == [1, 2]
+        assert (
+            await get_round_by_id(auth_context.tournament.id, assert_some(expected_round.id))
+            == expected_round
+        )
+        assert await get_stage_item(auth_context.tournament.id, -1) is None
+        assert await get_round_by_id(auth_context.tournament.id, -1) is None
+
+        await assert_row_count_and_clear(matches, 1)
+        await assert_row_count_and_clear(rounds, 1)
+        await assert_row_count_and_clear(stage_items, 1)
+        await assert_row_count_and_clear(stages, 1)
+
+
 async def test_delete_stage_item(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
 ) -> None:
@@ -107,3 +181,137 @@ async def test_update_stage_item(
         )
         assert updated_stage_item
         assert updated_stage_item.name == body['name']
+
+
+async def test_stage_item_standings(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id})) as stage_item,
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id})) as round_,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team3,
+        inserted_player_in_team(
+            DUMMY_PLAYER1.copy(update={'tournament_id': tournament_id}), assert_some(team1.id)
+        ),
+        inserted_player_in_team(
+            DUMMY_PLAYER2.copy(update={'tournament_id': tournament_id}), assert_some(team2.id)
+        ),
+    ):
+        for (team1_score, team2_score), (team_a, team_b) in [
+            ((3, 1), (team1, team2)),
+            ((2, 2), (team2, team3)),
+            ((0, 0), (team1, team3)),
+        ]:
+            await database.execute(
+                query=matches.insert(),
+                values=DUMMY_MATCH1.copy(
+                    update={
+                        'round_id': round_.id,
+                        'team1_id': team_a.id,
+                        'team2_id': team_b.id,
+                        'team1_score': team1_score,
+                        'team2_score': team2_score,
+                        'court_id': None,
+                    }
+                ).dict(),
+            )
+
+        response = await send_tournament_request(
+            HTTPMethod.GET, f'stage_items/{stage_item.id}/standings', auth_context
+        )
+        player_stats, team_stats = determine_ranking_for_stage_items(
+            [assert_some(await get_stage_item(tournament_id, assert_some(stage_item.id)))]
+        )
+        assert response['data']['teams'] == [
+            {'team_id': team1.id, 'wins': 1, 'draws': 0, 'losses': 0, 'swiss_score': 1.0},
+            {'team_id': team2.id, 'wins': 0, 'draws': 1, 'losses': 1, 'swiss_score': 0.5},
+            {'team_id': team3.id, 'wins': 0, 'draws': 1, 'losses': 0, 'swiss_score': 0.5},
+        ]
+        for results in response['data']['teams']:
+            stats = team_stats[results['team_id']]
+            assert (stats.wins, stats.draws, stats.losses, stats.swiss_score) == (
+                results['wins'],
+                results['draws'],
+                results['losses'],
+                results['swiss_score'],
+            )
+
+        assert len(response['data']['players']) == len(player_stats) == 2
+        for results in response['data']['players']:
+            stats = player_stats[results['player_id']]
+            assert (stats.wins, stats.losses, stats.swiss_score) == (
+                results['wins'],
+                results['losses'],
+                results['swiss_score'],
+            )
+
+        await assert_row_count_and_clear(matches, 3)
+
+
+async def test_start_next_round_adjusts_to_time(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id, 'type': StageType.SWISS})
+        ) as stage_item,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id, 'is_active': True})
+        ) as round1,
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id})) as round2,
+        inserted_court(DUMMY_COURT1.copy(update={'tournament_id': tournament_id})) as court,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round1.id,
+                    'team1_id': team1.id,
+                    'team2_id': team2.id,
+                    'court_id': court.id,
+                }
+            )
+        ) as previous_match,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round2.id,
+                    'team1_id': team1.id,
+                    'team2_id': team2.id,
+                    'court_id': None,
+                    'start_time': None,
+                    'position_in_schedule': None,
+                }
+            )
+        ) as next_match,
+    ):
+        # The previous match ends at 15 minutes (including its margin), the next round starts at 25
+        adjust_to_time = assert_some(previous_match.start_time) + timedelta(minutes=25)
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST,
+                f'stage_items/{stage_item.id}/start_next_round',
+                auth_context,
+                json={'adjust_to_time': adjust_to_time.isoformat()},
+            )
+            == SUCCESS_RESPONSE
+        )
+
+        stage_item_after = assert_some(await get_stage_item(tournament_id, stage_item.id))
+        [previous_match_after], [next_match_after] = (
+            round_.matches for round_ in stage_item_after.rounds
+        )
+        assert previous_match_after.custom_margin_minutes == 15
+        assert previous_match_after.end_time == adjust_to_time
+        assert next_match_after.id == next_match.id
+        assert next_match_after.court_id == court.id
+        assert next_match_after.start_time == adjust_to_time
+        assert next_match_after.position_in_schedule == 2
+
+        await assert_row_count_and_clear(matches, 2)
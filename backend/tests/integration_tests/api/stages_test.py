@@ -1,14 +1,31 @@
+from typing import Any
+
 import pytest
 
-from bracket.schema import rounds, stage_items, stages
-from bracket.sql.stages import get_full_tournament_details
+from bracket.database import database
+from bracket.models.db.match import MatchWithDetailsDefinitive
+from bracket.models.db.util import StageWithStageItems
+from bracket.schema import matches, rounds, stage_items, stages
+from bracket.sql.matches import sql_get_match
+from bracket.sql.stage_item_documents import (
+    sql_get_full_tournament_details_from_documents,
+    sql_refresh_stage_item_documents,
+)
+from bracket.sql.stages import get_full_tournament_details, sql_get_full_tournament_details
 from bracket.utils.dummy_records import (
+    DUMMY_COURT1,
+    DUMMY_MATCH1,
     DUMMY_MOCK_TIME,
+    DUMMY_PLAYER1,
     DUMMY_ROUND1,
+    DUMMY_ROUND2,
     DUMMY_STAGE1,
     DUMMY_STAGE2,
     DUMMY_STAGE_ITEM1,
+    DUMMY_STAGE_ITEM2,
+    DUMMY_STAGE_ITEM3,
     DUMMY_TEAM1,
+    DUMMY_TEAM2,
 )
 from bracket.utils.http import HTTPMethod
 from bracket.utils.types import assert_some
@@ -20,6 +37,9 @@ from tests.integration_tests.api.shared import (
 from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import (
     assert_row_count_and_clear,
+    inserted_court,
+    inserted_match,
+    inserted_player_in_team,
     inserted_round,
     inserted_stage,
     inserted_stage_item,
@@ -27,9 +47,14 @@ from tests.integration_tests.sql import (
 )
 
 
-@pytest.mark.parametrize(("with_auth",), [(True,), (False,)])
+@pytest.mark.parametrize(
+    ("with_auth", "stream"), [(True, False), (False, False), (True, True), (False, True)]
+)
 async def test_stages_endpoint(
-    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext, with_auth: bool
+    startup_and_shutdown_uvicorn_server: None,
+    auth_context: AuthContext,
+    with_auth: bool,
+    stream: bool,
 ) -> None:
     async with (
         inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': auth_context.tournament.id})),
@@ -44,11 +69,14 @@ async def test_stages_endpoint(
         ) as round_inserted,
     ):
         if with_auth:
-            response = await send_tournament_request(HTTPMethod.GET, 'stages', auth_context, {})
+            response = await send_tournament_request(
+                HTTPMethod.GET, f'stages?stream={stream}', auth_context, {}
+            )
         else:
             response = await send_request(
                 HTTPMethod.GET,
-                f'tournaments/{auth_context.tournament.id}/stages?no_draft_rounds=true',
+                f'tournaments/{auth_context.tournament.id}/stages'
+                f'?no_draft_rounds=true&stream={stream}',
             )
         assert response == {
             'data': [
@@ -86,6 +114,146 @@ async def test_stages_endpoint(
         }
 
 
+async def test_stages_endpoint_reflects_updates(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    async with (
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': auth_context.tournament.id})),
+        inserted_stage(
+            DUMMY_STAGE1.copy(update={'tournament_id': auth_context.tournament.id})
+        ) as stage_inserted,
+    ):
+        response = await send_tournament_request(HTTPMethod.GET, 'stages', auth_context, {})
+        assert response['data'][0]['name'] == DUMMY_STAGE1.name
+
+        body = {'name': 'Optimus'}
+        assert (
+            await send_tournament_request(
+                HTTPMethod.PUT, f'stages/{stage_inserted.id}', auth_context, None, body
+            )
+            == SUCCESS_RESPONSE
+        )
+
+        response = await send_tournament_request(HTTPMethod.GET, 'stages', auth_context, {})
+        assert response['data'][0]['name'] == body['name']
+
+
+async def test_stages_endpoint_stream_matches_regular_response(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})),
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage1,
+        inserted_stage(DUMMY_STAGE2.copy(update={'tournament_id': tournament_id})) as stage2,
+        inserted_stage(DUMMY_STAGE2.copy(update={'tournament_id': tournament_id})),
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage1.id})) as item1,
+        inserted_stage_item(DUMMY_STAGE_ITEM2.copy(update={'stage_id': stage1.id})),
+        inserted_stage_item(DUMMY_STAGE_ITEM3.copy(update={'stage_id': stage2.id})),
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': item1.id})),
+    ):
+        response = await send_tournament_request(HTTPMethod.GET, 'stages', auth_context, {})
+        for stage in response['data']:
+            stage['stage_items'].sort(key=lambda item: (item['name'], item['id']))
+
+        assert [len(stage['stage_items']) for stage in response['data']] == [2, 1, 0]
+        assert (
+            await send_tournament_request(HTTPMethod.GET, 'stages?stream=true', auth_context, {})
+            == response
+        )
+
+
+def stages_with_sorted_rounds(stages_: list[StageWithStageItems] | None) -> list[Any]:
+    assert stages_ is not None
+    return [
+        {
+            **stage.dict(exclude={'stage_items'}),
+            'stage_items': [
+                {**stage_item.dict(), 'rounds': sorted(stage_item.dict()['rounds'], key=str)}
+                for stage_item in stage.stage_items
+            ],
+        }
+        for stage in stages_
+    ]
+
+
+async def test_full_tournament_details_from_documents(
+    startup_and_shutdown_uvicorn_server: None,
+    auth_context: AuthContext,
+    stage_item_document_triggers: None,
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1_inserted,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2_inserted,
+        inserted_player_in_team(
+            DUMMY_PLAYER1.copy(update={'tournament_id': tournament_id}),
+            assert_some(team1_inserted.id),
+        ),
+        inserted_court(
+            DUMMY_COURT1.copy(update={'tournament_id': tournament_id})
+        ) as court_inserted,
+        inserted_stage(
+            DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})
+        ) as stage_inserted,
+        inserted_stage(DUMMY_STAGE2.copy(update={'tournament_id': tournament_id})),
+        inserted_stage_item(
+            DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage_inserted.id})
+        ) as stage_item_inserted,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'stage_item_id': stage_item_inserted.id})
+        ) as round_inserted,
+        inserted_round(DUMMY_ROUND2.copy(update={'stage_item_id': stage_item_inserted.id})),
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round_inserted.id,
+                    'team1_id': team1_inserted.id,
+                    'team2_id': team2_inserted.id,
+                    'court_id': court_inserted.id,
+                }
+            )
+        ),
+    ):
+        assert await sql_get_full_tournament_details_from_documents(tournament_id) is None
+        await sql_refresh_stage_item_documents(tournament_id)
+
+        filters: list[dict[str, Any]] = [
+            {},
+            {'no_draft_rounds': True},
+            {'round_id': round_inserted.id},
+            {'stage_id': stage_inserted.id},
+            {'stage_item_id': stage_item_inserted.id},
+        ]
+        for kwargs in filters:
+            assert stages_with_sorted_rounds(
+                await sql_get_full_tournament_details_from_documents(tournament_id, **kwargs)
+            ) == stages_with_sorted_rounds(
+                await sql_get_full_tournament_details(tournament_id, **kwargs)
+            )
+
+        await database.execute(
+            query='UPDATE players SET name = :name WHERE tournament_id = :tournament_id',
+            values={'name': 'Optimus', 'tournament_id': tournament_id},
+        )
+        assert await sql_get_full_tournament_details_from_documents(tournament_id) is None
+        await sql_refresh_stage_item_documents(tournament_id)
+
+        stages_ = await sql_get_full_tournament_details_from_documents(tournament_id)
+        assert stages_with_sorted_rounds(stages_) == stages_with_sorted_rounds(
+            await sql_get_full_tournament_details(tournament_id)
+        )
+        [match] = assert_some(stages_)[0].stage_items[0].rounds[0].matches
+        assert isinstance(match, MatchWithDetailsDefinitive)
+        assert [player.name for player in match.team1.players] == ['Optimus']
+
+        await database.execute(
+            query='UPDATE teams SET name = :name WHERE id = :team_id',
+            values={'name': 'Autobots', 'team_id': team2_inserted.id},
+        )
+        assert await sql_get_full_tournament_details_from_documents(tournament_id) is None
+
+
 async def test_create_stage(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
 ) -> None:
@@ -170,3 +338,57 @@ async def test_activate_stage(
 
         await assert_row_count_and_clear(stage_items, 1)
         await assert_row_count_and_clear(stages, 1)
+
+
+async def test_activate_stage_resolves_winners(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = assert_some(auth_context.tournament.id)
+    async with (
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1_inserted,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2_inserted,
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage1,
+        inserted_stage(DUMMY_STAGE2.copy(update={'tournament_id': tournament_id})) as stage2,
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage1.id})) as item1,
+        inserted_stage_item(DUMMY_STAGE_ITEM3.copy(update={'stage_id': stage2.id})) as item2,
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': item1.id})) as round1,
+        inserted_round(DUMMY_ROUND1.copy(update={'stage_item_id': item2.id})) as round2,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round1.id,
+                    'team1_id': team1_inserted.id,
+                    'team2_id': team2_inserted.id,
+                    'court_id': None,
+                }
+            )
+        ) as group_match,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round2.id,
+                    'team1_id': None,
+                    'team2_id': None,
+                    'team1_score': 0,
+                    'team2_score': 0,
+                    'court_id': None,
+                    'team1_winner_from_stage_item_id': item1.id,
+                    'team1_winner_position': 2,
+                    'team2_winner_from_match_id': group_match.id,
+                }
+            )
+        ) as knockout_match,
+    ):
+        assert (
+            await send_tournament_request(
+                HTTPMethod.POST, 'stages/activate?direction=next', auth_context, json={}
+            )
+            == SUCCESS_RESPONSE
+        )
+
+        # Team 2 won the only match of the group, so team 1 is second in its ranking
+        updated_match = await sql_get_match(assert_some(knockout_match.id))
+        assert updated_match.team1_id == team1_inserted.id
+        assert updated_match.team2_id == team2_inserted.id
+
+        await assert_row_count_and_clear(matches, 2)
@@ -1,3 +1,5 @@
+import pytest
+
 from bracket.database import database
 from bracket.models.db.team import Team
 from bracket.schema import teams
@@ -9,13 +11,16 @@ from tests.integration_tests.models import AuthContext
 from tests.integration_tests.sql import assert_row_count_and_clear, inserted_team
 
 
+@pytest.mark.parametrize(("stream",), [(False,), (True,)])
 async def test_teams_endpoint(
-    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext, stream: bool
 ) -> None:
     async with inserted_team(
         DUMMY_TEAM1.copy(update={'tournament_id': auth_context.tournament.id})
     ) as team_inserted:
-        assert await send_tournament_request(HTTPMethod.GET, 'teams', auth_context, {}) == {
+        assert await send_tournament_request(
+            HTTPMethod.GET, f'teams?stream={stream}', auth_context, {}
+        ) == {
             'data': [
                 {
                     'active': True,
@@ -1,16 +1,46 @@
+import json
+
+import aiohttp
+import pytest
+
+from bracket.config import config
 from bracket.database import database
+from bracket.logic.ranking.recalculation import ranking_recalculator
 from bracket.models.db.tournament import Tournament
-from bracket.schema import tournaments
+from bracket.schema import courts, teams, tournaments
 from bracket.utils.db import fetch_one_parsed_certain
-from bracket.utils.dummy_records import DUMMY_MOCK_TIME, DUMMY_TOURNAMENT
+from bracket.utils.dummy_records import (
+    DUMMY_COURT1,
+    DUMMY_MATCH1,
+    DUMMY_MOCK_TIME,
+    DUMMY_ROUND1,
+    DUMMY_STAGE1,
+    DUMMY_STAGE_ITEM1,
+    DUMMY_TEAM1,
+    DUMMY_TEAM2,
+    DUMMY_TOURNAMENT,
+)
 from bracket.utils.http import HTTPMethod
+from bracket.utils.types import assert_some
 from tests.integration_tests.api.shared import (
     SUCCESS_RESPONSE,
+    get_root_uvicorn_url,
+    read_server_sent_event,
     send_auth_request,
+    send_conditional_tournament_request,
     send_tournament_request,
 )
 from tests.integration_tests.models import AuthContext
-from tests.integration_tests.sql import assert_row_count_and_clear, inserted_tournament
+from tests.integration_tests.sql import (
+    assert_row_count_and_clear,
+    inserted_court,
+    inserted_match,
+    inserted_round,
+    inserted_stage,
+    inserted_stage_item,
+    inserted_team,
+    inserted_tournament,
+)
 
 
 async def test_tournaments_endpoint(
@@ -57,6 +87,186 @@ async def test_tournament_endpoint(
     }
 
 
+@pytest.mark.parametrize(
+    'endpoint', ['', 'stages', 'stages?stream=true', 'teams', 'courts', 'players']
+)
+async def test_tournament_endpoints_not_modified(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext, endpoint: str
+) -> None:
+    status, etag = await send_conditional_tournament_request(endpoint, auth_context, None)
+    assert status == 200
+    assert etag is not None
+
+    assert await send_conditional_tournament_request(endpoint, auth_context, etag) == (304, etag)
+    assert await send_conditional_tournament_request(endpoint, auth_context, '"0"') == (200, etag)
+
+    body = {'name': 'Some new court'}
+    await send_tournament_request(HTTPMethod.POST, 'courts', auth_context, json=body)
+    status, new_etag = await send_conditional_tournament_request(endpoint, auth_context, etag)
+    assert status == 200
+    assert new_etag not in (None, etag)
+    await assert_row_count_and_clear(courts, 1)
+
+
+async def test_tournament_changes_endpoint(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    response = await send_tournament_request(HTTPMethod.GET, 'changes?since=0', auth_context)
+    revision = response['data']['revision']
+
+    body = {'name': 'Some new name', 'active': True, 'player_ids': []}
+    team = await send_tournament_request(HTTPMethod.POST, 'teams', auth_context, None, body)
+    team_id = team['data']['id']
+
+    changes = await send_tournament_request(
+        HTTPMethod.GET, f'changes?since={revision}', auth_context
+    )
+    assert changes['data']['revision'] > revision
+    assert [team['id'] for team in changes['data']['teams']] == [team_id]
+    assert changes['data']['teams'][0]['players'] == []
+    assert changes['data']['matches'] == changes['data']['deleted_team_ids'] == []
+    revision = changes['data']['revision']
+
+    await send_tournament_request(HTTPMethod.DELETE, f'teams/{team_id}', auth_context)
+    changes = await send_tournament_request(
+        HTTPMethod.GET, f'changes?since={revision}', auth_context
+    )
+    assert changes['data']['teams'] == []
+    assert changes['data']['deleted_team_ids'] == [team_id]
+    revision = changes['data']['revision']
+
+    changes = await send_tournament_request(
+        HTTPMethod.GET, f'changes?since={revision}', auth_context
+    )
+    assert changes['data'] == {
+        'revision': revision,
+        'stage_items': [],
+        'rounds': [],
+        'matches': [],
+        'teams': [],
+        'deleted_stage_item_ids': [],
+        'deleted_round_ids': [],
+        'deleted_match_ids': [],
+        'deleted_team_ids': [],
+    }
+
+
+async def test_tournament_changes_endpoint_without_draft_rounds(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    tournament_id = auth_context.tournament.id
+    async with (
+        inserted_stage(DUMMY_STAGE1.copy(update={'tournament_id': tournament_id})) as stage,
+        inserted_stage_item(DUMMY_STAGE_ITEM1.copy(update={'stage_id': stage.id})) as stage_item,
+        inserted_round(
+            DUMMY_ROUND1.copy(update={'stage_item_id': stage_item.id, 'is_draft': True})
+        ) as round_,
+        inserted_team(DUMMY_TEAM1.copy(update={'tournament_id': tournament_id})) as team1,
+        inserted_team(DUMMY_TEAM2.copy(update={'tournament_id': tournament_id})) as team2,
+        inserted_court(DUMMY_COURT1.copy(update={'tournament_id': tournament_id})) as court,
+        inserted_match(
+            DUMMY_MATCH1.copy(
+                update={
+                    'round_id': round_.id,
+                    'team1_id': team1.id,
+                    'team2_id': team2.id,
+                    'court_id': court.id,
+                }
+            )
+        ) as match,
+    ):
+        changes = await send_tournament_request(
+            HTTPMethod.GET, 'changes?since=0&no_draft_rounds=true', auth_context
+        )
+        assert changes['data']['rounds'] == changes['data']['matches'] == []
+        revision = changes['data']['revision']
+
+        # Publishing the round returns its matches, although they did not change themselves
+        body = {'name': round_.name, 'is_draft': False, 'is_active': False}
+        await send_tournament_request(
+            HTTPMethod.PUT, f'rounds/{round_.id}', auth_context, None, body
+        )
+        changes = await send_tournament_request(
+            HTTPMethod.GET, f'changes?since={revision}&no_draft_rounds=true', auth_context
+        )
+        assert [row['id'] for row in changes['data']['rounds']] == [round_.id]
+        assert [row['id'] for row in changes['data']['matches']] == [match.id]
+        assert changes['data']['deleted_round_ids'] == changes['data']['deleted_match_ids'] == []
+        revision = changes['data']['revision']
+
+        # A round that becomes a draft again is removed, along with its matches
+        body = {'name': round_.name, 'is_draft': True, 'is_active': False}
+        await send_tournament_request(
+            HTTPMethod.PUT, f'rounds/{round_.id}', auth_context, None, body
+        )
+        changes = await send_tournament_request(
+            HTTPMethod.GET, f'changes?since={revision}&no_draft_rounds=true', auth_context
+        )
+        assert changes['data']['rounds'] == changes['data']['matches'] == []
+        assert changes['data']['deleted_round_ids'] == [round_.id]
+        assert changes['data']['deleted_match_ids'] == [match.id]
+
+
+async def test_ranking_status_endpoint(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    body = {'name': 'Some new name', 'active': True, 'player_ids': []}
+    await send_tournament_request(HTTPMethod.POST, 'teams', auth_context, None, body)
+    await ranking_recalculator.wait(assert_some(auth_context.tournament.id))
+
+    response = await send_tournament_request(HTTPMethod.GET, 'ranking_status', auth_context)
+    assert response['data']['revision'] > 0
+    assert response['data']['ranking_revision'] == response['data']['revision']
+
+    await assert_row_count_and_clear(teams, 1)
+
+
+async def test_tournament_events_endpoint(
+    startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
+) -> None:
+    url = f'{get_root_uvicorn_url()}tournaments/{auth_context.tournament.id}/events'
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers=auth_context.headers) as response:
+            assert response.headers['Content-Type'].startswith('text/event-stream')
+            event = await read_server_sent_event(response)
+            revision = json.loads(event['data'])['revision']
+            assert event == {'id': str(revision), 'event': 'revision', 'data': event['data']}
+
+            body = {'name': 'Some new name', 'active': True, 'player_ids': []}
+            await send_tournament_request(HTTPMethod.POST, 'teams', auth_context, None, body)
+
+            event = await read_server_sent_event(response)
+            assert int(event['id']) > revision
+
+    await assert_row_count_and_clear(teams, 1)
+
+
+async def test_tournament_events_endpoint_survives_quiet_polls(
+    startup_and_shutdown_uvicorn_server: None,
+    auth_context: AuthContext,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(config, 'tournament_events_poll_seconds', 0.01)
+    url = f'{get_root_uvicorn_url()}tournaments/{auth_context.tournament.id}/events'
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers=auth_context.headers) as response:
+            event = await read_server_sent_event(response)
+            revision = int(event['id'])
+
+            # Polls without changes only keep the connection alive
+            for _ in range(3):
+                assert await response.content.readline() == b': ping\n'
+                assert await response.content.readline() == b'\n'
+
+            body = {'name': 'Some new name', 'active': True, 'player_ids': []}
+            await send_tournament_request(HTTPMethod.POST, 'teams', auth_context, None, body)
+
+            event = await read_server_sent_event(response)
+            assert int(event['id']) > revision
+
+    await assert_row_count_and_clear(teams, 1)
+
+
 async def test_create_tournament(
     startup_and_shutdown_uvicorn_server: None, auth_context: AuthContext
 ) -> None:
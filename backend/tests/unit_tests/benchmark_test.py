@@ -0,0 +1,31 @@
+from tests.benchmarks.run import BenchmarkResult, get_regressions, run_benchmarks
+from tests.benchmarks.synthetic import get_synthetic_stage_item
+
+
+def test_synthetic_stage_item() -> None:
+    stage_item, teams = get_synthetic_stage_item(team_count=5, round_count=7, players_per_team=3)
+
+    assert len(teams) == 5
+    assert all(len(team.players) == 3 for team in teams)
+    assert [round_.is_draft for round_ in stage_item.rounds] == [False] * 7 + [True]
+    # With an odd number of teams, one team has a bye in every round
+    assert [len(round_.matches) for round_ in stage_item.rounds] == [2] * 7 + [0]
+
+
+def test_benchmark_regressions() -> None:
+    results = run_benchmarks(team_count=4, round_count=2, players_per_team=1, repeat=1)
+    assert [result.name for result in results] == [
+        'determine_ranking_for_stage_items',
+        'get_possible_upcoming_matches_for_swiss',
+        'get_optimal_swiss_pairings',
+        'get_round_robin_combinations',
+    ]
+
+    result = BenchmarkResult('ranking', 0.1, 3.0, 10.0, 'matches', peak_memory_bytes=1300)
+    baseline = {'ranking': {'relative_time': 1.0, 'peak_memory_bytes': 1000}}
+    assert not get_regressions([result], baseline, max_slowdown=4.0, max_memory_growth=1.5)
+    assert get_regressions([result], baseline, max_slowdown=2.0, max_memory_growth=1.2) == [
+        'ranking takes 3.000 calibration units, the baseline is 1.000',
+        'ranking uses 1300 bytes at its peak, the baseline is 1000',
+    ]
+    assert not get_regressions([result], {}, max_slowdown=1.0, max_memory_growth=1.0)
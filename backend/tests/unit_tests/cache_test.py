@@ -0,0 +1,100 @@
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+
+import pytest
+
+from bracket.utils.cache import RevisionedLRUCache, SingleFlightTTLCache
+
+
+def run(coroutine: Coroutine[Any, Any, None]) -> None:
+    # Use a separate loop, so the loop of the integration tests is not touched
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_revisioned_lru_cache_invalidates_on_new_revision() -> None:
+    cache: RevisionedLRUCache[int, str] = RevisionedLRUCache(max_size=2)
+    cache.set(1, revision=5, value='a')
+
+    assert cache.get(1, revision=5) == 'a'
+    assert cache.get(1, revision=6) is None
+    assert cache.get(1, revision=5) is None
+
+
+def test_revisioned_lru_cache_evicts_least_recently_used() -> None:
+    cache: RevisionedLRUCache[int, str] = RevisionedLRUCache(max_size=2)
+    cache.set(1, revision=1, value='a')
+    cache.set(2, revision=1, value='b')
+    assert cache.get(1, revision=1) == 'a'
+
+    cache.set(3, revision=1, value='c')
+
+    assert len(cache) == 2
+    assert cache.get(2, revision=1) is None
+    assert cache.get(1, revision=1) == 'a'
+    assert cache.get(3, revision=1) == 'c'
+
+
+def test_revisioned_lru_cache_disabled() -> None:
+    cache: RevisionedLRUCache[int, str] = RevisionedLRUCache(max_size=0)
+    cache.set(1, revision=1, value='a')
+    assert cache.get(1, revision=1) is None
+
+
+def test_single_flight_ttl_cache_computes_once() -> None:
+    cache: SingleFlightTTLCache[int, int] = SingleFlightTTLCache(ttl_seconds=60, max_size=2)
+    calls = 0
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def check() -> None:
+        results = await asyncio.gather(*[cache.get_or_compute(1, compute) for _ in range(10)])
+        assert results == [1] * 10
+        assert await cache.get_or_compute(1, compute) == 1
+
+    run(check())
+    assert calls == 1
+
+
+def test_single_flight_ttl_cache_expires() -> None:
+    cache: SingleFlightTTLCache[int, str] = SingleFlightTTLCache(ttl_seconds=0.01, max_size=2)
+
+    async def compute_a() -> str:
+        return 'a'
+
+    async def compute_b() -> str:
+        return 'b'
+
+    async def check() -> None:
+        assert await cache.get_or_compute(1, compute_a) == 'a'
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_compute(1, compute_b) == 'b'
+
+    run(check())
+
+
+def test_single_flight_ttl_cache_does_not_store_errors() -> None:
+    cache: SingleFlightTTLCache[int, str] = SingleFlightTTLCache(ttl_seconds=60, max_size=2)
+
+    async def fail() -> str:
+        raise ValueError('failed')
+
+    async def compute() -> str:
+        return 'a'
+
+    async def check() -> None:
+        with pytest.raises(ValueError, match='failed'):
+            await cache.get_or_compute(1, fail)
+
+        assert await cache.get_or_compute(1, compute) == 'a'
+
+    run(check())
+    assert len(cache) == 1
@@ -0,0 +1,60 @@
+from bracket.logic.scheduling.compatibility import (
+    compatibility_indices,
+    get_compatibility_index,
+    iterate_bits,
+)
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.utils.dummy_records import DUMMY_MATCH1, DUMMY_PLAYER1, DUMMY_TEAM1
+from tests.unit_tests.shared import get_match, get_round
+
+STAGE_ITEM_ID = -1
+
+
+def get_team(team_id: int, player_ids: list[int]) -> FullTeamWithPlayers:
+    players = [DUMMY_PLAYER1.copy(update={'id': player_id}) for player_id in player_ids]
+    return FullTeamWithPlayers(id=team_id, **DUMMY_TEAM1.dict(), players=players)
+
+
+def test_iterate_bits() -> None:
+    assert not list(iterate_bits(0))
+    assert list(iterate_bits(0b101001)) == [0, 3, 5]
+
+
+def test_shared_players_and_played_before() -> None:
+    compatibility_indices.clear()
+    team1, team2, team3 = get_team(3, [1, 2]), get_team(1, [2]), get_team(2, [3])
+    rounds = [get_round([get_match(DUMMY_MATCH1, team2, team3)], is_draft=False)]
+    index = get_compatibility_index(STAGE_ITEM_ID, rounds, [team1, team2, team3])
+
+    # Teams are ordered by id, so team 2 (id 1) is at position 0
+    assert index.team_ids == [1, 2, 3]
+    assert index.shared_players == [0b101, 0b010, 0b101]
+    assert index.played_before == [0b010, 0b001, 0b000]
+    assert index.times_played == [1, 1, 0]
+
+
+def test_index_is_updated_incrementally() -> None:
+    compatibility_indices.clear()
+    teams = [get_team(1, [1]), get_team(2, [2]), get_team(3, [3])]
+    match1 = get_match(DUMMY_MATCH1.copy(update={'id': 1}), teams[0], teams[1])
+    match2 = get_match(DUMMY_MATCH1.copy(update={'id': 2}), teams[1], teams[2])
+
+    index = get_compatibility_index(STAGE_ITEM_ID, [get_round([match1], is_draft=False)], teams)
+    assert index.played_before == [0b010, 0b001, 0b000]
+
+    rounds = [get_round([match1], is_draft=False), get_round([match2], is_draft=False)]
+    assert get_compatibility_index(STAGE_ITEM_ID, rounds, teams) is index
+    assert index.played_before == [0b010, 0b101, 0b010]
+    assert index.times_played == [1, 2, 1]
+
+    # Removing a match requires a new index
+    new_index = get_compatibility_index(STAGE_ITEM_ID, [get_round([match2], is_draft=False)], teams)
+    assert new_index is not index
+    assert new_index.played_before == [0b000, 0b100, 0b010]
+
+    # As does changing the players of a team
+    teams[0] = get_team(1, [2, 3])
+    rounds = [get_round([match2], is_draft=False)]
+    changed_index = get_compatibility_index(STAGE_ITEM_ID, rounds, teams)
+    assert changed_index is not new_index
+    assert changed_index.shared_players == [0b111, 0b011, 0b101]
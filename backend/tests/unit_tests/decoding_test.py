@@ -0,0 +1,171 @@
+import json
+from decimal import Decimal
+from typing import Any
+
+from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.stage_item_inputs import StageItemInputFinal, StageItemInputTentative
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.models.db.util import StageWithStageItems
+from bracket.utils.decoding import get_model_decoder, parse_trusted
+
+CREATED = '2022-01-11T04:32:11.000000+00:00'
+
+
+def get_team(team_id: int, players: Any) -> dict[str, Any]:
+    return {
+        'id': team_id,
+        'created': CREATED,
+        'name': f'Team {team_id}',
+        'tournament_id': 1,
+        'active': True,
+        'elo_score': 1200.5,
+        'swiss_score': 1,
+        'wins': 1,
+        'draws': 0,
+        'losses': 0,
+        'players': players,
+    }
+
+
+def get_match(match_id: int, team1: Any, team2: Any) -> dict[str, Any]:
+    return {
+        'id': match_id,
+        'created': CREATED,
+        'start_time': None,
+        'duration_minutes': 10,
+        'margin_minutes': 5,
+        'custom_duration_minutes': None,
+        'custom_margin_minutes': None,
+        'position_in_schedule': None,
+        'round_id': 1,
+        'team1_score': 2,
+        'team2_score': 1,
+        'court_id': None,
+        'court': None,
+        'team1_id': team1['id'] if team1 is not None else None,
+        'team2_id': team2['id'] if team2 is not None else None,
+        'team1': team1,
+        'team2': team2,
+        'team1_winner_position': None,
+        'team1_winner_from_stage_item_id': None,
+        'team2_winner_from_stage_item_id': None,
+        'team2_winner_position': None,
+        'team1_winner_from_match_id': None,
+        'team2_winner_from_match_id': 1 if team2 is None else None,
+    }
+
+
+STAGE_ROW = {
+    'id': 1,
+    'tournament_id': 1,
+    'name': 'Group stage',
+    'created': CREATED,
+    'is_active': True,
+    'stage_items': json.dumps(
+        [
+            {
+                'id': 1,
+                'stage_id': 1,
+                'name': 'Swiss',
+                'created': CREATED,
+                'type': 'SWISS',
+                'team_count': 2,
+                'inputs': [
+                    {'id': 1, 'slot': 1, 'tournament_id': 1, 'stage_item_id': 1, 'team_id': 1},
+                    {
+                        'id': 2,
+                        'slot': 2,
+                        'tournament_id': 1,
+                        'stage_item_id': 1,
+                        'winner_from_stage_item_id': 3,
+                        'winner_position': 1,
+                    },
+                    None,
+                ],
+                'rounds': [
+                    {
+                        'id': 1,
+                        'stage_item_id': 1,
+                        'created': CREATED,
+                        'is_draft': False,
+                        'is_active': True,
+                        'name': 'Round 01',
+                        'matches': [
+                            get_match(
+                                1,
+                                get_team(
+                                    1,
+                                    [
+                                        {
+                                            'id': 1,
+                                            'active': True,
+                                            'name': 'Player 1',
+                                            'created': CREATED,
+                                            'tournament_id': 1,
+                                            'elo_score': 1210.25,
+                                            'swiss_score': '0.5',
+                                        }
+                                    ],
+                                ),
+                                get_team(2, json.dumps([None])),
+                            ),
+                            get_match(2, get_team(1, []), None),
+                        ],
+                    },
+                    {
+                        'id': 2,
+                        'stage_item_id': 1,
+                        'created': CREATED,
+                        'is_draft': True,
+                        'name': 'Round 02',
+                        'matches': [None],
+                    },
+                ],
+            }
+        ]
+    ),
+}
+
+
+def assert_same_models(left: Any, right: Any) -> None:
+    assert type(left) is type(right)
+    if isinstance(left, list):
+        assert len(left) == len(right)
+        for left_item, right_item in zip(left, right, strict=True):
+            assert_same_models(left_item, right_item)
+    elif hasattr(left, '__fields__'):
+        assert left.__fields_set__ == right.__fields_set__
+        for name in left.__fields__:
+            assert_same_models(getattr(left, name), getattr(right, name))
+    else:
+        assert left == right
+
+
+def test_parse_trusted_matches_parse_obj() -> None:
+    expected = StageWithStageItems.parse_obj(STAGE_ROW)
+    result = parse_trusted(StageWithStageItems, STAGE_ROW)
+
+    assert_same_models(result, expected)
+    assert result.json() == expected.json()
+
+    stage_item = result.stage_items[0]
+    assert stage_item.type_name == 'Swiss'
+    assert [type(input_) for input_ in stage_item.inputs] == [
+        StageItemInputFinal,
+        StageItemInputTentative,
+    ]
+    assert [type(match) for match in stage_item.rounds[0].matches] == [
+        MatchWithDetailsDefinitive,
+        MatchWithDetails,
+    ]
+    assert stage_item.rounds[1].matches == []
+
+    match = stage_item.rounds[0].matches[0]
+    assert isinstance(match, MatchWithDetailsDefinitive)
+    assert match.team1.players[0].elo_score == Decimal('1210.25')
+    assert match.team2.players == []
+
+
+def test_model_decoder_accepts_models() -> None:
+    team = FullTeamWithPlayers.parse_obj(get_team(1, []))
+    assert get_model_decoder(FullTeamWithPlayers)(team) is team
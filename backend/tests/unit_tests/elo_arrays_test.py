@@ -0,0 +1,114 @@
+import random
+from collections import defaultdict
+from typing import Any
+
+import pytest
+
+from bracket.logic.ranking import elo
+from bracket.logic.ranking.elo import replay_rounds, set_statistics_for_match
+from bracket.models.db.match import MatchWithDetailsDefinitive
+from bracket.models.db.players import PlayerStatistics
+from bracket.models.db.team import FullTeamWithPlayers
+from bracket.utils.dummy_records import DUMMY_PLAYER1
+
+pytest.importorskip('numpy')
+
+from bracket.logic.ranking.elo_arrays import replay_rounds_with_arrays  # noqa: E402
+
+
+def get_team(team_id: int, player_ids: list[int]) -> FullTeamWithPlayers:
+    return FullTeamWithPlayers.construct(
+        id=team_id,
+        players=[DUMMY_PLAYER1.copy(update={'id': player_id}) for player_id in player_ids],
+    )
+
+
+def get_random_rounds(seed: int) -> list[list[MatchWithDetailsDefinitive]]:
+    rng = random.Random(seed)
+    # Teams 1 to 30 have two players each, teams 31 to 35 have no players
+    teams = [get_team(team_id, [2 * team_id, 2 * team_id + 1]) for team_id in range(1, 31)]
+    teams += [get_team(team_id, []) for team_id in range(31, 36)]
+
+    rounds = []
+    for _ in range(20):
+        shuffled = rng.sample(teams, len(teams))
+        # Some teams play twice in a round, so matches in a round depend on each other
+        shuffled += rng.sample(teams, 6)
+        rounds.append(
+            [
+                MatchWithDetailsDefinitive.construct(
+                    team1=team1,
+                    team2=team2,
+                    team1_score=rng.choice([0, 1, 2, 3, 10]),
+                    team2_score=rng.choice([0, 1, 2, 3, 10]),
+                )
+                for team1, team2 in zip(shuffled[::2], shuffled[1::2])
+            ]
+        )
+
+    return rounds
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_replay_rounds_with_arrays_matches_python(seed: int) -> None:
+    rounds = get_random_rounds(seed)
+
+    expected_players: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
+    expected_teams: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
+    expected_snapshots = []
+    for matches in rounds:
+        for match in matches:
+            set_statistics_for_match(match, expected_players, expected_teams)
+        expected_snapshots.append(
+            (
+                {
+                    player_id: expected_players[player_id].copy()
+                    for match in matches
+                    for player_id in match.player_ids
+                },
+                {
+                    team.id: expected_teams[team.id].copy()
+                    for match in matches
+                    for team in match.teams
+                    if team.id is not None
+                },
+            )
+        )
+
+    players: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
+    teams: defaultdict[int, PlayerStatistics] = defaultdict(PlayerStatistics)
+    snapshots = replay_rounds_with_arrays(rounds, players, teams, snapshot_rounds=True)
+    assert snapshots == expected_snapshots
+    assert list(players.items()) == list(expected_players.items())
+    assert list(teams.items()) == list(expected_teams.items())
+    assert [str(stats.swiss_score) for stats in players.values()] == [
+        str(stats.swiss_score) for stats in expected_players.values()
+    ]
+
+    # Continue from the state of the first half, like an incremental recompute does
+    players = defaultdict(PlayerStatistics)
+    teams = defaultdict(PlayerStatistics)
+    replay_rounds(rounds[:10], players, teams)
+    replay_rounds_with_arrays(rounds[10:], players, teams)
+    assert players == expected_players
+    assert teams == expected_teams
+
+
+def test_replay_rounds_uses_arrays_for_large_replays(monkeypatch: pytest.MonkeyPatch) -> None:
+    replayed_with_arrays = []
+
+    def replay_rounds_with_arrays_spy(
+        rounds: list[list[MatchWithDetailsDefinitive]], *args: Any, **kwargs: Any
+    ) -> Any:
+        replayed_with_arrays.append(len(rounds))
+        return replay_rounds_with_arrays(rounds, *args, **kwargs)
+
+    monkeypatch.setattr(elo, 'replay_rounds_with_arrays', replay_rounds_with_arrays_spy)
+    rounds = get_random_rounds(0)
+    assert sum(len(matches) for matches in rounds[:2]) < elo.ARRAY_ENGINE_MIN_MATCHES
+
+    replay_rounds(rounds[:2], defaultdict(PlayerStatistics), defaultdict(PlayerStatistics))
+    assert not replayed_with_arrays
+
+    replay_rounds(rounds, defaultdict(PlayerStatistics), defaultdict(PlayerStatistics))
+    assert replayed_with_arrays == [len(rounds)]
@@ -2,6 +2,8 @@ from decimal import Decimal
 
 from bracket.logic.ranking.elo import (
     determine_ranking_for_stage_items,
+    determine_ranking_for_tournament_incrementally,
+    ranking_checkpoints,
 )
 from bracket.models.db.match import MatchWithDetailsDefinitive
 from bracket.models.db.players import PlayerStatistics
@@ -13,6 +15,7 @@ from bracket.utils.dummy_records import (
     DUMMY_PLAYER2,
     DUMMY_STAGE_ITEM1,
 )
+from bracket.utils.types import assert_some
 
 
 def test_elo_calculation() -> None:
@@ -87,3 +90,92 @@ def test_elo_calculation() -> None:
         3: PlayerStatistics(losses=1, elo_score=1184, swiss_score=Decimal('0.00')),
         4: PlayerStatistics(wins=1, elo_score=1216, swiss_score=Decimal('1.00')),
     }
+
+
+def get_definitive_match(
+    match_id: int, round_id: int, team1_score: int, team2_score: int, team_ids: tuple[int, int]
+) -> MatchWithDetailsDefinitive:
+    team1_id, team2_id = team_ids
+    return MatchWithDetailsDefinitive(
+        id=match_id,
+        created=DUMMY_MOCK_TIME,
+        start_time=DUMMY_MOCK_TIME,
+        team1_id=team1_id,
+        team2_id=team2_id,
+        team1_winner_from_stage_item_id=None,
+        team1_winner_position=None,
+        team1_winner_from_match_id=None,
+        team2_winner_from_stage_item_id=None,
+        team2_winner_position=None,
+        team2_winner_from_match_id=None,
+        team1_score=team1_score,
+        team2_score=team2_score,
+        round_id=round_id,
+        court_id=None,
+        court=None,
+        duration_minutes=10,
+        margin_minutes=5,
+        custom_duration_minutes=None,
+        custom_margin_minutes=None,
+        position_in_schedule=0,
+        team1=FullTeamWithPlayers(
+            id=team1_id,
+            name=f'Team {team1_id}',
+            tournament_id=1,
+            active=True,
+            created=DUMMY_MOCK_TIME,
+            players=[DUMMY_PLAYER1.copy(update={'id': team1_id})],
+        ),
+        team2=FullTeamWithPlayers(
+            id=team2_id,
+            name=f'Team {team2_id}',
+            tournament_id=1,
+            active=True,
+            created=DUMMY_MOCK_TIME,
+            players=[DUMMY_PLAYER2.copy(update={'id': team2_id})],
+        ),
+    )
+
+
+def get_swiss_stage_item(scores: list[tuple[int, int]]) -> StageItemWithRounds:
+    pairings = [(1, 2), (3, 4), (1, 3), (2, 4), (1, 4), (2, 3)]
+    rounds = [
+        RoundWithMatches(
+            id=round_id,
+            stage_item_id=1,
+            created=DUMMY_MOCK_TIME,
+            is_draft=False,
+            is_active=False,
+            name=f'Round {round_id}',
+            matches=[
+                get_definitive_match(match_id, round_id, *scores[match_id], pairings[match_id])
+                for match_id in (2 * round_id, 2 * round_id + 1)
+            ],
+        )
+        for round_id in range(3)
+    ]
+    return StageItemWithRounds(
+        **DUMMY_STAGE_ITEM1.copy(update={'rounds': rounds}).dict(), id=1, inputs=[]
+    )
+
+
+def test_incremental_elo_calculation() -> None:
+    scores = [(2, 1), (0, 3), (1, 1), (4, 2), (0, 1), (2, 0)]
+    determine_ranking_for_tournament_incrementally(-1, [get_swiss_stage_item(scores)])
+    first_checkpoints = assert_some(ranking_checkpoints.get(-1))
+
+    scores[4] = (3, 0)
+    stage_items = [get_swiss_stage_item(scores)]
+    result = determine_ranking_for_tournament_incrementally(-1, stage_items)
+    assert result == determine_ranking_for_stage_items(stage_items)
+
+    # Only the last round is replayed
+    checkpoints = assert_some(ranking_checkpoints.get(-1))
+    assert checkpoints[:2] == first_checkpoints[:2]
+    assert checkpoints[0] is first_checkpoints[0] and checkpoints[1] is first_checkpoints[1]
+    assert checkpoints[2] != first_checkpoints[2]
+
+    scores[0] = (0, 0)
+    stage_items = [get_swiss_stage_item(scores)]
+    result = determine_ranking_for_tournament_incrementally(-1, stage_items)
+    assert result == determine_ranking_for_stage_items(stage_items)
@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+from bracket.logic.ranking.recalculation import RankingRecalculator
+from tests.unit_tests.cache_test import run
+
+
+def test_ranking_recalculator_coalesces_changes() -> None:
+    recalculated: list[int] = []
+    started = asyncio.Event()
+    proceed = asyncio.Event()
+
+    async def recalculate(tournament_id: int) -> None:
+        recalculated.append(tournament_id)
+        started.set()
+        await proceed.wait()
+
+    async def test() -> None:
+        recalculator = RankingRecalculator(recalculate, delay_seconds=0.01)
+        for _ in range(5):
+            recalculator.schedule(1)
+        recalculator.schedule(2)
+
+        await started.wait()
+        assert recalculated == [1, 2]
+
+        # A change during a recalculation results in exactly one more recalculation
+        recalculator.schedule(1)
+        recalculator.schedule(1)
+        proceed.set()
+        await recalculator.wait_for_all()
+        assert recalculated == [1, 2, 1]
+
+    run(test())
+
+
+def test_ranking_recalculator_recalculates_after_delay() -> None:
+    recalculated: list[int] = []
+    finished = asyncio.Event()
+
+    async def recalculate(tournament_id: int) -> None:
+        recalculated.append(tournament_id)
+        finished.set()
+
+    async def test() -> None:
+        recalculator = RankingRecalculator(recalculate, delay_seconds=0.01)
+        recalculator.schedule(1)
+
+        # Nothing flushes the pending change, so it is recalculated once the delay expires
+        await asyncio.wait_for(finished.wait(), 5)
+        assert recalculated == [1]
+
+    run(test())
+
+
+def test_ranking_recalculator_wait_skips_delay() -> None:
+    recalculated: list[int] = []
+
+    async def recalculate(tournament_id: int) -> None:
+        recalculated.append(tournament_id)
+
+    async def test() -> None:
+        recalculator = RankingRecalculator(recalculate, delay_seconds=60)
+        recalculator.schedule(1)
+
+        start = time.monotonic()
+        await recalculator.wait(1)
+        assert time.monotonic() - start < 5
+        assert recalculated == [1]
+
+        # Waiting without pending changes returns right away
+        await recalculator.wait(1)
+        assert recalculated == [1]
+
+    run(test())
+
+
+def test_ranking_recalculator_delays_changes_after_wait() -> None:
+    recalculated: list[int] = []
+    proceed = asyncio.Event()
+
+    async def recalculate(tournament_id: int) -> None:
+        recalculated.append(tournament_id)
+        await proceed.wait()
+
+    async def test() -> None:
+        recalculator = RankingRecalculator(recalculate, delay_seconds=60)
+        recalculator.schedule(1)
+        waiting = asyncio.create_task(recalculator.wait(1))
+        while len(recalculated) < 1:
+            await asyncio.sleep(0)
+
+        # A change during the flushed recalculation waits for the delay again
+        recalculator.schedule(1)
+        proceed.set()
+        await asyncio.sleep(0.05)
+        assert recalculated == [1]
+
+        await recalculator.wait(1)
+        await waiting
+        assert recalculated == [1, 1]
+
+    run(test())
+
+
+def test_ranking_recalculator_survives_errors() -> None:
+    recalculated: list[int] = []
+
+    async def recalculate(tournament_id: int) -> None:
+        recalculated.append(tournament_id)
+        raise ValueError('Database is gone')
+
+    async def test() -> None:
+        recalculator = RankingRecalculator(recalculate, delay_seconds=0)
+        recalculator.schedule(1)
+        await recalculator.wait(1)
+        recalculator.schedule(1)
+        await recalculator.wait(1)
+        assert recalculated == [1, 1]
+
+    run(test())
@@ -1,5 +1,15 @@
+from typing import TYPE_CHECKING
+
+from heliclockter import datetime_utc, timedelta
+
+from bracket.logic.planning.matches import get_court_schedule
 from bracket.logic.scheduling.elimination import get_number_of_rounds_to_create_single_elimination
 from bracket.logic.scheduling.round_robin import get_number_of_rounds_to_create_round_robin
+from bracket.utils.dummy_records import DUMMY_MATCH1, DUMMY_TEAM1, DUMMY_TOURNAMENT
+from tests.unit_tests.shared import get_match, get_team
+
+if TYPE_CHECKING:
+    from bracket.models.db.match import MatchWithDetails, MatchWithDetailsDefinitive
 
 
 def test_number_of_rounds_round_robin() -> None:
@@ -14,3 +24,35 @@ def test_number_of_rounds_single_elimination() -> None:
     assert get_number_of_rounds_to_create_single_elimination(2) == 1
     assert get_number_of_rounds_to_create_single_elimination(4) == 2
     assert get_number_of_rounds_to_create_single_elimination(8) == 3
+
+
+def test_court_schedule_avoids_overlapping_matches() -> None:
+    team_a, team_b, team_c, team_d = (
+        get_team(DUMMY_TEAM1, team_id=team_id) for team_id in range(4)
+    )
+    matches: list[MatchWithDetailsDefinitive | MatchWithDetails] = [
+        get_match(DUMMY_MATCH1.copy(update={'id': match_id, **update}), team1, team2)
+        for match_id, team1, team2, update in [
+            (1, team_a, team_b, {'custom_duration_minutes': 30}),
+            (2, team_c, team_d, {}),
+            (3, team_a, team_c, {}),
+            (4, team_b, team_d, {}),
+        ]
+    ]
+
+    def minutes(count: int) -> datetime_utc:
+        return datetime_utc.from_datetime(DUMMY_TOURNAMENT.start_time + timedelta(minutes=count))
+
+    # Match 3 waits for match 1 on the court that is free first, although their start times differ
+    schedule = get_court_schedule(matches, [2, 1], DUMMY_TOURNAMENT)
+    assert [
+        (match.match_id, match.court_id, match.start_time, match.position_in_schedule)
+        for match in schedule
+    ] == [
+        (1, 1, minutes(0), 0),
+        (2, 2, minutes(0), 0),
+        (3, 2, minutes(35), 1),
+        (4, 1, minutes(35), 1),
+    ]
+    assert schedule[0].duration_minutes == 30
+    assert schedule[1].duration_minutes == DUMMY_TOURNAMENT.duration_minutes
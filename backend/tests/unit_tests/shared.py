@@ -0,0 +1,31 @@
+from bracket.models.db.match import Match, MatchWithDetails, MatchWithDetailsDefinitive
+from bracket.models.db.team import FullTeamWithPlayers, Team
+from bracket.models.db.util import RoundWithMatches
+from tests.integration_tests.mocks import MOCK_NOW
+
+
+def get_team(team: Team, team_id: int) -> FullTeamWithPlayers:
+    return FullTeamWithPlayers(
+        id=team_id,
+        **team.dict(),
+        players=[],
+    )
+
+
+def get_match(
+    match: Match, team1: FullTeamWithPlayers, team2: FullTeamWithPlayers
+) -> MatchWithDetailsDefinitive:
+    return MatchWithDetailsDefinitive(
+        **match.copy(update={'team1_id': team1.id, 'team2_id': team2.id}).dict(),
+        team1=team1,
+        team2=team2,
+        court=None,
+    )
+
+
+def get_round(
+    matches: list[MatchWithDetailsDefinitive | MatchWithDetails], is_draft: bool
+) -> RoundWithMatches:
+    return RoundWithMatches(
+        matches=matches, is_draft=is_draft, stage_item_id=-1, name='R', created=MOCK_NOW
+    )
@@ -1,11 +1,16 @@
 from decimal import Decimal
+from typing import Any
 
 import pytest
 from fastapi import HTTPException
 
-from bracket.logic.scheduling.ladder_teams import get_possible_upcoming_matches_for_swiss
-from bracket.models.db.match import Match, MatchFilter, MatchWithDetailsDefinitive, SuggestedMatch
-from bracket.models.db.team import FullTeamWithPlayers, Team
+from bracket.logic.scheduling import ladder_teams
+from bracket.logic.scheduling.ladder_teams import (
+    get_optimal_swiss_pairings,
+    get_possible_upcoming_matches_for_swiss,
+    swiss_suggestions_cache,
+)
+from bracket.models.db.match import MatchFilter, SuggestedMatch
 from bracket.models.db.util import RoundWithMatches
 from bracket.utils.dummy_records import (
     DUMMY_MATCH1,
@@ -15,8 +20,9 @@ from bracket.utils.dummy_records import (
     DUMMY_TEAM4,
 )
 from tests.integration_tests.mocks import MOCK_NOW
+from tests.unit_tests.shared import get_match, get_round, get_team
 
-MATCH_FILTER = MatchFilter(elo_diff_threshold=50, iterations=100, limit=20, only_recommended=False)
+MATCH_FILTER = MatchFilter(elo_diff_threshold=50, limit=20, only_recommended=False)
 
 
 def test_no_draft_round() -> None:
@@ -24,25 +30,6 @@ def test_no_draft_round() -> None:
         get_possible_upcoming_matches_for_swiss(MATCH_FILTER, [], [])
 
 
-def get_team(team: Team, team_id: int) -> FullTeamWithPlayers:
-    return FullTeamWithPlayers(
-        id=team_id,
-        **team.dict(),
-        players=[],
-    )
-
-
-def get_match(
-    match: Match, team1: FullTeamWithPlayers, team2: FullTeamWithPlayers
-) -> MatchWithDetailsDefinitive:
-    return MatchWithDetailsDefinitive(
-        **match.copy(update={'team1_id': team1.id, 'team2_id': team2.id}).dict(),
-        team1=team1,
-        team2=team2,
-        court=None,
-    )
-
-
 def test_constraints() -> None:
     team1 = get_team(DUMMY_TEAM1.copy(update={'elo_score': 1125}), team_id=-1)
     team2 = get_team(DUMMY_TEAM2.copy(update={'elo_score': 1175}), team_id=-2)
@@ -82,3 +69,121 @@ def test_constraints() -> None:
             player_behind_schedule_count=0,
         ),
     ]
+
+
+# With a single neighbour, teams that remain unpaired at first are paired in a second matching
+@pytest.mark.parametrize('pairing_neighbours', [1, 8])
+def test_optimal_pairings_pair_all_teams(
+    pairing_neighbours: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(ladder_teams, 'PAIRING_NEIGHBOURS', pairing_neighbours)
+    teams = [
+        get_team(DUMMY_TEAM1.copy(update={'elo_score': elo_score}), team_id=team_id)
+        for team_id, elo_score in [(1, 1000), (2, 1010), (3, 1100), (4, 1120), (5, 1200), (6, 1210)]
+    ]
+    rounds = [
+        get_round([get_match(DUMMY_MATCH1, teams[0], teams[1])], is_draft=False),
+        get_round([], is_draft=True),
+    ]
+    match_filter = MATCH_FILTER.copy(update={'elo_diff_threshold': 1000})
+
+    # Pairing the closest teams first would leave teams 1 and 2, who played each other already
+    result = get_optimal_swiss_pairings(match_filter, rounds, teams)
+    pairs = {(match.team1.id, match.team2.id) for match in result}
+    assert len(pairs) == 3
+    assert (5, 6) in pairs
+    assert (1, 2) not in pairs
+    assert {team_id for pair in pairs for team_id in pair} == {1, 2, 3, 4, 5, 6}
+
+    assert (
+        len(get_optimal_swiss_pairings(match_filter.copy(update={'limit': 2}), rounds, teams)) == 2
+    )
+
+
+def test_optimal_pairings_prefer_teams_behind_schedule() -> None:
+    team1, team2, team3 = (
+        get_team(DUMMY_TEAM1.copy(update={'elo_score': elo_score}), team_id=team_id)
+        for team_id, elo_score in [(1, 1000), (2, 1001), (3, 1500)]
+    )
+    inactive_team = get_team(DUMMY_TEAM4.copy(update={'active': False}), team_id=4)
+    rounds = [
+        get_round([get_match(DUMMY_MATCH1, team1, inactive_team)], is_draft=False),
+        get_round([], is_draft=True),
+    ]
+    match_filter = MATCH_FILTER.copy(update={'elo_diff_threshold': 1000})
+
+    # Team 1 played already, so teams 2 and 3 play even though teams 1 and 2 are closer in ELO
+    [match] = get_optimal_swiss_pairings(match_filter, rounds, [team1, team2, team3])
+    assert (match.team1.id, match.team2.id) == (2, 3)
+
+
+def test_optimal_pairings_limit_keeps_teams_behind_schedule() -> None:
+    teams = [
+        get_team(DUMMY_TEAM1.copy(update={'elo_score': elo_score}), team_id=team_id)
+        for team_id, elo_score in [(1, 1000), (2, 1050), (3, 1500), (4, 1501)]
+    ]
+    inactive_team = get_team(DUMMY_TEAM4.copy(update={'active': False}), team_id=5)
+    rounds = [
+        get_round([get_match(DUMMY_MATCH1, teams[3], inactive_team)], is_draft=False),
+        get_round([], is_draft=True),
+    ]
+    match_filter = MATCH_FILTER.copy(update={'elo_diff_threshold': 100, 'limit': 1})
+
+    # Teams 3 and 4 are closer in ELO, but teams 1 and 2 are both behind schedule
+    [match] = get_optimal_swiss_pairings(match_filter, rounds, teams)
+    assert (match.team1.id, match.team2.id) == (1, 2)
+
+
+def test_suggestions_are_updated_incrementally(monkeypatch: pytest.MonkeyPatch) -> None:
+    swiss_suggestions_cache.clear()
+    computed = []
+    original_get_swiss_suggestions = ladder_teams.get_swiss_suggestions
+
+    def get_swiss_suggestions(*args: Any) -> ladder_teams.SwissSuggestions:
+        computed.append(args)
+        return original_get_swiss_suggestions(*args)
+
+    monkeypatch.setattr(ladder_teams, 'get_swiss_suggestions', get_swiss_suggestions)
+
+    teams = [
+        get_team(DUMMY_TEAM1.copy(update={'elo_score': 1000 + 10 * team_id}), team_id=team_id)
+        for team_id in range(1, 7)
+    ]
+    played_round = get_round(
+        [get_match(DUMMY_MATCH1.copy(update={'id': 1}), teams[0], teams[1])], is_draft=False
+    ).copy(update={'id': 1})
+    draft_round = get_round([], is_draft=True).copy(update={'id': 2})
+    match_filter = MATCH_FILTER.copy(update={'elo_diff_threshold': 1000, 'only_recommended': True})
+    rounds = [played_round, draft_round]
+    assert len(get_possible_upcoming_matches_for_swiss(match_filter, rounds, teams)) == 14
+
+    # Scheduling teams 3 and 4 removes their pairs from the cached suggestions
+    draft_round.matches.append(get_match(DUMMY_MATCH1.copy(update={'id': 2}), teams[2], teams[3]))
+    result = get_possible_upcoming_matches_for_swiss(match_filter, rounds, teams)
+    assert len(computed) == 1
+
+    swiss_suggestions_cache.clear()
+    assert result == get_possible_upcoming_matches_for_swiss(match_filter, rounds, teams)
+    assert len(computed) == 2
+    assert {(match.team1.id, match.team2.id) for match in result} == {
+        (1, 5),
+        (1, 6),
+        (2, 5),
+        (2, 6),
+        (5, 6),
+    }
+
+
+def test_suggestions_are_reproducible_with_seed() -> None:
+    teams = [
+        get_team(DUMMY_TEAM1.copy(update={'elo_score': elo_score}), team_id=team_id)
+        for team_id, elo_score in enumerate([1000, 1000, 1000, 1000, 1000, 1000], start=1)
+    ]
+    rounds = [get_round([], is_draft=True)]
+    seeded_filter = MATCH_FILTER.copy(update={'seed': 42})
+
+    result = get_possible_upcoming_matches_for_swiss(seeded_filter, rounds, teams)
+    assert result == get_possible_upcoming_matches_for_swiss(seeded_filter, rounds, teams)
+    assert sorted(result, key=lambda match: (match.team1.id, match.team2.id)) == (
+        get_possible_upcoming_matches_for_swiss(MATCH_FILTER, rounds, teams)
+    )